@@ -4,11 +4,12 @@ Busca traduções similares na memória para ajudar a manter consistência termi
 """
 
 import re
+from itertools import islice
 from typing import List, Dict, Tuple, Optional, Set
 from dataclasses import dataclass
 from difflib import SequenceMatcher
 
-from database import TranslationMemory
+from database import TranslationMemory, TranslationChange
 
 
 @dataclass
@@ -59,6 +60,12 @@ class ContextualSuggestionEngine:
         'aquele', 'aquela', 'aqueles', 'aquelas', 'isto', 'isso', 'aquilo',
     }
     
+    # Quantidade máxima de traduções (mais usadas) indexadas no cache de termos
+    MAX_CACHED_TRANSLATIONS = 10000
+    
+    # Quantidade máxima de candidatos lidos na busca por similaridade
+    MAX_SIMILAR_CANDIDATES = 100
+    
     def __init__(self, translation_memory: TranslationMemory):
         """
         Inicializa o motor de sugestões.
@@ -68,12 +75,61 @@ class ContextualSuggestionEngine:
         """
         self.memory = translation_memory
         self._term_cache: Dict[str, List[Tuple[str, str]]] = {}
+        self._cached_originals: Set[str] = set()
         self._cache_valid = False
     
     def invalidate_cache(self):
         """Invalida o cache de termos"""
         self._cache_valid = False
         self._term_cache.clear()
+        self._cached_originals.clear()
+    
+    def apply_memory_changes(self, changes: Optional[List[TranslationChange]]):
+        """
+        Atualiza o cache de termos com alterações feitas por outra instância.
+        
+        Registrado em TranslationMemory.add_change_listener: só os textos
+        alterados são removidos e relidos, sem reconstruir o cache.
+        
+        Args:
+            changes: Alterações do diário, ou None para descartar o cache
+        """
+        if changes is None:
+            self.invalidate_cache()
+            return
+        
+        if not self._cache_valid:
+            return
+        
+        originals = list(dict.fromkeys(change.original_text for change in changes))
+        for original in originals:
+            if original not in self._cached_originals:
+                continue
+            self._cached_originals.discard(original)
+            for term in self._extract_terms(original):
+                entries = self._term_cache.get(term)
+                if entries:
+                    entries[:] = [entry for entry in entries if entry[0] != original]
+                    if not entries:
+                        del self._term_cache[term]
+        
+        # Relê a tradução atual dos textos que continuam na memória
+        live = [change.original_text for change in changes if change.operation != 'D']
+        if not live:
+            return
+        
+        for original, translated in self.memory.get_translations_batch(live).items():
+            if len(self._cached_originals) >= self.MAX_CACHED_TRANSLATIONS:
+                break
+            self._add_to_term_cache(original, translated)
+    
+    def _add_to_term_cache(self, original: str, translated: str):
+        """Indexa uma tradução no cache de termos"""
+        self._cached_originals.add(original)
+        for term in self._extract_terms(original):
+            if term not in self._term_cache:
+                self._term_cache[term] = []
+            self._term_cache[term].append((original, translated))
     
     def _build_term_cache(self):
         """Constrói cache de termos para busca rápida"""
@@ -81,19 +137,14 @@ class ContextualSuggestionEngine:
             return
         
         self._term_cache.clear()
+        self._cached_originals.clear()
         
-        # Obtém todas as traduções
-        all_translations = self.memory.search_translations("", limit=10000)
+        # Percorre as traduções mais usadas sem materializar a tabela
+        rows = islice(self.memory.iter_translations(), self.MAX_CACHED_TRANSLATIONS)
         
-        for original, translated in all_translations:
-            # Extrai termos significativos
-            terms = self._extract_terms(original)
-            
-            for term in terms:
-                term_lower = term.lower()
-                if term_lower not in self._term_cache:
-                    self._term_cache[term_lower] = []
-                self._term_cache[term_lower].append((original, translated))
+        for row in rows:
+            # Extrai termos significativos (já em minúsculas)
+            self._add_to_term_cache(row.original_text, row.translated_text)
         
         self._cache_valid = True
     
@@ -228,10 +279,14 @@ class ContextualSuggestionEngine:
         """
         suggestions = []
         
-        # Busca por substring
-        search_results = self.memory.search_translations(text[:50], limit=100)
+        # Busca por termo
+        search_results = islice(
+            self.memory.iter_translations(search_term=text[:50], order='rank'),
+            self.MAX_SIMILAR_CANDIDATES
+        )
         
-        for original, translated in search_results:
+        for row in search_results:
+            original, translated = row.original_text, row.translated_text
             if original in exclude:
                 continue
             
@@ -7,15 +7,623 @@ Melhorias implementadas:
 - Batch insert otimizado para grandes volumes
 - Thread-safety com locks
 - Tratamento robusto de erros
+- Buscas somente leitura com contagem de uso acumulada em memória
+- Pool de conexões: uma conexão de leitura por thread + um escritor dedicado
+- Cache LRU em memória (com cache negativo) na frente do SQLite
+- Índice de texto completo FTS5 para buscas (com fallback para LIKE)
+- Iteração paginada por keyset, com memória constante para qualquer tamanho
+- Importação em massa via tabela temporária e INSERT ... SELECT único
+- Exportação/importação CSV/TSV em fluxo contínuo, com suporte a gzip
+- Chave hash de 64 bits do texto original para buscas exatas com índice compacto
+- Filtro de Bloom persistido que descarta ausências certas sem consultar o SQLite
+- Estatísticas por categoria mantidas por triggers (get_stats em tempo constante)
+- Memórias anexadas (ATTACH, somente leitura) consultadas junto da principal
+- Exportação para snapshot compacto somente leitura (ver tm_snapshot)
+- Diário de alterações por triggers + PRAGMA data_version para invalidar caches
+  de outras instâncias que abrem o mesmo arquivo
+- Exportação/aplicação de alterações incrementais (deltas) com UPSERT
+- Camada de arquivo: traduções pouco usadas vão para outro banco, consultado
+  só quando a camada principal não tem o texto, e voltam ao serem usadas
+- Manutenção online: auto_vacuum incremental em passos curtos numa thread de
+  fundo, PRAGMA optimize ao fechar e cópias compactadas com VACUUM INTO
+- Chave normalizada (espaços/maiúsculas) para reaproveitar variantes de forma
+- Vários processos no mesmo arquivo: busy_timeout, BEGIN IMMEDIATE com novas
+  tentativas, concessão de escritor em metadata e gravações adiadas
+- Modelos numéricos ("Wave {0} of {1}") em tabela própria, indexados pela
+  forma normalizada (ver translation_templates)
+- Padrões aprendidos (base -> base traduzida) persistidos no banco e
+  carregados sob demanda em um índice em memória
 """
 
 import sqlite3
+import csv
+import gzip
+import hashlib
+import io
+import json
+import math
 import os
+import platform
+import random
+import re
+import sys
 import threading
-from typing import Optional, List, Tuple, Dict, Generator
+import time
+import unicodedata
+import uuid
+import weakref
+from collections import OrderedDict
+from pathlib import Path
+from typing import (Optional, List, Tuple, Dict, Generator, Callable, Iterator,
+                    NamedTuple, Iterable)
 from datetime import datetime
 from contextlib import contextmanager
 
+from translation_templates import build_translated_template, extract_template
+
+# "Base" + número no fim ("Soldier 01"), como em SmartTranslator.learn_pattern
+NUMBERED_TEXT_PATTERN = re.compile(r'^(.+?)\s*(\d+)$')
+
+
+def text_hash(text: str) -> int:
+    """
+    Hash de 64 bits do texto normalizado (NFC), usado como chave de busca.
+
+    O valor é um inteiro com sinal para caber em uma coluna INTEGER do
+    SQLite. Colisões são possíveis, então quem busca pelo hash confere o
+    texto em seguida.
+
+    Args:
+        text: Texto original
+
+    Returns:
+        Hash como inteiro de 64 bits com sinal
+    """
+    normalized = unicodedata.normalize('NFC', text)
+    digest = hashlib.blake2b(normalized.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little', signed=True)
+
+
+def normalized_key(text: str) -> str:
+    """
+    Chave tolerante a variações de forma: sem espaços nas pontas, espaços
+    internos (incluindo quebras de linha) colapsados e casefold.
+
+    "  Hello\\r\\nWORLD " e "hello world" têm a mesma chave.
+
+    Args:
+        text: Texto original
+
+    Returns:
+        Texto normalizado
+    """
+    return ' '.join(text.split()).casefold()
+
+
+def normalized_hash(text: str) -> int:
+    """Hash de 64 bits da chave normalizada (coluna normalized_hash)"""
+    return text_hash(normalized_key(text))
+
+
+def template_key(skeleton: str, slot_types: str) -> int:
+    """Chave de busca de um modelo: hash da forma normalizada e dos tipos das posições"""
+    return text_hash(f"{normalized_key(skeleton)}\x1f{slot_types}")
+
+
+def _is_busy(error: Exception) -> bool:
+    """True se o erro é SQLITE_BUSY/SQLITE_LOCKED (lock de outra conexão)"""
+    code = getattr(error, 'sqlite_errorcode', None)
+    if code is not None:
+        return code & 0xff in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+    message = str(error).lower()
+    return 'locked' in message or 'busy' in message
+
+
+class TranslationRow(NamedTuple):
+    """Linha leve retornada por TranslationMemory.iter_translations"""
+    id: int
+    original_text: str
+    translated_text: str
+    category: str
+    notes: str
+    usage_count: int
+    updated_at: str
+
+
+class TranslationChange(NamedTuple):
+    """Alteração registrada no diário (translation_changes)"""
+    change_id: int
+    translation_id: int
+    original_text: str
+    operation: str  # 'I' (inserção), 'U' (atualização) ou 'D' (remoção)
+
+
+class ConnectionPool:
+    """
+    Pool de conexões SQLite para um único arquivo de banco.
+
+    Mantém uma conexão de escrita dedicada e uma conexão de leitura por
+    thread. Em modo WAL os leitores nunca bloqueiam o escritor nem uns aos
+    outros, então threads de trabalho e a thread da interface podem ler em
+    paralelo sem disputar o lock global.
+    """
+
+    # Leituras direto das páginas mapeadas, sem cópia para o cache do SQLite
+    MMAP_SIZE = 256 * 1024 * 1024
+
+    def __init__(self, db_path: str,
+                 configure: Optional[Callable[[sqlite3.Connection], None]] = None,
+                 busy_timeout: float = 5.0):
+        """
+        Abre a conexão de escrita do pool
+
+        Args:
+            db_path: Caminho para o arquivo .db
+            configure: Função aplicada a cada nova conexão de leitura
+            busy_timeout: Segundos que o SQLite espera por um lock de outro
+                          processo antes de devolver SQLITE_BUSY
+        """
+        self.db_path = db_path
+        self._configure = configure
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._registry_lock = threading.Lock()
+        self._readers: List[Tuple[weakref.ref, sqlite3.Connection]] = []
+        self._closed = False
+
+        # Bancos anexados (alias, URI); leitores se atualizam pela geração
+        self.attachments: List[Tuple[str, str]] = []
+        self.attach_generation = 0
+        self._writer_attached: List[str] = []
+
+        # Bancos em memória não são compartilhados entre conexões
+        self.shared_reads = db_path == ':memory:' or db_path.startswith('file::memory:')
+
+        # uri=True garante que ATTACH aceite URIs "file:...?mode=ro"
+        self.writer = sqlite3.connect(db_path, timeout=busy_timeout, check_same_thread=False,
+                                      uri=True)
+        self.writer.row_factory = sqlite3.Row
+
+        # Métricas de uso
+        self.reads = 0
+        self.readers_opened = 0
+
+    def _open_reader(self) -> sqlite3.Connection:
+        """Abre e configura uma nova conexão de leitura"""
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout, check_same_thread=False,
+                               uri=True)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA query_only=1")
+        conn.execute("PRAGMA cache_size=10000")
+        conn.execute(f"PRAGMA mmap_size={self.MMAP_SIZE}")
+        if self._configure:
+            self._configure(conn)
+        return conn
+
+    def reader(self) -> Optional[sqlite3.Connection]:
+        """
+        Retorna a conexão de leitura da thread atual, criando se necessário.
+
+        Returns:
+            Conexão de leitura ou None se as leituras devem usar o escritor
+        """
+        if self._closed:
+            raise ConnectionError("Pool de conexões fechado")
+
+        self.reads += 1
+        if self.shared_reads:
+            return None
+
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._open_reader()
+            self._local.conn = conn
+            self._local.busy_timeout = self.busy_timeout
+
+            with self._registry_lock:
+                # Fecha conexões de threads que já terminaram
+                alive = []
+                for thread_ref, reader in self._readers:
+                    thread = thread_ref()
+                    if thread is not None and thread.is_alive():
+                        alive.append((thread_ref, reader))
+                    else:
+                        try:
+                            reader.close()
+                        except Exception:
+                            pass
+                alive.append((weakref.ref(threading.current_thread()), conn))
+                self._readers = alive
+                self.readers_opened += 1
+
+        if self._local.busy_timeout != self.busy_timeout:
+            conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout * 1000)}")
+            self._local.busy_timeout = self.busy_timeout
+
+        generation = self.attach_generation
+        if getattr(self._local, 'generation', 0) != generation:
+            self._local.attached = self._apply_attachments(
+                conn, getattr(self._local, 'attached', []), self.attachments
+            )
+            self._local.generation = generation
+
+        return conn
+
+    @staticmethod
+    def _apply_attachments(conn: sqlite3.Connection, current: List[str],
+                           attachments: List[Tuple[str, str]]) -> List[str]:
+        """
+        Troca os bancos anexados de uma conexão
+
+        Returns:
+            Aliases anexados após a troca
+        """
+        for alias in current:
+            try:
+                conn.execute(f'DETACH DATABASE "{alias}"')
+            except sqlite3.Error:
+                pass
+
+        attached = []
+        try:
+            for alias, uri in attachments:
+                conn.execute(f'ATTACH DATABASE ? AS "{alias}"', (uri,))
+                attached.append(alias)
+        except sqlite3.Error:
+            # Não deixa anexos parciais para trás
+            for alias in attached:
+                try:
+                    conn.execute(f'DETACH DATABASE "{alias}"')
+                except sqlite3.Error:
+                    pass
+            raise
+        return attached
+
+    def set_attachments(self, attachments: List[Tuple[str, str]]):
+        """
+        Define os bancos anexados em todas as conexões do pool.
+
+        O escritor é atualizado na hora (chamar com o lock do escritor);
+        cada leitor se atualiza na próxima chamada a reader().
+
+        Args:
+            attachments: Lista de (alias, URI) na ordem de prioridade
+        """
+        attachments = list(attachments)
+        try:
+            self._writer_attached = self._apply_attachments(
+                self.writer, self._writer_attached, attachments
+            )
+        except sqlite3.Error:
+            # Mantém o escritor consistente com a lista anterior
+            self._writer_attached = self._apply_attachments(self.writer, [], self.attachments)
+            raise
+
+        self.attachments = attachments
+        self.attach_generation += 1
+
+    def set_busy_timeout(self, seconds: float):
+        """
+        Altera a espera por locks de outros processos.
+
+        O escritor é atualizado na hora (chamar com o lock do escritor);
+        cada leitor se atualiza na próxima chamada a reader().
+
+        Args:
+            seconds: Tempo máximo de espera em segundos
+        """
+        self.writer.execute(f"PRAGMA busy_timeout={int(seconds * 1000)}")
+        self.busy_timeout = seconds
+
+    def reader_count(self) -> int:
+        """Retorna quantas conexões de leitura estão abertas"""
+        with self._registry_lock:
+            return len(self._readers)
+
+    def close(self):
+        """Fecha todas as conexões do pool"""
+        self._closed = True
+        with self._registry_lock:
+            readers = self._readers
+            self._readers = []
+
+        for _, reader in readers:
+            try:
+                reader.close()
+            except Exception:
+                pass
+
+        try:
+            self.writer.close()
+        except Exception:
+            pass
+
+
+class TranslationCache:
+    """
+    Cache LRU de traduções exatas, limitado por entradas e por bytes.
+
+    Também guarda um cache negativo de textos confirmados como ausentes, para
+    que buscas repetidas de textos sem tradução não voltem ao SQLite.
+
+    Cada escrita incrementa uma geração; leituras do banco só populam o cache
+    se a geração não mudou durante a consulta, evitando entradas obsoletas.
+    """
+
+    def __init__(self, max_entries: int = 50000, max_bytes: int = 32 * 1024 * 1024,
+                 max_negative: int = 50000):
+        """
+        Inicializa o cache
+
+        Args:
+            max_entries: Número máximo de traduções em cache
+            max_bytes: Tamanho máximo aproximado (bytes) das traduções em cache
+            max_negative: Número máximo de textos no cache negativo
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_negative = max_negative
+
+        self._entries: OrderedDict = OrderedDict()
+        self._negative: OrderedDict = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.generation = 0
+
+        # Invalidações completas (cargas em massa, outro banco, reset do diário)
+        self.resets = 0
+
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _entry_size(key: str, value: str) -> int:
+        """Estima o tamanho em bytes de uma entrada"""
+        return sys.getsizeof(key) + sys.getsizeof(value)
+
+    def get(self, key: str) -> Tuple[bool, Optional[str]]:
+        """
+        Busca uma tradução no cache
+
+        Args:
+            key: Texto original
+
+        Returns:
+            Tupla (encontrado, tradução). Encontrado com tradução None indica
+            ausência confirmada (cache negativo).
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return (True, value)
+
+            if key in self._negative:
+                self._negative.move_to_end(key)
+                self.negative_hits += 1
+                return (True, None)
+
+            self.misses += 1
+            return (False, None)
+
+    def put(self, key: str, value: str, generation: int = None):
+        """
+        Armazena uma tradução no cache
+
+        Args:
+            key: Texto original
+            value: Texto traduzido
+            generation: Geração lida antes da consulta ao banco (opcional)
+        """
+        size = self._entry_size(key, value)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= self._entry_size(key, old)
+            self._negative.pop(key, None)
+
+            self._entries[key] = value
+            self._bytes += size
+
+            while self._entries and (len(self._entries) > self.max_entries or
+                                     self._bytes > self.max_bytes):
+                old_key, old_value = self._entries.popitem(last=False)
+                self._bytes -= self._entry_size(old_key, old_value)
+
+    def put_negative(self, key: str, generation: int = None):
+        """
+        Marca um texto como ausente na memória
+
+        Args:
+            key: Texto original
+            generation: Geração lida antes da consulta ao banco (opcional)
+        """
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+
+            self._negative[key] = True
+            self._negative.move_to_end(key)
+            while len(self._negative) > self.max_negative:
+                self._negative.popitem(last=False)
+
+    def write(self, key: str, value: str):
+        """Write-through de uma escrita no banco"""
+        with self._lock:
+            self.generation += 1
+        self.put(key, value)
+
+    def discard(self, key: str):
+        """Remove um texto do cache (positivo e negativo)"""
+        with self._lock:
+            self.generation += 1
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= self._entry_size(key, old)
+            self._negative.pop(key, None)
+
+    def clear_negative(self):
+        """Limpa apenas o cache negativo"""
+        with self._lock:
+            self.generation += 1
+            self._negative.clear()
+
+    def clear(self):
+        """Invalida todo o cache"""
+        with self._lock:
+            self.generation += 1
+            self.resets += 1
+            self._entries.clear()
+            self._negative.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """Retorna contadores do cache"""
+        with self._lock:
+            lookups = self.hits + self.negative_hits + self.misses
+            return {
+                'cache_hits': self.hits,
+                'cache_negative_hits': self.negative_hits,
+                'cache_misses': self.misses,
+                'cache_hit_rate': ((self.hits + self.negative_hits) / lookups) if lookups else 0.0,
+                'cache_entries': len(self._entries),
+                'cache_negative_entries': len(self._negative),
+                'cache_bytes': self._bytes
+            }
+
+
+class BloomFilter:
+    """
+    Filtro de Bloom sobre os hashes de 64 bits dos textos originais.
+
+    Responde "talvez exista" ou "certamente não existe". Falsos positivos só
+    custam uma consulta ao banco; falsos negativos não acontecem, então uma
+    ausência certa pode ser devolvida sem tocar no SQLite.
+    """
+
+    # Poucas funções de hash deixam a consulta barata em Python; o tamanho do
+    # vetor de bits é ajustado para manter a taxa de erro pedida
+    NUM_HASHES = 4
+
+    # Fração de entradas removidas (bits que ficam para trás) que pede reconstrução
+    STALE_RATIO = 0.5
+
+    def __init__(self, capacity: int = 1024, error_rate: float = 0.01):
+        """
+        Inicializa um filtro vazio
+
+        Args:
+            capacity: Número de textos previsto
+            error_rate: Taxa de falsos positivos desejada nessa capacidade
+        """
+        self.capacity = max(int(capacity), 1024)
+        self.num_hashes = self.NUM_HASHES
+        bits_per_entry = -self.num_hashes / math.log(1 - error_rate ** (1 / self.num_hashes))
+        self.num_bits = int(self.capacity * bits_per_entry)
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+        self.stale = 0
+        self.skips = 0
+
+    @staticmethod
+    def _split(key_hash: int) -> Tuple[int, int]:
+        """Divide o hash em duas metades de 32 bits para o hashing duplo"""
+        value = key_hash & 0xFFFFFFFFFFFFFFFF
+        return value & 0xFFFFFFFF, (value >> 32) | 1
+
+    def add(self, key_hash: int):
+        """Adiciona o hash de um texto ao filtro"""
+        h1, h2 = self._split(key_hash)
+        bits = self.bits
+        num_bits = self.num_bits
+        for i in range(self.num_hashes):
+            pos = (h1 + i * h2) % num_bits
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def might_contain(self, key_hash: int) -> bool:
+        """
+        Verifica se o texto pode estar na memória
+
+        Returns:
+            False somente se o texto certamente não está na memória
+        """
+        h1, h2 = self._split(key_hash)
+        bits = self.bits
+        num_bits = self.num_bits
+        for i in range(self.num_hashes):
+            pos = (h1 + i * h2) % num_bits
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                self.skips += 1
+                return False
+        return True
+
+    def mark_removed(self, count: int = 1):
+        """
+        Registra textos removidos da memória.
+
+        Bits não podem ser apagados: as entradas viram falsos positivos, que
+        só custam uma consulta, até a próxima reconstrução.
+        """
+        self.stale += count
+
+    def is_saturated(self) -> bool:
+        """True quando o filtro passou da capacidade e deve ser reconstruído"""
+        return self.count > self.capacity
+
+    def is_stale(self) -> bool:
+        """True quando as entradas removidas passam de STALE_RATIO do filtro"""
+        return self.stale > self.count * self.STALE_RATIO
+
+    def params(self) -> str:
+        """Parâmetros do filtro, gravados junto com os bits"""
+        return f'{self.capacity}:{self.num_bits}:{self.num_hashes}:{self.count}:{self.stale}'
+
+    @classmethod
+    def from_bytes(cls, params: str, bits: bytes) -> Optional['BloomFilter']:
+        """
+        Restaura um filtro persistido
+
+        Returns:
+            O filtro ou None se os dados estiverem inconsistentes
+        """
+        try:
+            values = [int(part) for part in params.split(':')]
+            # Filtros gravados antes da contagem de removidos têm 4 campos
+            capacity, num_bits, num_hashes, count, stale = values if len(values) == 5 else values + [0]
+        except (AttributeError, ValueError):
+            return None
+
+        if not isinstance(bits, bytes) or len(bits) != (num_bits + 7) // 8:
+            return None
+
+        bloom = cls.__new__(cls)
+        bloom.capacity = capacity
+        bloom.num_bits = num_bits
+        bloom.num_hashes = num_hashes
+        bloom.bits = bytearray(bits)
+        bloom.count = count
+        bloom.stale = stale
+        bloom.skips = 0
+        return bloom
+
+    def stats(self) -> dict:
+        """Retorna métricas do filtro"""
+        return {
+            'bloom_entries': self.count,
+            'bloom_stale': self.stale,
+            'bloom_bytes': len(self.bits),
+            'bloom_skips': self.skips
+        }
+
 
 class TranslationMemory:
     """
@@ -24,22 +632,221 @@ class TranslationMemory:
     Thread-safe e otimizado para operações em lote.
     """
 
-    def __init__(self, db_path: str = None):
+    # Quantidade de usos pendentes que dispara um flush imediato
+    USAGE_FLUSH_THRESHOLD = 500
+
+    # Intervalo máximo (segundos) que um uso pendente espera para ser gravado
+    USAGE_FLUSH_INTERVAL = 5.0
+
+    # Índices secundários que podem ser recriados após cargas muito grandes
+    SECONDARY_INDEXES = {
+        'idx_category': 'CREATE INDEX IF NOT EXISTS idx_category ON translations(category)',
+        # Busca tolerante a espaços e maiúsculas (get_normalized_translation)
+        'idx_normalized_hash': (
+            'CREATE INDEX IF NOT EXISTS idx_normalized_hash ON translations(normalized_hash)'
+        ),
+        # Exportação de alterações por data (export_changes)
+        'idx_updated_at': 'CREATE INDEX IF NOT EXISTS idx_updated_at ON translations(updated_at)',
+        # Índice composto usado na paginação por keyset (uso, atualização, id)
+        'idx_usage_order': (
+            'CREATE INDEX IF NOT EXISTS idx_usage_order '
+            'ON translations(usage_count, updated_at, id)'
+        ),
+    }
+
+    # A partir desta quantidade de linhas a carga em massa recria os índices
+    BULK_INDEX_REBUILD_THRESHOLD = 100000
+
+    # Linhas enviadas por executemany na carga em massa
+    BULK_CHUNK_SIZE = 5000
+
+    # Linhas gravadas por transação na carga em massa (memória limitada)
+    BULK_COMMIT_ROWS = 50000
+
+    # Textos achados no arquivo que disparam a promoção imediata
+    PROMOTION_FLUSH_THRESHOLD = 100
+
+    # Manutenção em segundo plano: intervalo (segundos) e páginas liberadas
+    # por passo do incremental_vacuum (o lock do escritor é solto entre passos)
+    MAINTENANCE_INTERVAL = 60.0
+    INCREMENTAL_VACUUM_PAGES = 256
+
+    # Cabeçalho dos arquivos delta (export_changes / apply_changes)
+    CHANGES_HEADER = ['Operação', 'Original', 'Tradução', 'Categoria', 'Notas', 'Usos',
+                      'Atualizado em']
+
+    # Alterações mantidas no diário; close() descarta as mais antigas
+    CHANGE_JOURNAL_RETENTION = 100000
+
+    # Acima desta quantidade de alterações de uma vez, poll_changes descarta
+    # os caches inteiros em vez de atualizá-los texto a texto
+    CHANGE_POLL_LIMIT = 10000
+
+    # Vários processos no mesmo arquivo: espera do SQLite por lock (segundos)
+    # e novas tentativas do BEGIN IMMEDIATE com espera aleatória crescente
+    BUSY_TIMEOUT = 5.0
+    BUSY_RETRIES = 5
+    BUSY_BACKOFF = 0.05
+    BUSY_BACKOFF_MAX = 1.0
+
+    # Concessão de escritor das operações longas: validade sem renovação e
+    # espera máxima pela liberação de outra instância (segundos)
+    WRITER_LEASE_SECONDS = 30.0
+    WRITER_LEASE_WAIT = 120.0
+
+    # Quanto close() insiste nas traduções adiadas antes de devolvê-las (segundos)
+    DEFERRED_FLUSH_WAIT = 10.0
+
+    # Inserção/atualização de uma tradução (add_translation e gravações adiadas)
+    _UPSERT_SQL = '''
+        INSERT INTO translations
+        (original_text, translated_text, source_language, target_language, category, notes,
+         original_hash, normalized_hash)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(original_text) DO UPDATE SET
+            translated_text = excluded.translated_text,
+            updated_at = CURRENT_TIMESTAMP,
+            usage_count = usage_count + 1,
+            category = excluded.category,
+            notes = excluded.notes
+    '''
+
+    def __init__(self, db_path: str = None, track_usage: bool = True,
+                 busy_timeout: Optional[float] = None):
         """
         Inicializa a conexão com o banco de dados
 
         Args:
             db_path: Caminho para o arquivo do banco de dados (.db)
                     Se None, não conecta automaticamente
+            track_usage: Se False, buscas não incrementam o contador de uso
+            busy_timeout: Segundos de espera por locks de outros processos
+                          (None = BUSY_TIMEOUT)
         """
         self.db_path = db_path
         self.conn: Optional[sqlite3.Connection] = None
         self.cursor: Optional[sqlite3.Cursor] = None
+        self._pool: Optional[ConnectionPool] = None
         self._lock = threading.RLock()
 
+        # Métricas de disputa pelo lock do escritor
+        self._lock_acquisitions = 0
+        self._lock_contentions = 0
+        self._lock_wait_total = 0.0
+        self._lock_wait_max = 0.0
+
+        # Disputa com outros processos: esperas por lock do arquivo, novas
+        # tentativas e concessão de escritor (operações longas)
+        self.busy_timeout = self.BUSY_TIMEOUT if busy_timeout is None else busy_timeout
+        self._busy_waits = 0
+        self._busy_wait_total = 0.0
+        self._busy_wait_max = 0.0
+        self._busy_retries = 0
+        self._busy_failures = 0
+        self._lease_owner = f"{platform.node()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._lease_expires = 0.0
+        self._lease_depth = 0
+        self._lease_lock = threading.Lock()
+        self._lease_waits = 0
+        self._lease_timeouts = 0
+
+        # Traduções que não foram gravadas por lock de outro processo; entram
+        # no próximo flush_usage()
+        self._deferred_writes: Dict[str, Tuple[str, str, str, str, str]] = {}
+
+        # Contadores de uso acumulados em memória (gravados em lote)
+        self.track_usage = track_usage
+        self._pending_usage: Dict[str, int] = {}
+        self._pending_usage_total = 0
+        self._usage_lock = threading.Lock()
+        self._usage_timer: Optional[threading.Timer] = None
+
+        # Cache em memória das buscas exatas
+        self._cache = TranslationCache()
+
+        # Índice FTS5 disponível no banco conectado
+        self._fts_enabled = False
+
+        # Filtro de Bloom dos textos originais (None = desativado)
+        self._bloom: Optional[BloomFilter] = None
+        self._bloom_dirty = False
+
+        # Memórias anexadas somente para leitura, em ordem de prioridade
+        self._attached: List[Dict] = []
+        self._attach_counter = 0
+
+        # Camada de arquivo (outra TranslationMemory) e textos a promover de volta
+        self._archive: Optional['TranslationMemory'] = None
+        self._pending_promotions: Dict[str, int] = {}
+        self._promotions = 0
+
+        # Thread de manutenção (incremental_vacuum / optimize)
+        self._maintenance_thread: Optional[threading.Thread] = None
+        self._maintenance_stop = threading.Event()
+        self._vacuumed_pages = 0
+
+        # Diário de alterações: última alteração vista e data_version do escritor
+        self._change_position = 0
+        self._data_version: Optional[int] = None
+        self._change_listeners: List[Callable[[Optional[List[TranslationChange]]], None]] = []
+
+        # Padrões aprendidos: base -> (base traduzida, separador). None = não
+        # carregado; a assinatura (linhas, maior revisão) detecta escritas
+        # de outras instâncias em poll_changes
+        self._learned_patterns: Optional[Dict[str, Tuple[str, str]]] = None
+        self._learned_signature: Optional[Tuple[int, int]] = None
+
         if db_path:
             self.connect(db_path)
 
+    @contextmanager
+    def _write_lock(self) -> Generator[None, None, None]:
+        """
+        Adquire o lock do escritor registrando tempo de espera e disputa.
+        """
+        if self._lock.acquire(blocking=False):
+            waited = 0.0
+        else:
+            start = time.perf_counter()
+            self._lock.acquire()
+            waited = time.perf_counter() - start
+            self._lock_contentions += 1
+            self._lock_wait_total += waited
+            self._lock_wait_max = max(self._lock_wait_max, waited)
+
+        self._lock_acquisitions += 1
+        try:
+            yield
+        finally:
+            self._lock.release()
+
+    @contextmanager
+    def _read_cursor(self) -> Generator[sqlite3.Cursor, None, None]:
+        """
+        Context manager para leituras.
+
+        Usa a conexão de leitura da thread atual, sem passar pelo lock do
+        escritor. Para bancos em memória recorre ao cursor do escritor.
+
+        Yields:
+            Cursor do SQLite
+        """
+        pool = self._pool
+        if pool is None or not self.is_connected():
+            raise ConnectionError("Banco de dados não conectado")
+
+        conn = pool.reader()
+        if conn is None:
+            with self._write_lock():
+                yield self.cursor
+            return
+
+        cursor = conn.cursor()
+        try:
+            yield cursor
+        finally:
+            cursor.close()
+
     @contextmanager
     def _get_cursor(self) -> Generator[sqlite3.Cursor, None, None]:
         """
@@ -51,16 +858,20 @@ class TranslationMemory:
         Yields:
             Cursor do SQLite
         """
-        with self._lock:
+        with self._write_lock():
             if not self.is_connected():
                 raise ConnectionError("Banco de dados não conectado")
 
+            if not self.conn.in_transaction:
+                self._begin_immediate()
+
             try:
                 yield self.cursor
                 self.conn.commit()
             except sqlite3.Error as e:
                 self.conn.rollback()
                 raise e
+            self._skip_own_changes()
 
     @contextmanager
     def _transaction(self) -> Generator[sqlite3.Cursor, None, None]:
@@ -72,17 +883,216 @@ class TranslationMemory:
         Yields:
             Cursor do SQLite
         """
-        with self._lock:
+        with self._write_lock():
             if not self.is_connected():
                 raise ConnectionError("Banco de dados não conectado")
 
+            self._begin_immediate()
             try:
-                self.cursor.execute("BEGIN TRANSACTION")
                 yield self.cursor
                 self.conn.commit()
             except sqlite3.Error as e:
                 self.conn.rollback()
                 raise e
+            self._skip_own_changes()
+
+    def _begin_immediate(self):
+        """
+        Abre uma transação de escrita (chamar com o lock do escritor).
+
+        BEGIN IMMEDIATE pede o lock de escrita do arquivo logo no início, então
+        outro processo não invalida a transação no meio (caso em que o SQLite
+        devolve SQLITE_BUSY sem esperar). Se o lock continuar ocupado depois do
+        busy_timeout, tenta de novo até BUSY_RETRIES vezes com espera
+        aleatória, para que os processos não voltem todos ao mesmo tempo.
+        """
+        start = time.perf_counter()
+        attempt = 0
+        try:
+            while True:
+                try:
+                    self.cursor.execute('BEGIN IMMEDIATE')
+                    break
+                except sqlite3.OperationalError as e:
+                    if not _is_busy(e):
+                        raise
+                    if attempt >= self.BUSY_RETRIES:
+                        self._busy_failures += 1
+                        raise
+                    attempt += 1
+                    self._busy_retries += 1
+                    time.sleep(random.uniform(
+                        0, min(self.BUSY_BACKOFF_MAX, self.BUSY_BACKOFF * 2 ** attempt)
+                    ))
+        finally:
+            # Sem disputa o BEGIN leva microssegundos; acima de 1 ms houve espera
+            waited = time.perf_counter() - start
+            if waited >= 0.001:
+                self._busy_waits += 1
+                self._busy_wait_total += waited
+                self._busy_wait_max = max(self._busy_wait_max, waited)
+
+        self._renew_writer_lease()
+
+    def set_busy_timeout(self, seconds: float):
+        """
+        Altera quanto tempo as conexões esperam por locks de outros processos.
+
+        Args:
+            seconds: Tempo máximo de espera em segundos
+        """
+        with self._write_lock():
+            self.busy_timeout = seconds
+            if self._pool is not None:
+                self._pool.set_busy_timeout(seconds)
+
+    def _read_lease(self, cursor: sqlite3.Cursor) -> Optional[Dict]:
+        """Concessão de escritor vigente registrada em metadata (None se livre)"""
+        cursor.execute("SELECT value FROM metadata WHERE key = 'writer_lease'")
+        row = cursor.fetchone()
+        if not row:
+            return None
+        try:
+            lease = json.loads(row[0])
+        except ValueError:
+            return None
+        if lease.get('expires_at', 0) <= time.time():
+            return None
+        return lease
+
+    def _write_lease(self, cursor: sqlite3.Cursor):
+        """Grava ou renova a concessão desta instância (dentro de uma transação)"""
+        expires = time.time() + self.WRITER_LEASE_SECONDS
+        cursor.execute(
+            "INSERT OR REPLACE INTO metadata (key, value) VALUES ('writer_lease', ?)",
+            (json.dumps({'owner': self._lease_owner, 'pid': os.getpid(),
+                         'expires_at': expires}),)
+        )
+        self._lease_expires = expires
+
+    def _renew_writer_lease(self):
+        """
+        Renova a concessão na transação recém-aberta quando passou da metade
+        da validade. Se outra instância assumiu uma concessão vencida, desiste.
+        """
+        if not self._lease_expires:
+            return
+        if time.time() < self._lease_expires - self.WRITER_LEASE_SECONDS / 2:
+            return
+
+        holder = self._read_lease(self.cursor)
+        if holder is None or holder['owner'] == self._lease_owner:
+            self._write_lease(self.cursor)
+        else:
+            self._lease_expires = 0.0
+
+    def acquire_writer_lease(self, wait: Optional[float] = None) -> bool:
+        """
+        Obtém a concessão (lease) de escritor registrada na tabela metadata.
+
+        A concessão é consultiva: escritas comuns não dependem dela, mas as
+        operações longas (carga em massa, mesclagem, arquivamento, deltas e
+        VACUUM) a pedem antes de começar, para que duas instâncias não
+        intercalem lotes grandes no mesmo arquivo. Vence após
+        WRITER_LEASE_SECONDS sem renovação; as transações do dono a renovam.
+
+        Args:
+            wait: Segundos de espera pela liberação (None = WRITER_LEASE_WAIT)
+
+        Returns:
+            True se esta instância ficou com a concessão
+        """
+        if not self.is_connected():
+            return False
+
+        deadline = time.monotonic() + (self.WRITER_LEASE_WAIT if wait is None else wait)
+        waited = False
+        while True:
+            try:
+                with self._get_cursor() as cursor:
+                    holder = self._read_lease(cursor)
+                    if holder is None or holder['owner'] == self._lease_owner:
+                        self._write_lease(cursor)
+                        return True
+            except Exception as e:
+                print(f"Erro ao obter concessão de escritor: {e}")
+                return False
+
+            if not waited:
+                self._lease_waits += 1
+                waited = True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self._lease_timeouts += 1
+                return False
+            time.sleep(min(remaining, random.uniform(self.BUSY_BACKOFF, self.BUSY_BACKOFF_MAX)))
+
+    def release_writer_lease(self):
+        """Libera a concessão de escritor, se for desta instância"""
+        if not self._lease_expires:
+            return
+        self._lease_expires = 0.0
+
+        try:
+            with self._get_cursor() as cursor:
+                holder = self._read_lease(cursor)
+                if holder is not None and holder['owner'] == self._lease_owner:
+                    cursor.execute("DELETE FROM metadata WHERE key = 'writer_lease'")
+        except Exception as e:
+            print(f"Erro ao liberar concessão de escritor: {e}")
+
+    def get_writer_lease(self) -> Optional[Dict]:
+        """
+        Retorna quem mantém a concessão de escritor
+
+        Returns:
+            Dicionário com owner, pid, expires_in (segundos) e own, ou None
+        """
+        if not self.is_connected():
+            return None
+
+        try:
+            with self._read_cursor() as cursor:
+                lease = self._read_lease(cursor)
+        except Exception as e:
+            print(f"Erro ao ler concessão de escritor: {e}")
+            return None
+
+        if lease is None:
+            return None
+        return {
+            'owner': lease.get('owner'),
+            'pid': lease.get('pid'),
+            'expires_in': lease['expires_at'] - time.time(),
+            'own': lease.get('owner') == self._lease_owner
+        }
+
+    @contextmanager
+    def _writer_lease(self) -> Generator[None, None, None]:
+        """
+        Mantém a concessão de escritor durante uma operação longa.
+
+        Reentrante: só a operação mais externa pede e libera. Se a espera
+        esgotar, a operação segue sem a concessão (as transações continuam
+        protegidas pelo lock do SQLite).
+        """
+        with self._lease_lock:
+            outermost = self._lease_depth == 0
+            self._lease_depth += 1
+
+        held = False
+        try:
+            if outermost:
+                held = self.acquire_writer_lease()
+                if not held:
+                    print("Aviso: outra instância mantém a concessão de escritor; "
+                          "continuando sem ela")
+            yield
+        finally:
+            with self._lease_lock:
+                self._lease_depth -= 1
+            if held:
+                self.release_writer_lease()
 
     def connect(self, db_path: str) -> bool:
         """
@@ -94,23 +1104,42 @@ class TranslationMemory:
         Returns:
             True se conectou com sucesso
         """
+        # Antes do lock: a thread de manutenção pode estar esperando por ele,
+        # e close() dentro do lock a esperaria para sempre
+        self.stop_maintenance()
+
         with self._lock:
             try:
                 # Fecha conexão anterior se existir
                 self.close()
 
                 self.db_path = db_path
-                self.conn = sqlite3.connect(db_path, check_same_thread=False)
-                self.conn.row_factory = sqlite3.Row
+                self._cache.clear()
+                self._learned_patterns = None
+                self._pool = ConnectionPool(db_path, busy_timeout=self.busy_timeout)
+                self.conn = self._pool.writer
+                self.conn.create_function('tm_hash', 1, text_hash, deterministic=True)
+                self.conn.create_function('tm_norm_hash', 1, normalized_hash, deterministic=True)
                 self.cursor = self.conn.cursor()
 
-                # Otimizações de performance
+                # Otimizações de performance. auto_vacuum só vale para bancos
+                # novos; os antigos passam a incremental no próximo vacuum()
+                self.cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
                 self.cursor.execute("PRAGMA journal_mode=WAL")
                 self.cursor.execute("PRAGMA synchronous=NORMAL")
                 self.cursor.execute("PRAGMA cache_size=10000")
+                self.cursor.execute(f"PRAGMA mmap_size={ConnectionPool.MMAP_SIZE}")
 
                 # Cria tabelas se não existirem
                 self._initialize_tables()
+                self._initialize_fts()
+                self._initialize_stats()
+                self._initialize_journal()
+                self._initialize_templates()
+                self._initialize_learned_patterns()
+                self._load_bloom()
+                self._reattach_memories()
+                self._reopen_archive()
 
                 return True
             except Exception as e:
@@ -131,7 +1160,9 @@ class TranslationMemory:
                 notes TEXT DEFAULT '',
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                usage_count INTEGER DEFAULT 1
+                usage_count INTEGER DEFAULT 1,
+                original_hash INTEGER,
+                normalized_hash INTEGER
             )
         ''')
 
@@ -143,22 +1174,40 @@ class TranslationMemory:
             )
         ''')
 
-        # Índices para busca rápida
+        # Migração: bancos antigos não têm a coluna de hash
+        self.cursor.execute('PRAGMA table_info(translations)')
+        columns = {row[1] for row in self.cursor.fetchall()}
+        if 'original_hash' not in columns:
+            self.cursor.execute('ALTER TABLE translations ADD COLUMN original_hash INTEGER')
+        if 'normalized_hash' not in columns:
+            self.cursor.execute('ALTER TABLE translations ADD COLUMN normalized_hash INTEGER')
+
+        # Índices para busca rápida: a busca exata usa o hash (8 bytes por
+        # entrada) em vez de uma segunda cópia do texto original
         self.cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_original_text
-            ON translations(original_text)
+            CREATE INDEX IF NOT EXISTS idx_original_hash
+            ON translations(original_hash)
         ''')
 
+        # Preenche linhas migradas ou gravadas por versões antigas
         self.cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_category
-            ON translations(category)
+            UPDATE translations SET original_hash = tm_hash(original_text)
+            WHERE original_hash IS NULL
         ''')
-
         self.cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_usage_count
-            ON translations(usage_count DESC)
+            UPDATE translations SET normalized_hash = tm_norm_hash(original_text)
+            WHERE normalized_hash IS NULL
         ''')
 
+        # Redundante com o índice automático da restrição UNIQUE
+        self.cursor.execute('DROP INDEX IF EXISTS idx_original_text')
+
+        for index_sql in self.SECONDARY_INDEXES.values():
+            self.cursor.execute(index_sql)
+
+        # idx_usage_count é prefixo de idx_usage_order
+        self.cursor.execute('DROP INDEX IF EXISTS idx_usage_count')
+
         # Insere metadados padrão
         self.cursor.execute('''
             INSERT OR IGNORE INTO metadata (key, value)
@@ -167,168 +1216,2207 @@ class TranslationMemory:
 
         self.conn.commit()
 
-    def is_connected(self) -> bool:
-        """Verifica se está conectado a um banco de dados"""
+    def _initialize_fts(self):
+        """
+        Cria (ou reconstrói) o índice FTS5 de busca, mantido por triggers.
+
+        Se a build do SQLite não tiver FTS5, remove os triggers deixados por
+        outra build (que quebrariam as escritas) e marca o índice para
+        reconstrução; as buscas passam a usar LIKE.
+        """
+        self._fts_enabled = False
+
+        try:
+            self.cursor.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x)")
+            self.cursor.execute("DROP TABLE temp.fts5_probe")
+        except sqlite3.OperationalError:
+            for trigger in ('translations_fts_ai', 'translations_fts_ad', 'translations_fts_au'):
+                self.cursor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+            self.cursor.execute('''
+                INSERT OR REPLACE INTO metadata (key, value) VALUES ('fts_dirty', '1')
+            ''')
+            self.conn.commit()
+            return
+
+        self.cursor.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'translations_fts_%'"
+        )
+        triggers_ok = self.cursor.fetchone()[0] == 3
+        self.cursor.execute("SELECT value FROM metadata WHERE key = 'fts_dirty'")
+        row = self.cursor.fetchone()
+        dirty = row is not None and row[0] == '1'
+
+        self.cursor.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS translations_fts USING fts5(
+                original_text, translated_text,
+                content='translations', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+        ''')
+
+        self.cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS translations_fts_ai AFTER INSERT ON translations BEGIN
+                INSERT INTO translations_fts(rowid, original_text, translated_text)
+                VALUES (new.id, new.original_text, new.translated_text);
+            END
+        ''')
+
+        self.cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS translations_fts_ad AFTER DELETE ON translations BEGIN
+                INSERT INTO translations_fts(translations_fts, rowid, original_text, translated_text)
+                VALUES ('delete', old.id, old.original_text, old.translated_text);
+            END
+        ''')
+
+        self.cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS translations_fts_au
+            AFTER UPDATE OF original_text, translated_text ON translations BEGIN
+                INSERT INTO translations_fts(translations_fts, rowid, original_text, translated_text)
+                VALUES ('delete', old.id, old.original_text, old.translated_text);
+                INSERT INTO translations_fts(rowid, original_text, translated_text)
+                VALUES (new.id, new.original_text, new.translated_text);
+            END
+        ''')
+
+        # Índice novo ou escrito sem triggers: reconstrói a partir da tabela
+        if not triggers_ok or dirty:
+            self.cursor.execute("INSERT INTO translations_fts(translations_fts) VALUES ('rebuild')")
+            self.cursor.execute("DELETE FROM metadata WHERE key = 'fts_dirty'")
+
+        self.conn.commit()
+        self._fts_enabled = True
+
+    def _initialize_stats(self):
+        """
+        Cria a tabela de estatísticas por categoria e os triggers que a mantêm.
+
+        Os triggers ficam gravados no arquivo, então qualquer programa que
+        escreva no banco mantém os contadores. Se a tabela ou os triggers
+        forem novos, os contadores são recalculados a partir de translations.
+        """
+        self.cursor.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'translation_stats_%'"
+        )
+        triggers_ok = self.cursor.fetchone()[0] == 3
+
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS translation_stats (
+                category TEXT PRIMARY KEY,
+                translation_count INTEGER NOT NULL DEFAULT 0,
+                usage_total INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+
+        self.cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS translation_stats_ai AFTER INSERT ON translations BEGIN
+                INSERT INTO translation_stats (category, translation_count, usage_total)
+                VALUES (IFNULL(new.category, ''), 1, IFNULL(new.usage_count, 0))
+                ON CONFLICT(category) DO UPDATE SET
+                    translation_count = translation_count + 1,
+                    usage_total = usage_total + excluded.usage_total;
+            END
+        ''')
+
+        self.cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS translation_stats_ad AFTER DELETE ON translations BEGIN
+                UPDATE translation_stats SET
+                    translation_count = translation_count - 1,
+                    usage_total = usage_total - IFNULL(old.usage_count, 0)
+                WHERE category = IFNULL(old.category, '');
+                DELETE FROM translation_stats
+                WHERE category = IFNULL(old.category, '') AND translation_count <= 0;
+            END
+        ''')
+
+        self.cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS translation_stats_au
+            AFTER UPDATE OF category, usage_count ON translations
+            WHEN old.category IS NOT new.category OR old.usage_count IS NOT new.usage_count BEGIN
+                UPDATE translation_stats SET
+                    translation_count = translation_count - 1,
+                    usage_total = usage_total - IFNULL(old.usage_count, 0)
+                WHERE category = IFNULL(old.category, '');
+                INSERT INTO translation_stats (category, translation_count, usage_total)
+                VALUES (IFNULL(new.category, ''), 1, IFNULL(new.usage_count, 0))
+                ON CONFLICT(category) DO UPDATE SET
+                    translation_count = translation_count + 1,
+                    usage_total = usage_total + excluded.usage_total;
+                DELETE FROM translation_stats
+                WHERE category = IFNULL(old.category, '') AND translation_count <= 0;
+            END
+        ''')
+
+        if not triggers_ok:
+            self._recompute_stats(self.cursor)
+
+        self.conn.commit()
+
+    def _recompute_stats(self, cursor: sqlite3.Cursor):
+        """Recalcula a tabela de estatísticas a partir de translations"""
+        cursor.execute('DELETE FROM translation_stats')
+        cursor.execute('''
+            INSERT INTO translation_stats (category, translation_count, usage_total)
+            SELECT IFNULL(category, ''), COUNT(*), IFNULL(SUM(usage_count), 0)
+            FROM translations
+            GROUP BY IFNULL(category, '')
+        ''')
+
+    def rebuild_stats(self) -> bool:
+        """
+        Recalcula as estatísticas por categoria (varredura completa).
+
+        Returns:
+            True se recalculou com sucesso
+        """
+        if not self.is_connected():
+            return False
+
+        try:
+            with self._transaction() as cursor:
+                self._recompute_stats(cursor)
+            return True
+        except Exception as e:
+            print(f"Erro ao recalcular estatísticas: {e}")
+            return False
+
+    def verify_stats(self, repair: bool = False) -> bool:
+        """
+        Confere os contadores mantidos por triggers com uma contagem completa
+
+        Args:
+            repair: Se True, recalcula os contadores quando houver divergência
+
+        Returns:
+            True se os contadores estavam corretos
+        """
+        if not self.is_connected():
+            return False
+
+        try:
+            with self._read_cursor() as cursor:
+                cursor.execute('''
+                    SELECT IFNULL(category, ''), COUNT(*), IFNULL(SUM(usage_count), 0)
+                    FROM translations
+                    GROUP BY IFNULL(category, '')
+                ''')
+                expected = {tuple(row) for row in cursor.fetchall()}
+
+                cursor.execute('''
+                    SELECT category, translation_count, usage_total
+                    FROM translation_stats
+                    WHERE translation_count > 0
+                ''')
+                current = {tuple(row) for row in cursor.fetchall()}
+        except Exception as e:
+            print(f"Erro ao verificar estatísticas: {e}")
+            return False
+
+        if expected == current:
+            return True
+
+        if repair:
+            self.rebuild_stats()
+        return False
+
+    def _initialize_journal(self):
+        """
+        Cria o diário de alterações e os triggers que o alimentam.
+
+        Cada inserção, remoção ou mudança de texto/categoria grava uma linha
+        com o id e o texto original afetados. Mudanças só na contagem de uso
+        não entram: não alteram o que os caches guardam.
+        """
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS translation_changes (
+                change_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                translation_id INTEGER NOT NULL,
+                original_text TEXT NOT NULL,
+                operation TEXT NOT NULL,
+                changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        self.cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS translation_changes_ai AFTER INSERT ON translations BEGIN
+                INSERT INTO translation_changes (translation_id, original_text, operation)
+                VALUES (new.id, new.original_text, 'I');
+            END
+        ''')
+
+        self.cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS translation_changes_ad AFTER DELETE ON translations BEGIN
+                INSERT INTO translation_changes (translation_id, original_text, operation)
+                VALUES (old.id, old.original_text, 'D');
+            END
+        ''')
+
+        # Texto original renomeado: o antigo sai (D) e o novo entra (U)
+        self.cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS translation_changes_au
+            AFTER UPDATE OF original_text, translated_text, category ON translations
+            WHEN old.original_text IS NOT new.original_text
+              OR old.translated_text IS NOT new.translated_text
+              OR old.category IS NOT new.category BEGIN
+                INSERT INTO translation_changes (translation_id, original_text, operation)
+                SELECT old.id, old.original_text, 'D'
+                WHERE old.original_text IS NOT new.original_text;
+                INSERT INTO translation_changes (translation_id, original_text, operation)
+                VALUES (new.id, new.original_text, 'U');
+            END
+        ''')
+
+        self.conn.commit()
+
+        # Acompanha a partir do estado atual
+        self.cursor.execute('SELECT IFNULL(MAX(change_id), 0) FROM translation_changes')
+        self._change_position = self.cursor.fetchone()[0]
+        self.cursor.execute('PRAGMA data_version')
+        self._data_version = self.cursor.fetchone()[0]
+
+    def _initialize_templates(self):
+        """
+        Cria a tabela de modelos numéricos.
+
+        skeleton_key é o hash da forma normalizada do modelo com os tipos das
+        posições (template_key), então "WAVE {0} OF {1}" encontra o modelo
+        de "Wave {0} of {1}".
+        """
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS translation_templates (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                skeleton TEXT NOT NULL,
+                slot_types TEXT NOT NULL,
+                skeleton_key INTEGER NOT NULL,
+                translated_template TEXT NOT NULL,
+                usage_count INTEGER DEFAULT 1,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE (skeleton, slot_types)
+            )
+        ''')
+        self.cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_template_key
+            ON translation_templates(skeleton_key)
+        ''')
+
+        # Linhas que produzem cada modelo: editar ou remover uma delas só
+        # apaga o modelo quando não sobra nenhuma
+        self.cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'template_sources'"
+        )
+        migrate = self.cursor.fetchone() is None
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS template_sources (
+                original_hash INTEGER PRIMARY KEY,
+                skeleton TEXT NOT NULL,
+                slot_types TEXT NOT NULL
+            )
+        ''')
+        self.cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_template_sources
+            ON template_sources(skeleton, slot_types)
+        ''')
+        if migrate:
+            self._record_template_sources()
+        self.conn.commit()
+
+    def _record_template_sources(self):
+        """
+        Preenche template_sources em bancos com modelos anteriores à tabela.
+
+        Roda uma vez, na primeira conexão depois da atualização.
+        """
+        self.cursor.execute('SELECT skeleton, slot_types FROM translation_templates')
+        keys = set(self.cursor.fetchall())
+        if not keys:
+            return
+
+        self.cursor.execute('''
+            SELECT original_hash, original_text, translated_text FROM translations
+            WHERE original_hash IS NOT NULL
+        ''')
+        sources = []
+        for key_hash, original, translated in self.cursor:
+            source = extract_template(original)
+            if (source is not None and (source.skeleton, source.slot_types) in keys
+                    and build_translated_template(original, translated) is not None):
+                sources.append((key_hash, source.skeleton, source.slot_types))
+        self.cursor.executemany(
+            'INSERT OR REPLACE INTO template_sources VALUES (?, ?, ?)', sources
+        )
+
+    def _initialize_learned_patterns(self):
+        """
+        Cria a tabela de padrões aprendidos por SmartTranslator.learn_pattern.
+
+        revision cresce a cada gravação; junto com a contagem de linhas forma
+        a assinatura que outras instâncias comparam para recarregar o índice.
+        """
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS learned_patterns (
+                base_text TEXT PRIMARY KEY,
+                translated_base TEXT NOT NULL,
+                separator TEXT NOT NULL DEFAULT ' ',
+                revision INTEGER NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        self.conn.commit()
+
+    def _prune_journal(self):
+        """Descarta as alterações além das CHANGE_JOURNAL_RETENTION mais recentes"""
+        try:
+            with self._get_cursor() as cursor:
+                cursor.execute('''
+                    DELETE FROM translation_changes
+                    WHERE change_id <= (SELECT MAX(change_id) FROM translation_changes) - ?
+                ''', (self.CHANGE_JOURNAL_RETENTION,))
+        except Exception as e:
+            print(f"Erro ao limpar diário de alterações: {e}")
+
+    def _skip_own_changes(self):
+        """
+        Avança a posição do diário sobre as escritas desta instância.
+
+        Chamado após cada commit do escritor: se nenhuma outra conexão gravou
+        desde a última verificação (data_version igual), tudo o que está no
+        diário foi escrito aqui e poll_changes não precisa devolver.
+        """
+        try:
+            self.cursor.execute('PRAGMA data_version')
+            if self.cursor.fetchone()[0] == self._data_version:
+                self.cursor.execute('SELECT IFNULL(MAX(change_id), 0) FROM translation_changes')
+                self._change_position = self.cursor.fetchone()[0]
+        except sqlite3.Error:
+            pass
+
+    def add_change_listener(self, callback: Callable[[Optional[List[TranslationChange]]], None]):
+        """
+        Registra uma função chamada quando poll_changes encontra alterações.
+
+        A função recebe a lista de TranslationChange, ou None quando as
+        alterações não puderam ser listadas (diário podado ou alterações
+        demais) e tudo deve ser recarregado.
+        """
+        if callback not in self._change_listeners:
+            self._change_listeners.append(callback)
+
+    def remove_change_listener(self, callback: Callable[[Optional[List[TranslationChange]]], None]):
+        """Remove uma função registrada com add_change_listener"""
+        if callback in self._change_listeners:
+            self._change_listeners.remove(callback)
+
+    def poll_changes(self) -> Optional[List[TranslationChange]]:
+        """
+        Verifica se outra conexão (outra instância do programa) alterou o banco.
+
+        O PRAGMA data_version do escritor só muda com commits de outras
+        conexões, então a verificação comum custa uma instrução. Se mudou, lê
+        do diário as alterações desde a última verificação, tira os textos
+        afetados do cache, atualiza o filtro de Bloom e avisa os listeners.
+        Com o escritor ocupado a verificação fica para a próxima chamada.
+
+        Returns:
+            Lista de alterações (vazia se nada mudou) ou None se os caches
+            foram descartados por inteiro
+        """
+        if not self.is_connected() or not self._lock.acquire(blocking=False):
+            return []
+
+        try:
+            self.cursor.execute('PRAGMA data_version')
+            version = self.cursor.fetchone()[0]
+            if version == self._data_version:
+                return []
+            self._data_version = version
+
+            # Padrões aprendidos por outra instância: recarrega na próxima consulta
+            if (self._learned_patterns is not None
+                    and self._read_learned_signature(self.cursor) != self._learned_signature):
+                self._learned_patterns = None
+
+            # Escritas desta instância intercaladas com as de outra conexão
+            # também voltam; reprocessá-las custa só uma ida ao banco
+            self.cursor.execute('''
+                SELECT change_id, translation_id, original_text, operation
+                FROM translation_changes
+                WHERE change_id > ?
+                ORDER BY change_id
+                LIMIT ?
+            ''', (self._change_position, self.CHANGE_POLL_LIMIT + 1))
+            changes = [TranslationChange(*row) for row in self.cursor.fetchall()]
+
+            # Os ids do diário são contínuos: um salto significa que outra
+            # instância podou alterações que ainda não tínhamos visto
+            pruned = bool(changes) and changes[0].change_id > self._change_position + 1
+            if pruned or len(changes) > self.CHANGE_POLL_LIMIT:
+                self.cursor.execute('SELECT IFNULL(MAX(change_id), 0) FROM translation_changes')
+                self._change_position = self.cursor.fetchone()[0]
+                changes = None
+            elif changes:
+                self._change_position = changes[-1].change_id
+        except Exception as e:
+            print(f"Erro ao verificar alterações: {e}")
+            return []
+        finally:
+            self._lock.release()
+
+        if changes is None:
+            self._cache.clear()
+            self._rebuild_bloom()
+        elif changes:
+            self._bloom_add(text_hash(change.original_text)
+                            for change in changes if change.operation != 'D')
+            for change in changes:
+                self._cache.discard(change.original_text)
+            self._check_bloom_capacity()
+        else:
+            return changes
+
+        for callback in list(self._change_listeners):
+            try:
+                callback(changes)
+            except Exception as e:
+                print(f"Erro ao notificar alteração da memória: {e}")
+
+        return changes
+
+    def _table_signature(self) -> str:
+        """Assinatura (linhas:maior id) usada para validar o filtro persistido"""
+        self.cursor.execute('SELECT COUNT(*), COALESCE(MAX(id), 0) FROM translations')
+        rows, max_id = self.cursor.fetchone()
+        return f'{rows}:{max_id}'
+
+    def _load_bloom(self):
+        """
+        Carrega o filtro de Bloom gravado em metadata.
+
+        Se a assinatura não bater com a tabela (escritas de outra versão,
+        encerramento sem close()), reconstrói a partir do índice de hashes.
+        """
+        self.cursor.execute('''
+            SELECT key, value FROM metadata
+            WHERE key IN ('bloom_filter', 'bloom_params', 'bloom_signature')
+        ''')
+        saved = {row[0]: row[1] for row in self.cursor.fetchall()}
+
+        bloom = None
+        if saved.get('bloom_signature') == self._table_signature():
+            bloom = BloomFilter.from_bytes(saved.get('bloom_params'), saved.get('bloom_filter'))
+
+        if bloom is None or bloom.is_saturated():
+            self._rebuild_bloom()
+        else:
+            self._bloom = bloom
+            self._bloom_dirty = False
+
+    def _rebuild_bloom(self):
+        """Reconstrói o filtro de Bloom com todos os hashes e o persiste"""
+        with self._write_lock():
+            self.cursor.execute('SELECT COUNT(*) FROM translations')
+            rows = self.cursor.fetchone()[0]
+
+            # Folga para crescer antes da próxima reconstrução
+            bloom = BloomFilter(capacity=rows * 2)
+            self.cursor.execute('SELECT original_hash FROM translations WHERE original_hash IS NOT NULL')
+            for (key_hash,) in self.cursor:
+                bloom.add(key_hash)
+
+            self._bloom = bloom
+            self._bloom_dirty = True
+            self._save_bloom()
+
+    def _save_bloom(self):
+        """Grava o filtro de Bloom em metadata, se houver alterações"""
+        bloom = self._bloom
+        if bloom is None or not self._bloom_dirty:
+            return
+
+        try:
+            with self._transaction() as cursor:
+                signature = self._table_signature()
+                cursor.executemany(
+                    'INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)',
+                    [('bloom_filter', bytes(bloom.bits)),
+                     ('bloom_params', bloom.params()),
+                     ('bloom_signature', signature)]
+                )
+            self._bloom_dirty = False
+        except Exception as e:
+            print(f"Erro ao gravar filtro de Bloom: {e}")
+
+    def _bloom_add(self, key_hashes: Iterable[int]):
+        """
+        Registra textos inseridos no filtro de Bloom.
+
+        Chamado antes da gravação: um falso positivo temporário é inofensivo,
+        já um falso negativo esconderia uma tradução recém-gravada.
+        """
+        bloom = self._bloom
+        if bloom is None:
+            return
+
+        for key_hash in key_hashes:
+            bloom.add(key_hash)
+        self._bloom_dirty = True
+
+    def _bloom_excludes(self, key_hash: int) -> bool:
+        """True se o filtro garante que o texto não está na memória"""
+        bloom = self._bloom
+        return bloom is not None and not bloom.might_contain(key_hash)
+
+    def _bloom_remove(self, count: int):
+        """
+        Registra exclusões no filtro de Bloom sem reconstruí-lo.
+
+        A reconstrução (varredura do índice de hashes) fica para quando as
+        entradas removidas passarem de BloomFilter.STALE_RATIO, ou para a
+        thread de manutenção.
+        """
+        bloom = self._bloom
+        if bloom is None or count <= 0:
+            return
+
+        bloom.mark_removed(count)
+        self._bloom_dirty = True
+        self._check_bloom_capacity()
+
+    def _check_bloom_capacity(self):
+        """Reconstrói o filtro quando passa da capacidade ou tem removidos demais"""
+        bloom = self._bloom
+        if bloom is not None and (bloom.is_saturated() or bloom.is_stale()):
+            self._rebuild_bloom()
+
+    @staticmethod
+    def _build_fts_query(search_term: str) -> Optional[str]:
+        """
+        Converte o termo digitado em uma consulta FTS5.
+
+        Trechos entre aspas viram busca por frase; as demais palavras viram
+        buscas por prefixo, combinadas com AND.
+
+        Args:
+            search_term: Texto digitado pelo usuário
+
+        Returns:
+            Consulta FTS5 ou None se não houver termos pesquisáveis
+        """
+        parts = []
+
+        for phrase, word in re.findall(r'"([^"]*)"|(\S+)', search_term):
+            if phrase:
+                if re.search(r'\w', phrase):
+                    parts.append('"' + phrase + '"')
+            elif word:
+                word = word.replace('"', '')
+                if re.search(r'\w', word):
+                    parts.append('"' + word + '"*')
+
+        return ' '.join(parts) if parts else None
+
+    def is_connected(self) -> bool:
+        """Verifica se está conectado a um banco de dados"""
         return self.conn is not None and self.db_path is not None
 
-    def get_db_path(self) -> Optional[str]:
-        """Retorna o caminho do banco de dados atual"""
-        return self.db_path
+    def get_db_path(self) -> Optional[str]:
+        """Retorna o caminho do banco de dados atual"""
+        return self.db_path
+
+    def get_write_epoch(self) -> int:
+        """
+        Contador de alterações em massa (carga, mesclagem, deltas, arquivo,
+        limpeza, troca de banco ou reset do diário).
+
+        Estruturas derivadas da memória inteira (como o índice de padrões do
+        SmartTranslator) devem ser refeitas quando o valor muda; gravações
+        individuais não alteram o contador.
+        """
+        return self._cache.resets
+
+    # Nomes reservados pelo SQLite ou usados internamente
+    _RESERVED_ALIASES = {'main', 'temp', 'merge_src', 'archive_db'}
+
+    def attach_memory(self, db_path: str, priority: Optional[int] = None,
+                      alias: Optional[str] = None) -> bool:
+        """
+        Anexa outra memória de tradução, somente para leitura.
+
+        Buscas exatas (get_translation, get_translations_batch) consultam a
+        memória principal e as anexadas em uma única query. A principal
+        sempre vence; entre as anexadas vence a de menor prioridade (empates
+        pela ordem em que foram anexadas). Escritas vão só para a principal.
+
+        Args:
+            db_path: Caminho do arquivo .db
+            priority: Prioridade (menor = consultada antes); padrão: última
+            alias: Nome do banco no SQLite (gerado se omitido)
+
+        Returns:
+            True se anexou com sucesso
+        """
+        if not self.is_connected():
+            return False
+
+        if not os.path.exists(db_path):
+            print(f"Erro ao anexar memória: arquivo não encontrado: {db_path}")
+            return False
+
+        path = os.path.abspath(db_path)
+        if os.path.abspath(self.db_path) == path or any(m['path'] == path for m in self._attached):
+            print(f"Memória já conectada: {db_path}")
+            return False
+
+        if alias is None:
+            alias = f'mem{self._attach_counter + 1}'
+        if (not re.fullmatch(r'[A-Za-z_][A-Za-z0-9_]*', alias)
+                or alias.lower() in self._RESERVED_ALIASES
+                or any(m['alias'].lower() == alias.lower() for m in self._attached)):
+            print(f"Erro ao anexar memória: alias inválido: {alias}")
+            return False
+
+        self._attach_counter += 1
+        memory = {
+            'alias': alias,
+            'path': path,
+            'priority': priority if priority is not None else len(self._attached) + 1,
+            'order': self._attach_counter
+        }
+
+        attached = sorted(self._attached + [memory], key=lambda m: (m['priority'], m['order']))
+        if not self._apply_attached(attached):
+            return False
+
+        # A tabela precisa existir (e ser legível) no arquivo anexado
+        try:
+            with self._write_lock():
+                self.cursor.execute(f'SELECT 1 FROM "{alias}".translations LIMIT 1')
+                self.cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"Erro ao anexar memória: {e}")
+            self._apply_attached([m for m in attached if m is not memory])
+            return False
+
+        return True
+
+    def detach_memory(self, db_path_or_alias: str) -> bool:
+        """
+        Remove uma memória anexada
+
+        Args:
+            db_path_or_alias: Caminho do arquivo ou alias usado no attach
+
+        Returns:
+            True se a memória estava anexada e foi removida
+        """
+        key = db_path_or_alias
+        path = os.path.abspath(key)
+        remaining = [m for m in self._attached if m['alias'] != key and m['path'] != path]
+
+        if len(remaining) == len(self._attached):
+            return False
+        return self._apply_attached(remaining)
+
+    def get_attached_memories(self) -> List[Dict]:
+        """
+        Lista as memórias anexadas em ordem de prioridade
+
+        Returns:
+            Lista de dicionários com alias, path e priority
+        """
+        return [{'alias': m['alias'], 'path': m['path'], 'priority': m['priority']}
+                for m in self._attached]
+
+    def _apply_attached(self, attached: List[Dict]) -> bool:
+        """Aplica a lista de memórias anexadas às conexões do pool"""
+        if not self.is_connected():
+            self._attached = attached
+            return True
+
+        try:
+            with self._write_lock():
+                self._pool.set_attachments(
+                    [(m['alias'], Path(m['path']).as_uri() + '?mode=ro') for m in attached]
+                )
+                self._attached = attached
+        except sqlite3.Error as e:
+            print(f"Erro ao anexar memória: {e}")
+            return False
+        finally:
+            # Resultados em cache (inclusive ausências) dependem das memórias anexadas
+            self._cache.clear()
+
+        return True
+
+    def _reattach_memories(self):
+        """Reaplica as memórias anexadas após conectar a outro arquivo principal"""
+        if not self._attached:
+            return
+
+        path = os.path.abspath(self.db_path)
+        kept = [m for m in self._attached if m['path'] != path and os.path.exists(m['path'])]
+        if not self._apply_attached(kept):
+            self._attached = []
+
+    @staticmethod
+    def _federated_query(attached: List[Dict], columns: str,
+                         main_where: str, attached_where: str) -> str:
+        """
+        Monta um UNION ALL sobre a memória principal e as anexadas.
+
+        Cada parte traz uma coluna source_rank (0 = principal) para resolver
+        a prioridade. As anexadas são buscadas pelo texto, já que podem ser
+        de versões sem a coluna de hash. A tabela translations de cada parte
+        tem o alias t.
+        """
+        parts = [f'SELECT {columns}, 0 AS source_rank FROM main.translations t '
+                 f'WHERE {main_where}']
+        for rank, memory in enumerate(attached, 1):
+            parts.append(
+                f'SELECT {columns}, {rank} FROM "{memory["alias"]}".translations t '
+                f'WHERE {attached_where}'
+            )
+        return ' UNION ALL '.join(parts)
+
+    def add_translation(self, original: str, translated: str,
+                       source_lang: str = 'en', target_lang: str = 'pt',
+                       category: str = 'general', notes: str = '') -> bool:
+        """
+        Adiciona ou atualiza uma tradução na memória
+
+        Args:
+            original: Texto original
+            translated: Texto traduzido
+            source_lang: Idioma de origem
+            target_lang: Idioma de destino
+            category: Categoria da tradução
+            notes: Notas adicionais
+
+        Returns:
+            True se a operação foi bem-sucedida
+        """
+        if not self.is_connected():
+            return False
+
+        try:
+            key_hash = text_hash(original)
+            self._bloom_add((key_hash,))
+
+            with self._get_cursor() as cursor:
+                cursor.execute(self._UPSERT_SQL, (original, translated, source_lang, target_lang,
+                                                  category, notes, key_hash, normalized_hash(original)))
+                self._sync_templates(cursor, [(original, translated)])
+            self._cache.write(original, translated)
+            self._check_bloom_capacity()
+
+            # Uma gravação adiada do mesmo texto ficou obsoleta
+            if self._deferred_writes:
+                with self._usage_lock:
+                    self._deferred_writes.pop(original, None)
+            return True
+        except Exception as e:
+            if _is_busy(e):
+                # Outro processo segurou o lock além das novas tentativas: a
+                # tradução fica no cache e é gravada no próximo flush_usage()
+                self._cache.write(original, translated)
+                with self._usage_lock:
+                    self._deferred_writes[original] = (translated, source_lang, target_lang,
+                                                       category, notes)
+                    self._schedule_flush()
+                print(f"Banco ocupado por outro processo, gravação adiada: {e}")
+                return True
+            print(f"Erro ao adicionar tradução: {e}")
+            return False
+
+    def _write_deferred(self) -> int:
+        """
+        Grava as traduções adiadas por SQLITE_BUSY em uma única transação.
+
+        Returns:
+            Quantidade de traduções gravadas
+        """
+        with self._usage_lock:
+            pending = self._deferred_writes
+            self._deferred_writes = {}
+
+        if not pending:
+            return 0
+
+        try:
+            with self._transaction() as cursor:
+                cursor.executemany(self._UPSERT_SQL, [
+                    (original, translated, source_lang, target_lang, category, notes,
+                     text_hash(original), normalized_hash(original))
+                    for original, (translated, source_lang, target_lang, category, notes)
+                    in pending.items()
+                ])
+                self._sync_templates(cursor, [(original, values[0])
+                                              for original, values in pending.items()])
+            return len(pending)
+        except Exception as e:
+            # Volta para a fila sem sobrescrever gravações adiadas mais novas
+            with self._usage_lock:
+                for original, values in pending.items():
+                    self._deferred_writes.setdefault(original, values)
+                self._schedule_flush()
+            print(f"Erro ao gravar traduções adiadas: {e}")
+            return 0
+
+    def flush_deferred(self, wait: Optional[float] = None) -> List[Tuple[str, str]]:
+        """
+        Grava as traduções adiadas por SQLITE_BUSY, tentando de novo (cada
+        tentativa com BEGIN IMMEDIATE e busy_timeout) por até wait segundos.
+
+        Args:
+            wait: Tempo máximo de insistência (None = DEFERRED_FLUSH_WAIT)
+
+        Returns:
+            Pares (original, tradução) que continuam sem gravação; vazio se
+            tudo foi gravado
+        """
+        deadline = time.monotonic() + (self.DEFERRED_FLUSH_WAIT if wait is None else wait)
+        while True:
+            if self.is_connected():
+                self._write_deferred()
+
+            with self._usage_lock:
+                if not self._deferred_writes:
+                    return []
+                remaining = [(original, values[0])
+                             for original, values in self._deferred_writes.items()]
+
+            if not self.is_connected() or time.monotonic() >= deadline:
+                return remaining
+            time.sleep(random.uniform(0, self.BUSY_BACKOFF_MAX))
+
+    def prime_cache(self, original: str, translated: str):
+        """
+        Registra no cache uma tradução cuja gravação ainda está pendente.
+
+        Usado pela fila de gravação assíncrona para que buscas enxerguem a
+        tradução antes de ela chegar ao banco.
+
+        Args:
+            original: Texto original
+            translated: Texto traduzido
+        """
+        self._cache.write(original, translated)
+
+    def discard_cached(self, original: str):
+        """
+        Tira do cache uma tradução primada que não chegou ao banco.
+
+        Args:
+            original: Texto original
+        """
+        self._cache.discard(original)
+
+    def add_translations_batch(self, translations: List[Tuple[str, str]],
+                               source_lang: str = 'en', target_lang: str = 'pt',
+                               category: str = 'general',
+                               rejected: Optional[List[Tuple[str, str]]] = None
+                               ) -> Tuple[int, int]:
+        """
+        Adiciona múltiplas traduções de uma vez (otimizado para grandes volumes).
+
+        10-100x mais rápido que inserções individuais para grandes lotes.
+
+        Args:
+            translations: Lista de tuplas (texto_original, texto_traduzido)
+            source_lang: Idioma de origem
+            target_lang: Idioma de destino
+            category: Categoria das traduções
+            rejected: Lista que recebe as linhas recusadas individualmente.
+                      Erros além delas vêm de uma transação desfeita (nada gravado)
+
+        Returns:
+            Tupla (inseridos_com_sucesso, erros)
+        """
+        if not self.is_connected() or not translations:
+            return (0, 0)
+
+        inserted = 0
+        errors = 0
+        written = []
+
+        try:
+            with self._transaction() as cursor:
+                for original, translated in translations:
+                    try:
+                        key_hash = text_hash(original)
+                        self._bloom_add((key_hash,))
+                        cursor.execute('''
+                            INSERT INTO translations
+                            (original_text, translated_text, source_language, target_language, category,
+                             original_hash, normalized_hash)
+                            VALUES (?, ?, ?, ?, ?, ?, ?)
+                            ON CONFLICT(original_text) DO UPDATE SET
+                                translated_text = excluded.translated_text,
+                                updated_at = CURRENT_TIMESTAMP,
+                                usage_count = usage_count + 1
+                        ''', (original, translated, source_lang, target_lang, category, key_hash,
+                              normalized_hash(original)))
+                        inserted += 1
+                        written.append((original, translated))
+                    except sqlite3.Error:
+                        errors += 1
+                        if rejected is not None:
+                            rejected.append((original, translated))
+
+                self._sync_templates(cursor, written)
+
+            for original, translated in written:
+                self._cache.write(original, translated)
+            self._check_bloom_capacity()
+
+            return (inserted, errors)
+        except Exception as e:
+            # A transação foi desfeita: nenhuma linha foi gravada
+            print(f"Erro ao adicionar traduções em lote: {e}")
+            if rejected is not None:
+                rejected.clear()
+            return (0, len(translations))
+
+    def bulk_import(self, rows: Iterable[Tuple[str, str]],
+                    source_lang: str = 'en', target_lang: str = 'pt',
+                    category: str = 'general',
+                    progress_callback: Optional[Callable[[int, Optional[int]], None]] = None,
+                    rebuild_indexes: Optional[bool] = None) -> Tuple[int, int]:
+        """
+        Carga em massa de traduções (centenas de milhares de linhas).
+
+        As linhas são lidas do iterável sob demanda e gravadas em lotes de
+        BULK_COMMIT_ROWS: cada lote vai com executemany para uma tabela
+        temporária e é mesclado em translations com um único
+        INSERT ... SELECT ... ON CONFLICT, em uma transação própria.
+        Em cargas muito grandes os índices secundários são removidos antes da
+        carga e recriados no final.
+
+        Args:
+            rows: Iterável de tuplas (texto_original, texto_traduzido)
+            source_lang: Idioma de origem
+            target_lang: Idioma de destino
+            category: Categoria das traduções
+            progress_callback: Função chamada com (linhas_processadas, total ou None)
+            rebuild_indexes: Força (True) ou impede (False) a recriação dos
+                             índices; None decide pelo tamanho da carga
+
+        Returns:
+            Tupla (importados, erros)
+        """
+        if not self.is_connected():
+            return (0, 0)
+
+        total = len(rows) if hasattr(rows, '__len__') else None
+        imported = 0
+        errors = 0
+
+        if rebuild_indexes is None:
+            rebuild_indexes = total is not None and total >= self.BULK_INDEX_REBUILD_THRESHOLD
+
+        try:
+            with self._writer_lease(), self._write_lock():
+                self.cursor.execute('''
+                    CREATE TEMP TABLE IF NOT EXISTS import_staging (
+                        original_text TEXT NOT NULL,
+                        translated_text TEXT NOT NULL,
+                        original_hash INTEGER
+                    )
+                ''')
+
+                if rebuild_indexes:
+                    with self._transaction() as cursor:
+                        for index_name in self.SECONDARY_INDEXES:
+                            cursor.execute(f'DROP INDEX IF EXISTS {index_name}')
+
+                try:
+                    batch = []
+                    for row in rows:
+                        try:
+                            original, translated = row[0], row[1]
+                        except (TypeError, IndexError):
+                            errors += 1
+                            continue
+
+                        if not isinstance(original, str) or not isinstance(translated, str) or not original:
+                            errors += 1
+                            continue
+
+                        batch.append((original, translated, text_hash(original)))
+                        if len(batch) >= self.BULK_COMMIT_ROWS:
+                            merged, failed = self._merge_staged_batch(batch, source_lang,
+                                                                      target_lang, category)
+                            imported += merged
+                            errors += failed
+                            batch = []
+                            if progress_callback:
+                                progress_callback(imported + errors, total)
+
+                    if batch:
+                        merged, failed = self._merge_staged_batch(batch, source_lang,
+                                                                  target_lang, category)
+                        imported += merged
+                        errors += failed
+                finally:
+                    if rebuild_indexes:
+                        with self._transaction() as cursor:
+                            for index_sql in self.SECONDARY_INDEXES.values():
+                                cursor.execute(index_sql)
+
+            self._cache.clear()
+            self._check_bloom_capacity()
+
+            if progress_callback:
+                progress_callback(imported + errors, total)
+
+            return (imported, errors)
+        except Exception as e:
+            self._cache.clear()
+            print(f"Erro na importação em massa: {e}")
+            return (imported, errors)
+
+    def _merge_staged_batch(self, batch: List[Tuple[str, str, int]], source_lang: str,
+                            target_lang: str, category: str) -> Tuple[int, int]:
+        """
+        Grava um lote da carga em massa em uma transação própria.
+
+        O lote vai para a tabela temporária com executemany e é mesclado com
+        um único INSERT ... SELECT ... ON CONFLICT.
+
+        Returns:
+            Tupla (mesclados, erros)
+        """
+        self._bloom_add(row[2] for row in batch)
+
+        try:
+            with self._transaction() as cursor:
+                for i in range(0, len(batch), self.BULK_CHUNK_SIZE):
+                    cursor.executemany('INSERT INTO import_staging VALUES (?, ?, ?)',
+                                       batch[i:i + self.BULK_CHUNK_SIZE])
+
+                cursor.execute('''
+                    INSERT INTO translations
+                    (original_text, translated_text, source_language, target_language, category,
+                     original_hash, normalized_hash)
+                    SELECT original_text, translated_text, ?, ?, ?, original_hash,
+                           tm_norm_hash(original_text)
+                    FROM import_staging
+                    WHERE true
+                    ORDER BY rowid
+                    ON CONFLICT(original_text) DO UPDATE SET
+                        translated_text = excluded.translated_text,
+                        updated_at = CURRENT_TIMESTAMP,
+                        usage_count = usage_count + 1
+                ''', (source_lang, target_lang, category))
+
+                cursor.execute('DELETE FROM import_staging')
+            return (len(batch), 0)
+        except sqlite3.Error as e:
+            print(f"Erro ao gravar lote da importação: {e}")
+            return (0, len(batch))
+
+    def merge_database(self, other_db_path: str,
+                       progress_callback: Optional[Callable[[int, Optional[int]], None]] = None
+                       ) -> Tuple[int, int]:
+        """
+        Mescla outra memória de tradução (.db) nesta.
+
+        Usa ATTACH e INSERT ... SELECT em faixas de id dentro de uma única
+        transação. Em conflitos vence a tradução atualizada mais recentemente.
+
+        Args:
+            other_db_path: Caminho do banco a ser mesclado
+            progress_callback: Função chamada com (linhas_processadas, total)
+
+        Returns:
+            Tupla (linhas inseridas ou atualizadas, erros)
+        """
+        if not self.is_connected():
+            return (0, 0)
+
+        if not os.path.exists(other_db_path):
+            print(f"Erro ao mesclar memória: arquivo não encontrado: {other_db_path}")
+            return (0, 0)
+
+        try:
+            with self._writer_lease(), self._write_lock():
+                self.cursor.execute('ATTACH DATABASE ? AS merge_src', (other_db_path,))
+                try:
+                    self.cursor.execute('SELECT COUNT(*), MIN(id), MAX(id) FROM merge_src.translations')
+                    total, min_id, max_id = self.cursor.fetchone()
+                    merged = 0
+
+                    with self._transaction() as cursor:
+                        if total:
+                            processed = 0
+                            for start in range(min_id, max_id + 1, self.BULK_CHUNK_SIZE):
+                                end = start + self.BULK_CHUNK_SIZE - 1
+                                cursor.execute('''
+                                    INSERT INTO translations
+                                    (original_text, translated_text, source_language, target_language,
+                                     category, notes, created_at, updated_at, usage_count, original_hash,
+                                     normalized_hash)
+                                    SELECT original_text, translated_text, source_language, target_language,
+                                           category, notes, created_at, updated_at, usage_count,
+                                           tm_hash(original_text), tm_norm_hash(original_text)
+                                    FROM merge_src.translations
+                                    WHERE id BETWEEN ? AND ?
+                                    ORDER BY id
+                                    ON CONFLICT(original_text) DO UPDATE SET
+                                        translated_text = excluded.translated_text,
+                                        category = excluded.category,
+                                        notes = excluded.notes,
+                                        updated_at = excluded.updated_at,
+                                        usage_count = MAX(usage_count, excluded.usage_count)
+                                    WHERE excluded.updated_at > translations.updated_at
+                                ''', (start, end))
+                                merged += max(cursor.rowcount, 0)
+
+                                if progress_callback:
+                                    cursor.execute(
+                                        'SELECT COUNT(*) FROM merge_src.translations WHERE id BETWEEN ? AND ?',
+                                        (start, end)
+                                    )
+                                    processed += cursor.fetchone()[0]
+                                    progress_callback(processed, total)
+                finally:
+                    self.cursor.execute('DETACH DATABASE merge_src')
+
+            self._cache.clear()
+            if merged:
+                self._rebuild_bloom()
+            return (merged, 0)
+        except Exception as e:
+            print(f"Erro ao mesclar memória: {e}")
+            return (0, 1)
+
+    def _default_archive_path(self) -> str:
+        """Caminho padrão do arquivo: <banco>_archive.db ao lado do banco"""
+        return os.path.splitext(os.path.abspath(self.db_path))[0] + '_archive.db'
+
+    def open_archive(self, archive_path: Optional[str] = None) -> bool:
+        """
+        Abre (ou cria) o banco de arquivo desta memória.
+
+        O arquivo é outra TranslationMemory, com cache e filtro de Bloom
+        próprios, consultada quando a camada principal não tem o texto. O
+        caminho fica gravado em metadata e é reaberto ao reconectar.
+
+        Args:
+            archive_path: Caminho do arquivo (None = <banco>_archive.db)
+
+        Returns:
+            True se o arquivo está aberto
+        """
+        if not self.is_connected():
+            return False
+
+        path = os.path.abspath(archive_path or self._default_archive_path())
+        if path == os.path.abspath(self.db_path):
+            print("Erro ao abrir arquivo: o arquivo não pode ser o próprio banco")
+            return False
+        if self._archive is not None and self._archive.db_path == path:
+            return True
+
+        self._release_archive()
+        archive = TranslationMemory(path, track_usage=False)
+        if not archive.is_connected():
+            return False
+
+        try:
+            # O escritor grava no arquivo ao arquivar e ao promover
+            with self._write_lock():
+                self.cursor.execute('ATTACH DATABASE ? AS archive_db', (Path(path).as_uri(),))
+            with self._get_cursor() as cursor:
+                cursor.execute('''
+                    INSERT OR REPLACE INTO metadata (key, value) VALUES ('archive_path', ?)
+                ''', (path,))
+        except Exception as e:
+            print(f"Erro ao abrir arquivo: {e}")
+            self._release_archive(archive)
+            return False
+
+        self._archive = archive
+        # Ausências já registradas podem estar no arquivo
+        self._cache.clear_negative()
+        return True
+
+    def close_archive(self) -> bool:
+        """
+        Deixa de usar o banco de arquivo (as traduções continuam nele).
+
+        Returns:
+            True se havia um arquivo aberto
+        """
+        if self._archive is None:
+            return False
 
-    def add_translation(self, original: str, translated: str,
-                       source_lang: str = 'en', target_lang: str = 'pt',
-                       category: str = 'general', notes: str = '') -> bool:
+        self._promote_pending()
+        self._release_archive()
+        try:
+            with self._get_cursor() as cursor:
+                cursor.execute("DELETE FROM metadata WHERE key = 'archive_path'")
+        except Exception as e:
+            print(f"Erro ao fechar arquivo: {e}")
+        self._cache.clear()
+        return True
+
+    def get_archive_path(self) -> Optional[str]:
+        """Retorna o caminho do banco de arquivo aberto"""
+        return self._archive.db_path if self._archive is not None else None
+
+    def _release_archive(self, archive: Optional['TranslationMemory'] = None):
+        """Desanexa e fecha o arquivo sem alterar metadata"""
+        archive = archive or self._archive
+        self._archive = None
+        if archive is None:
+            return
+
+        if self.is_connected():
+            with self._write_lock():
+                try:
+                    self.cursor.execute('DETACH DATABASE archive_db')
+                except sqlite3.Error:
+                    pass
+        archive.close()
+
+    def _reopen_archive(self):
+        """Reabre o arquivo registrado em metadata ao conectar"""
+        self.cursor.execute("SELECT value FROM metadata WHERE key = 'archive_path'")
+        row = self.cursor.fetchone()
+        if row is None:
+            return
+
+        if os.path.exists(row[0]):
+            self.open_archive(row[0])
+        else:
+            print(f"Aviso: arquivo da memória não encontrado: {row[0]}")
+
+    def archive_entries(self, max_usage: Optional[int] = 1,
+                        older_than_days: Optional[float] = None,
+                        vacuum: bool = True,
+                        progress_callback: Optional[Callable[[int, Optional[int]], None]] = None
+                        ) -> int:
         """
-        Adiciona ou atualiza uma tradução na memória
+        Move traduções pouco usadas para o banco de arquivo.
+
+        As linhas são copiadas e removidas da camada principal em faixas de
+        id, uma transação por faixa. Com os dois critérios, a linha precisa
+        atender a ambos. Abre o arquivo padrão se nenhum estiver aberto.
+
+        Args:
+            max_usage: Arquiva linhas com usage_count até este valor (None = ignora)
+            older_than_days: Arquiva linhas sem atualização há mais dias que
+                             este valor (None = ignora)
+            vacuum: Recupera o espaço liberado na camada principal
+            progress_callback: Função chamada com (ids_processados, total_de_ids)
+
+        Returns:
+            Quantidade de traduções arquivadas
+        """
+        if not self.is_connected():
+            return 0
+
+        conditions = []
+        params: List = []
+        if max_usage is not None:
+            conditions.append('usage_count <= ?')
+            params.append(max_usage)
+        if older_than_days is not None:
+            conditions.append("updated_at < datetime('now', ?)")
+            params.append(f'-{older_than_days} days')
+        if not conditions:
+            print("Erro ao arquivar: informe max_usage e/ou older_than_days")
+            return 0
+
+        if self._archive is None and not self.open_archive():
+            return 0
+
+        # Contadores e promoções pendentes entram no critério
+        self.flush_usage()
+
+        where = ' AND '.join(conditions)
+        columns = ('original_text, translated_text, source_language, target_language, category, '
+                   'notes, created_at, updated_at, usage_count, original_hash, normalized_hash')
+        archive = self._archive
+        moved = 0
+
+        try:
+            with self._writer_lease(), self._write_lock():
+                self.cursor.execute('SELECT MIN(id), MAX(id) FROM translations')
+                min_id, max_id = self.cursor.fetchone()
+
+                if min_id is not None:
+                    for start in range(min_id, max_id + 1, self.BULK_COMMIT_ROWS):
+                        bounds = (start, start + self.BULK_COMMIT_ROWS - 1)
+                        with self._transaction() as cursor:
+                            cursor.execute(f'''
+                                SELECT original_hash FROM main.translations
+                                WHERE id BETWEEN ? AND ? AND {where}
+                            ''', bounds + tuple(params))
+                            hashes = [row[0] for row in cursor.fetchall()]
+
+                            if hashes:
+                                # Filtro do arquivo atualizado antes da gravação
+                                archive._bloom_add(hashes)
+                                cursor.execute(f'''
+                                    INSERT INTO archive_db.translations ({columns})
+                                    SELECT {columns} FROM main.translations
+                                    WHERE id BETWEEN ? AND ? AND {where}
+                                    ORDER BY id
+                                    ON CONFLICT(original_text) DO UPDATE SET
+                                        translated_text = excluded.translated_text,
+                                        category = excluded.category,
+                                        notes = excluded.notes,
+                                        updated_at = excluded.updated_at,
+                                        usage_count = excluded.usage_count
+                                ''', bounds + tuple(params))
+                                cursor.execute(f'''
+                                    DELETE FROM main.translations
+                                    WHERE id BETWEEN ? AND ? AND {where}
+                                ''', bounds + tuple(params))
+                                moved += cursor.rowcount
+
+                        if progress_callback:
+                            progress_callback(min(bounds[1], max_id) - min_id + 1, max_id - min_id + 1)
+        except Exception as e:
+            print(f"Erro ao arquivar traduções: {e}")
+
+        archive._cache.clear()
+        archive._check_bloom_capacity()
+        self._cache.clear()
+        if moved:
+            self._rebuild_bloom()
+            if vacuum:
+                self.vacuum()
+        return moved
+
+    def _archive_rows(self, originals: List[str], found_rows: Dict[str, tuple]):
+        """
+        Completa uma busca em lote com o arquivo.
+
+        Os achados entram em found_rows no formato da busca principal
+        (texto, tradução, usos, categoria, source_rank 0) e são agendados
+        para promoção.
+        """
+        if not originals:
+            return
+
+        for original, data in self._archive.get_translations_batch(originals, with_metadata=True).items():
+            found_rows[original] = (original, data['translated_text'], data['usage_count'],
+                                    data['category'], 0)
+            self._queue_promotion(original)
+
+    def _queue_promotion(self, original: str):
+        """
+        Agenda a volta de uma tradução do arquivo para a camada principal.
+
+        Como os contadores de uso, a promoção é gravada depois, em lote, para
+        que a busca continue sem escrita.
+        """
+        with self._usage_lock:
+            self._pending_promotions[original] = text_hash(original)
+            flush_now = len(self._pending_promotions) >= self.PROMOTION_FLUSH_THRESHOLD
+            if not flush_now:
+                self._schedule_flush()
+
+        if flush_now:
+            self.flush_usage()
+
+    def _promote_pending(self) -> int:
+        """
+        Move as traduções agendadas do arquivo de volta para a camada principal.
+
+        Returns:
+            Quantidade de traduções promovidas
+        """
+        with self._usage_lock:
+            pending = self._pending_promotions
+            self._pending_promotions = {}
+
+        archive = self._archive
+        if not pending or archive is None or not self.is_connected():
+            return 0
+
+        params = [(key_hash, original) for original, key_hash in pending.items()]
+        self._bloom_add(pending.values())
+
+        try:
+            with self._transaction() as cursor:
+                cursor.executemany('''
+                    INSERT INTO main.translations
+                    (original_text, translated_text, source_language, target_language, category,
+                     notes, created_at, updated_at, usage_count, original_hash, normalized_hash)
+                    SELECT original_text, translated_text, source_language, target_language, category,
+                           notes, created_at, updated_at, usage_count, original_hash, normalized_hash
+                    FROM archive_db.translations
+                    WHERE original_hash = ? AND +original_text = ?
+                    ON CONFLICT(original_text) DO NOTHING
+                ''', params)
+                cursor.executemany('''
+                    DELETE FROM archive_db.translations
+                    WHERE original_hash = ? AND +original_text = ?
+                ''', params)
+
+            for original in pending:
+                archive._cache.discard(original)
+            archive._bloom_dirty = True
+            self._promotions += len(pending)
+            self._check_bloom_capacity()
+            return len(pending)
+        except Exception as e:
+            # Voltam a ser agendadas no próximo acerto no arquivo
+            print(f"Erro ao promover traduções do arquivo: {e}")
+            return 0
+
+    def _archive_stats(self) -> dict:
+        """Métricas da camada de arquivo (zeradas se não houver)"""
+        archive = self._archive
+        return {
+            'archived_translations': archive.get_stats()['total_translations'] if archive else 0,
+            'archive_promotions': self._promotions
+        }
+
+    def get_translation(self, original: str) -> Optional[str]:
+        """
+        Busca uma tradução na memória
+
+        Args:
+            original: Texto original
+
+        Returns:
+            Texto traduzido ou None se não encontrado
+        """
+        if not self.is_connected():
+            return None
+
+        found, cached = self._cache.get(original)
+        if found:
+            if cached is not None:
+                self._record_usage(original)
+            return cached
+
+        key_hash = text_hash(original)
+        attached = self._attached
+
+        # O filtro só cobre a memória principal
+        excluded = not attached and self._bloom_excludes(key_hash)
+        if excluded and self._archive is None:
+            return None
+
+        try:
+            generation = self._cache.generation
+            result = None
+
+            if not excluded:
+                # Leitura pura: nenhuma escrita ou commit no caminho da busca
+                with self._read_cursor() as cursor:
+                    # O hash localiza a linha; o "+" impede que o SQLite troque
+                    # para o índice do texto, e a comparação confirma o texto
+                    if attached:
+                        union = self._federated_query(
+                            attached, 'translated_text',
+                            'original_hash = ? AND +original_text = ?', 'original_text = ?'
+                        )
+                        cursor.execute(
+                            f'SELECT translated_text, source_rank FROM ({union}) '
+                            f'ORDER BY source_rank LIMIT 1',
+                            (key_hash, original) + (original,) * len(attached)
+                        )
+                    else:
+                        cursor.execute('''
+                            SELECT translated_text, 0 FROM translations
+                            WHERE original_hash = ? AND +original_text = ?
+                        ''', (key_hash, original))
+
+                    result = cursor.fetchone()
+
+            # Falta na camada principal: o arquivo vem antes das anexadas
+            if (result is None or result[1] > 0) and self._archive is not None:
+                archived = self._archive.get_translation(original)
+                if archived is not None:
+                    self._queue_promotion(original)
+                    result = (archived, 0)
+
+            if result:
+                self._cache.put(original, result[0], generation)
+
+                # Incremento de uso é acumulado e gravado depois em lote
+                self._record_usage(original)
+                return result[0]
+
+            self._cache.put_negative(original, generation)
+            return None
+        except Exception as e:
+            print(f"Erro ao buscar tradução: {e}")
+            return None
+
+    def get_normalized_translation(self, text: str) -> Optional[Tuple[str, str]]:
+        """
+        Busca tolerante a espaços nas pontas, espaços repetidos, quebras de
+        linha e maiúsculas (ver normalized_key).
+
+        Usada depois que a busca exata falha. Quem chama é responsável por
+        reaplicar a forma do texto consultado na tradução devolvida.
+
+        Args:
+            text: Texto original na forma em que apareceu no arquivo
+
+        Returns:
+            Tupla (original armazenado, tradução) ou None. Entre variantes
+            armazenadas, vence a mais usada.
+        """
+        if not self.is_connected():
+            return None
+
+        key = normalized_key(text)
+        if not key:
+            return None
+
+        try:
+            with self._read_cursor() as cursor:
+                cursor.execute('''
+                    SELECT original_text, translated_text FROM translations
+                    WHERE normalized_hash = ?
+                    ORDER BY usage_count DESC
+                ''', (text_hash(key),))
+                rows = cursor.fetchall()
+
+            # O hash pode colidir: a chave é conferida no Python
+            for original, translated in rows:
+                if normalized_key(original) == key:
+                    self._record_usage(original)
+                    return (original, translated)
+
+            if self._archive is not None:
+                archived = self._archive.get_normalized_translation(text)
+                if archived is not None:
+                    self._queue_promotion(archived[0])
+                    return archived
+            return None
+        except Exception as e:
+            print(f"Erro ao buscar tradução normalizada: {e}")
+            return None
+
+    # ========================================================================
+    # MODELOS NUMÉRICOS
+    # ========================================================================
+
+    # Grava ou atualiza um modelo; sem escrita quando o modelo traduzido não mudou
+    _TEMPLATE_UPSERT_SQL = '''
+        INSERT INTO translation_templates
+        (skeleton, slot_types, skeleton_key, translated_template)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(skeleton, slot_types) DO UPDATE SET
+            translated_template = excluded.translated_template,
+            usage_count = usage_count + 1,
+            updated_at = CURRENT_TIMESTAMP
+        WHERE translated_template IS NOT excluded.translated_template
+    '''
+
+    def add_template(self, original: str, translated: str) -> bool:
+        """
+        Aprende o modelo numérico de um par original/tradução.
+
+        "Wave 3 of 10" -> "Onda 3 de 10" grava "Wave {0} of {1}" ->
+        "Onda {0} de {1}". Pares que não generalizam (sem números, ou com
+        números que não aparecem dos dois lados) são ignorados. As gravações
+        de traduções (add_translation, add_translations_batch) já mantêm os
+        modelos; este método serve para pares que não vão para a memória.
 
         Args:
             original: Texto original
             translated: Texto traduzido
-            source_lang: Idioma de origem
-            target_lang: Idioma de destino
-            category: Categoria da tradução
-            notes: Notas adicionais
 
         Returns:
-            True se a operação foi bem-sucedida
+            True se o modelo está gravado
         """
         if not self.is_connected():
             return False
 
+        source = extract_template(original)
+        target = build_translated_template(original, translated) if source else None
+        if target is None:
+            return False
+
+        # Modelo igual ao gravado: nenhuma transação
+        key = (source.skeleton, source.slot_types)
+        stored = self.get_templates_batch([key]).get(key)
+        if stored == (source.skeleton, target.skeleton):
+            return True
+
         try:
             with self._get_cursor() as cursor:
-                cursor.execute('''
-                    INSERT INTO translations
-                    (original_text, translated_text, source_language, target_language, category, notes)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                    ON CONFLICT(original_text) DO UPDATE SET
-                        translated_text = excluded.translated_text,
-                        updated_at = CURRENT_TIMESTAMP,
-                        usage_count = usage_count + 1,
-                        category = excluded.category,
-                        notes = excluded.notes
-                ''', (original, translated, source_lang, target_lang, category, notes))
+                cursor.execute(self._TEMPLATE_UPSERT_SQL, (
+                    source.skeleton, source.slot_types,
+                    template_key(source.skeleton, source.slot_types), target.skeleton
+                ))
             return True
         except Exception as e:
-            print(f"Erro ao adicionar tradução: {e}")
+            print(f"Erro ao gravar modelo: {e}")
             return False
 
-    def add_translations_batch(self, translations: List[Tuple[str, str]],
-                               source_lang: str = 'en', target_lang: str = 'pt',
-                               category: str = 'general') -> Tuple[int, int]:
+    def _sync_templates(self, cursor, pairs: List[Tuple[str, str]]):
         """
-        Adiciona múltiplas traduções de uma vez (otimizado para grandes volumes).
+        Mantém os modelos de acordo com as traduções gravadas (na mesma transação).
 
-        10-100x mais rápido que inserções individuais para grandes lotes.
+        O par que gera um modelo o grava ou atualiza e fica registrado em
+        template_sources; o que deixou de gerar (tradução editada sem os
+        números) sai de lá, e o modelo só é removido se nenhuma outra linha
+        ainda o produz.
 
         Args:
-            translations: Lista de tuplas (texto_original, texto_traduzido)
-            source_lang: Idioma de origem
-            target_lang: Idioma de destino
-            category: Categoria das traduções
+            cursor: Cursor da transação de escrita
+            pairs: Pares (original, tradução) gravados
+        """
+        upserts: Dict[Tuple[str, str], str] = {}
+        sources: Dict[int, Tuple[str, str]] = {}
+        dropped: Dict[int, Tuple[str, str]] = {}
+        for original, translated in pairs:
+            source = extract_template(original)
+            if source is None:
+                continue
+            key = (source.skeleton, source.slot_types)
+            key_hash = text_hash(original)
+            target = build_translated_template(original, translated)
+            if target is not None:
+                upserts[key] = target.skeleton
+                sources[key_hash] = key
+                dropped.pop(key_hash, None)
+            else:
+                dropped[key_hash] = key
+                sources.pop(key_hash, None)
+
+        if upserts:
+            cursor.executemany(self._TEMPLATE_UPSERT_SQL, [
+                (skeleton, slot_types, template_key(skeleton, slot_types), translated)
+                for (skeleton, slot_types), translated in upserts.items()
+            ])
+            cursor.executemany('INSERT OR REPLACE INTO template_sources VALUES (?, ?, ?)',
+                               [(key_hash, *key) for key_hash, key in sources.items()])
+        self._drop_template_sources(cursor, dropped)
+
+    def _forget_templates(self, cursor, originals: List[str]):
+        """
+        Trata os modelos de textos removidos: cada um fica se outra linha
+        ainda o produz, senão sai.
+
+        Args:
+            cursor: Cursor da transação de escrita
+            originals: Textos originais removidos
+        """
+        dropped: Dict[int, Tuple[str, str]] = {}
+        for original in originals:
+            source = extract_template(original)
+            if source is not None:
+                dropped[text_hash(original)] = (source.skeleton, source.slot_types)
+        self._drop_template_sources(cursor, dropped)
+
+    def _drop_template_sources(self, cursor, dropped: Dict[int, Tuple[str, str]]):
+        """
+        Tira linhas de template_sources e remove os modelos que ficaram sem
+        nenhuma. Se outra linha ainda produz o modelo, ele passa a ser o dela
+        (a linha tirada podia ser a que definiu o modelo traduzido).
+
+        Args:
+            cursor: Cursor da transação de escrita
+            dropped: {hash do original: (modelo, tipos)} das linhas que saem
+        """
+        if not dropped:
+            return
+
+        cursor.executemany('DELETE FROM template_sources WHERE original_hash = ?',
+                           [(key_hash,) for key_hash in dropped])
+
+        for skeleton, slot_types in set(dropped.values()):
+            # Linhas restantes pelo índice de template_sources; a que sumiu
+            # por outro caminho (arquivo, aplicação de alterações) é ignorada
+            cursor.execute('''
+                SELECT t.original_text, t.translated_text
+                FROM template_sources s
+                JOIN translations t ON t.original_hash = s.original_hash
+                WHERE s.skeleton = ? AND s.slot_types = ?
+            ''', (skeleton, slot_types))
+
+            target = None
+            for row_original, row_translated in cursor:
+                source = extract_template(row_original)
+                if source is None or (source.skeleton, source.slot_types) != (skeleton, slot_types):
+                    continue
+                target = build_translated_template(row_original, row_translated)
+                if target is not None:
+                    break
+
+            if target is None:
+                cursor.execute(
+                    'DELETE FROM translation_templates WHERE skeleton = ? AND slot_types = ?',
+                    (skeleton, slot_types)
+                )
+                cursor.execute(
+                    'DELETE FROM template_sources WHERE skeleton = ? AND slot_types = ?',
+                    (skeleton, slot_types)
+                )
+            else:
+                cursor.execute(self._TEMPLATE_UPSERT_SQL, (
+                    skeleton, slot_types, template_key(skeleton, slot_types), target.skeleton
+                ))
+
+    def _forget_learned(self, cursor, originals: List[str]):
+        """
+        Remove os padrões aprendidos dos textos editados ou removidos.
+
+        Eles voltam a ser aprendidos por learn_pattern.
+
+        Args:
+            cursor: Cursor da transação de escrita
+            originals: Textos originais alterados
+        """
+        bases = {match.group(1).strip()
+                 for match in map(NUMBERED_TEXT_PATTERN.match, originals) if match}
+        if bases:
+            cursor.executemany('DELETE FROM learned_patterns WHERE base_text = ?',
+                               [(base,) for base in bases])
+            if self._learned_patterns is not None:
+                for base in bases:
+                    self._learned_patterns.pop(base, None)
+
+    def get_templates_batch(self, templates: List[Tuple[str, str]]
+                            ) -> Dict[Tuple[str, str], Tuple[str, str]]:
+        """
+        Busca modelos traduzidos pela forma normalizada.
+
+        Args:
+            templates: Lista de (modelo, tipos das posições), como em
+                       translation_templates.extract_template
 
         Returns:
-            Tupla (inseridos_com_sucesso, erros)
+            Dicionário {(modelo, tipos): (modelo armazenado, modelo traduzido)};
+            entre variantes de forma vence a mais usada
         """
-        if not self.is_connected() or not translations:
-            return (0, 0)
+        if not self.is_connected() or not templates:
+            return {}
 
-        inserted = 0
-        errors = 0
+        wanted: Dict[int, List[Tuple[str, str]]] = {}
+        for skeleton, slot_types in dict.fromkeys(templates):
+            wanted.setdefault(template_key(skeleton, slot_types), []).append((skeleton, slot_types))
 
+        results = {}
+        keys = list(wanted)
         try:
-            with self._transaction() as cursor:
-                for original, translated in translations:
-                    try:
-                        cursor.execute('''
-                            INSERT INTO translations
-                            (original_text, translated_text, source_language, target_language, category)
-                            VALUES (?, ?, ?, ?, ?)
-                            ON CONFLICT(original_text) DO UPDATE SET
-                                translated_text = excluded.translated_text,
-                                updated_at = CURRENT_TIMESTAMP,
-                                usage_count = usage_count + 1
-                        ''', (original, translated, source_lang, target_lang, category))
-                        inserted += 1
-                    except sqlite3.Error:
-                        errors += 1
+            with self._read_cursor() as cursor:
+                for i in range(0, len(keys), 500):
+                    chunk = keys[i:i + 500]
+                    placeholders = ', '.join('?' for _ in chunk)
+                    cursor.execute(f'''
+                        SELECT skeleton_key, skeleton, slot_types, translated_template
+                        FROM translation_templates
+                        WHERE skeleton_key IN ({placeholders})
+                        ORDER BY usage_count DESC
+                    ''', chunk)
+                    for key, skeleton, slot_types, translated in cursor.fetchall():
+                        # O hash pode colidir: confere a forma normalizada e os tipos
+                        for requested in wanted[key]:
+                            if (requested not in results and requested[1] == slot_types
+                                    and normalized_key(requested[0]) == normalized_key(skeleton)):
+                                results[requested] = (skeleton, translated)
+            return results
+        except Exception as e:
+            print(f"Erro ao buscar modelos: {e}")
+            return {}
 
-            return (inserted, errors)
+    def build_templates(self,
+                        progress_callback: Optional[Callable[[int, Optional[int]], None]] = None
+                        ) -> int:
+        """
+        Deduz modelos das traduções já existentes (mais usadas primeiro).
+
+        Modelos já gravados não são substituídos: valem os mantidos pelas
+        gravações de traduções, que refletem edições mais recentes.
+
+        Args:
+            progress_callback: Função chamada com (linhas_lidas, total)
+
+        Returns:
+            Quantidade de modelos novos
+        """
+        if not self.is_connected():
+            return 0
+
+        total = self.get_stats()['total_translations']
+        learned: Dict[Tuple[str, str], str] = {}
+        sources: List[Tuple[int, str, str]] = []
+        processed = 0
+        for row in self.iter_translations(order='usage', page_size=5000):
+            processed += 1
+            if progress_callback and processed % self.BULK_CHUNK_SIZE == 0:
+                progress_callback(processed, total)
+
+            source = extract_template(row.original_text)
+            if source is None:
+                continue
+            target = build_translated_template(row.original_text, row.translated_text)
+            if target is not None:
+                key = (source.skeleton, source.slot_types)
+                learned.setdefault(key, target.skeleton)
+                sources.append((text_hash(row.original_text), *key))
+
+        params = [(skeleton, slot_types, template_key(skeleton, slot_types), translated)
+                  for (skeleton, slot_types), translated in learned.items()]
+        try:
+            with self._writer_lease(), self._transaction() as cursor:
+                cursor.execute('SELECT COUNT(*) FROM translation_templates')
+                before = cursor.fetchone()[0]
+                for i in range(0, len(params), self.BULK_CHUNK_SIZE):
+                    cursor.executemany('''
+                        INSERT INTO translation_templates
+                        (skeleton, slot_types, skeleton_key, translated_template)
+                        VALUES (?, ?, ?, ?)
+                        ON CONFLICT(skeleton, slot_types) DO NOTHING
+                    ''', params[i:i + self.BULK_CHUNK_SIZE])
+                cursor.execute('SELECT COUNT(*) FROM translation_templates')
+                added = cursor.fetchone()[0] - before
+                for i in range(0, len(sources), self.BULK_CHUNK_SIZE):
+                    cursor.executemany('INSERT OR REPLACE INTO template_sources VALUES (?, ?, ?)',
+                                       sources[i:i + self.BULK_CHUNK_SIZE])
+
+            if progress_callback:
+                progress_callback(processed, total)
+            return added
         except Exception as e:
-            print(f"Erro ao adicionar traduções em lote: {e}")
-            return (inserted, errors)
+            print(f"Erro ao gerar modelos: {e}")
+            return 0
 
-    def get_translation(self, original: str) -> Optional[str]:
+    # ========================================================================
+    # PADRÕES APRENDIDOS
+    # ========================================================================
+
+    @staticmethod
+    def _read_learned_signature(cursor) -> Tuple[int, int]:
+        """Assinatura (linhas, maior revisão) da tabela de padrões aprendidos"""
+        cursor.execute('SELECT COUNT(*), IFNULL(MAX(revision), 0) FROM learned_patterns')
+        return tuple(cursor.fetchone())
+
+    def get_learned_patterns(self) -> Dict[str, Tuple[str, str]]:
         """
-        Busca uma tradução na memória
+        Retorna os padrões aprendidos, carregando o índice na primeira consulta.
+
+        Returns:
+            Dicionário {base original: (base traduzida, separador)}
+        """
+        if not self.is_connected():
+            return {}
+
+        patterns = self._learned_patterns
+        if patterns is not None:
+            return patterns
+
+        try:
+            with self._read_cursor() as cursor:
+                signature = self._read_learned_signature(cursor)
+                cursor.execute('SELECT base_text, translated_base, separator FROM learned_patterns')
+                patterns = {base: (translated, separator)
+                            for base, translated, separator in cursor.fetchall()}
+            self._learned_signature = signature
+            self._learned_patterns = patterns
+            return patterns
+        except Exception as e:
+            print(f"Erro ao carregar padrões aprendidos: {e}")
+            return {}
+
+    def get_learned_pattern(self, base_text: str) -> Optional[Tuple[str, str]]:
+        """
+        Busca um padrão aprendido no índice em memória.
 
         Args:
-            original: Texto original
+            base_text: Texto base original (sem o número)
 
         Returns:
-            Texto traduzido ou None se não encontrado
+            Tupla (base traduzida, separador) ou None
+        """
+        return self.get_learned_patterns().get(base_text)
+
+    def add_learned_pattern(self, base_text: str, translated_base: str,
+                            separator: str = ' ') -> bool:
+        """
+        Grava um padrão aprendido ("Soldier" -> "Soldado").
+
+        Outras instâncias no mesmo banco o veem ao conectar ou no próximo
+        poll_changes.
+
+        Args:
+            base_text: Texto base original (sem o número)
+            translated_base: Texto base traduzido
+            separator: Separador entre a base traduzida e o número
+
+        Returns:
+            True se gravou com sucesso
+        """
+        if not self.is_connected() or not base_text:
+            return False
+
+        if self.get_learned_pattern(base_text) == (translated_base, separator):
+            return True
+
+        return self.add_learned_patterns_batch([(base_text, translated_base, separator)])
+
+    def add_learned_patterns_batch(self, patterns: List[Tuple[str, str, str]]) -> bool:
+        """
+        Grava vários padrões aprendidos em uma transação (usado pela fila de
+        gravação assíncrona).
+
+        Args:
+            patterns: Lista de (base original, base traduzida, separador)
+
+        Returns:
+            True se gravou com sucesso
         """
         if not self.is_connected():
-            return None
+            return False
+        if not patterns:
+            return True
 
         try:
             with self._get_cursor() as cursor:
-                cursor.execute('''
-                    SELECT translated_text FROM translations
-                    WHERE original_text = ?
-                ''', (original,))
+                # Cada linha recebe a revisão seguinte à maior já gravada
+                cursor.executemany('''
+                    INSERT INTO learned_patterns (base_text, translated_base, separator, revision)
+                    VALUES (?, ?, ?, (SELECT IFNULL(MAX(revision), 0) + 1 FROM learned_patterns))
+                    ON CONFLICT(base_text) DO UPDATE SET
+                        translated_base = excluded.translated_base,
+                        separator = excluded.separator,
+                        revision = excluded.revision,
+                        updated_at = CURRENT_TIMESTAMP
+                ''', patterns)
+
+            if self._learned_patterns is not None:
+                for base_text, translated_base, separator in patterns:
+                    self._learned_patterns[base_text] = (translated_base, separator)
+            return True
+        except Exception as e:
+            print(f"Erro ao gravar padrões aprendidos: {e}")
+            return False
+
+    def prime_learned_pattern(self, base_text: str, translated_base: str,
+                              separator: str = ' '):
+        """
+        Registra no índice em memória um padrão cuja gravação ainda está
+        pendente na fila de gravação assíncrona.
 
-                result = cursor.fetchone()
+        Args:
+            base_text: Texto base original (sem o número)
+            translated_base: Texto base traduzido
+            separator: Separador entre a base traduzida e o número
+        """
+        self.get_learned_patterns()
+        if self._learned_patterns is not None:
+            self._learned_patterns[base_text] = (translated_base, separator)
 
-                if result:
-                    # Incrementa contador de uso
-                    cursor.execute('''
-                        UPDATE translations
-                        SET usage_count = usage_count + 1
-                        WHERE original_text = ?
-                    ''', (original,))
+    def record_usage(self, originals: Iterable[str]):
+        """
+        Conta um uso para cada texto encontrado por get_translations_batch,
+        que por padrão não altera contadores (ver SmartTranslator.translate_many).
 
-                    return result[0]
+        Args:
+            originals: Textos originais que tiveram tradução aplicada
+        """
+        for original in originals:
+            self._record_usage(original)
 
-            return None
+    def _record_usage(self, original: str):
+        """
+        Registra um uso de tradução no contador em memória.
+
+        O contador é gravado no banco por flush_usage() ao atingir
+        USAGE_FLUSH_THRESHOLD, após USAGE_FLUSH_INTERVAL segundos ou no close().
+
+        Args:
+            original: Texto original que teve tradução encontrada
+        """
+        if not self.track_usage:
+            return
+
+        with self._usage_lock:
+            self._pending_usage[original] = self._pending_usage.get(original, 0) + 1
+            self._pending_usage_total += 1
+            flush_now = self._pending_usage_total >= self.USAGE_FLUSH_THRESHOLD
+            if not flush_now:
+                self._schedule_flush()
+
+        if flush_now:
+            self.flush_usage()
+
+    def _schedule_flush(self):
+        """Agenda flush_usage() em USAGE_FLUSH_INTERVAL segundos (chamar com _usage_lock)"""
+        if self._usage_timer is None:
+            self._usage_timer = threading.Timer(self.USAGE_FLUSH_INTERVAL, self._on_usage_timer)
+            self._usage_timer.daemon = True
+            self._usage_timer.start()
+
+    def _on_usage_timer(self):
+        """Callback do timer de flush dos contadores de uso"""
+        with self._usage_lock:
+            self._usage_timer = None
+        self.flush_usage()
+
+    def flush_usage(self) -> int:
+        """
+        Grava os contadores de uso pendentes em uma única transação.
+
+        Returns:
+            Número de traduções cujo contador foi atualizado
+        """
+        # Traduções adiadas e promoções primeiro: os usos delas já contam
+        self._write_deferred()
+        self._promote_pending()
+
+        with self._usage_lock:
+            if self._usage_timer is not None:
+                self._usage_timer.cancel()
+                self._usage_timer = None
+
+            pending = self._pending_usage
+            self._pending_usage = {}
+            self._pending_usage_total = 0
+
+        if not pending:
+            return 0
+
+        try:
+            with self._transaction() as cursor:
+                cursor.executemany('''
+                    UPDATE translations
+                    SET usage_count = usage_count + ?
+                    WHERE original_hash = ? AND +original_text = ?
+                ''', [(count, text_hash(original), original)
+                      for original, count in pending.items()])
+            return len(pending)
         except Exception as e:
-            print(f"Erro ao buscar tradução: {e}")
-            return None
+            # Devolve os contadores para a próxima tentativa
+            with self._usage_lock:
+                for original, count in pending.items():
+                    self._pending_usage[original] = self._pending_usage.get(original, 0) + count
+                    self._pending_usage_total += count
+            print(f"Erro ao gravar contadores de uso: {e}")
+            return 0
 
-    def get_translations_batch(self, originals: List[str]) -> Dict[str, str]:
+    def get_translations_batch(self, originals: List[str],
+                               with_metadata: bool = False) -> Dict:
         """
         Busca múltiplas traduções de uma vez (otimizado).
 
+        Textos já presentes no cache (positivo ou negativo) não vão ao banco.
+        Os demais são buscados pelo índice de hash em consultas IN (...) de
+        até 500 textos (uma tabela temporária com join não é mais rápida:
+        ver tests/bench_translations_batch.py).
+
         Args:
             originals: Lista de textos originais
+            with_metadata: Se True, cada valor é um dicionário com
+                           translated_text, usage_count e category
 
         Returns:
-            Dicionário {texto_original: texto_traduzido}
+            Dicionário {texto_original: texto_traduzido} ou, com metadados,
+            {texto_original: {'translated_text', 'usage_count', 'category'}}
         """
         if not self.is_connected() or not originals:
             return {}
 
         try:
             results = {}
-            with self._get_cursor() as cursor:
-                # Processa em lotes para evitar limite de parâmetros SQL
-                batch_size = 500
-                for i in range(0, len(originals), batch_size):
-                    batch = originals[i:i + batch_size]
-                    placeholders = ','.join('?' * len(batch))
-                    cursor.execute(f'''
-                        SELECT original_text, translated_text FROM translations
-                        WHERE original_text IN ({placeholders})
-                    ''', batch)
-
-                    for row in cursor.fetchall():
-                        results[row[0]] = row[1]
+            pending = []
+            excluded = []
+            attached = self._attached
+            for original in dict.fromkeys(originals):
+                # O cache não guarda metadados
+                found, cached = (False, None) if with_metadata else self._cache.get(original)
+                if not found:
+                    key_hash = text_hash(original)
+                    if attached or not self._bloom_excludes(key_hash):
+                        pending.append((original, key_hash))
+                    else:
+                        excluded.append(original)
+                elif cached is not None:
+                    results[original] = cached
+
+            # Sem arquivo, o filtro de Bloom já basta para descartar ausências
+            if self._archive is None:
+                excluded = []
+
+            if not pending and not excluded:
+                return results
+
+            generation = self._cache.generation
+            columns = 't.original_text, t.translated_text, t.usage_count, t.category'
+            found_rows = {}
+            with self._read_cursor() as cursor:
+                rows = self._batch_rows_in_chunks(cursor, pending, attached, columns) if pending else []
+
+                # Confirma o texto: hashes iguais podem vir de textos
+                # diferentes. Entre memórias vence o menor source_rank
+                pending_set = {original for original, _ in pending}
+                for row in rows:
+                    original = row[0]
+                    if original in pending_set:
+                        best = found_rows.get(original)
+                        if best is None or row[4] < best[4]:
+                            found_rows[original] = row
+
+            # Faltas na camada principal vão ao arquivo, que vem antes das anexadas
+            searched = [original for original, _ in pending]
+            if self._archive is not None:
+                missed = [original for original in searched
+                          if original not in found_rows or found_rows[original][4] > 0]
+                self._archive_rows(missed + excluded, found_rows)
+                searched += excluded
+
+            for original in searched:
+                row = found_rows.get(original)
+                if row is None:
+                    self._cache.put_negative(original, generation)
+                    continue
+
+                self._cache.put(original, row[1], generation)
+                if with_metadata:
+                    results[original] = {
+                        'translated_text': row[1],
+                        'usage_count': row[2],
+                        'category': row[3]
+                    }
+                else:
+                    results[original] = row[1]
 
             return results
         except Exception as e:
             print(f"Erro ao buscar traduções em lote: {e}")
             return {}
 
+    def _batch_rows_in_chunks(self, cursor: sqlite3.Cursor, pending: List[Tuple[str, int]],
+                              attached: List[Dict], columns: str) -> List[tuple]:
+        """Busca em lotes com IN (...); limita os parâmetros por consulta"""
+        rows = []
+        batch_size = 500 // (len(attached) + 1)
+        for i in range(0, len(pending), batch_size):
+            chunk = pending[i:i + batch_size]
+            hashes = [key_hash for _, key_hash in chunk]
+            placeholders = ','.join('?' * len(chunk))
+
+            if attached:
+                texts = [original for original, _ in chunk]
+                cursor.execute(
+                    self._federated_query(
+                        attached, columns,
+                        f't.original_hash IN ({placeholders})',
+                        f't.original_text IN ({placeholders})'
+                    ),
+                    hashes + texts * len(attached)
+                )
+            else:
+                cursor.execute(f'''
+                    SELECT {columns}, 0 FROM translations t
+                    WHERE t.original_hash IN ({placeholders})
+                ''', hashes)
+
+            rows.extend(tuple(row) for row in cursor.fetchall())
+        return rows
+
     def get_all_translations(self, category: str = None,
                             search_term: str = None,
                             limit: int = None,
@@ -338,7 +3426,7 @@ class TranslationMemory:
 
         Args:
             category: Filtrar por categoria
-            search_term: Termo de busca
+            search_term: Termo de busca (prefixo por palavra; "entre aspas" busca frase)
             limit: Limite de resultados
             offset: Offset para paginação
 
@@ -349,32 +3437,9 @@ class TranslationMemory:
             return []
 
         try:
-            query = '''
-                SELECT id, original_text, translated_text, source_language,
-                       target_language, category, notes, created_at,
-                       updated_at, usage_count
-                FROM translations
-                WHERE 1=1
-            '''
-            params = []
-
-            if category:
-                query += ' AND category = ?'
-                params.append(category)
-
-            if search_term:
-                query += ' AND (original_text LIKE ? OR translated_text LIKE ?)'
-                params.extend([f'%{search_term}%', f'%{search_term}%'])
-
-            query += ' ORDER BY usage_count DESC, updated_at DESC'
-
-            if limit:
-                query += ' LIMIT ? OFFSET ?'
-                params.extend([limit, offset])
-
-            with self._lock:
-                self.cursor.execute(query, params)
-                rows = self.cursor.fetchall()
+            fts_query = self._fts_query_for(search_term)
+            rows = self._query_translations(category, search_term, fts_query,
+                                            limit, offset)
 
             return [
                 {
@@ -395,6 +3460,235 @@ class TranslationMemory:
             print(f"Erro ao buscar traduções: {e}")
             return []
 
+    def _fts_query_for(self, search_term: Optional[str]) -> Optional[str]:
+        """
+        Retorna a consulta FTS5 validada para o termo, ou None para usar LIKE.
+
+        Args:
+            search_term: Texto digitado pelo usuário
+
+        Returns:
+            Consulta FTS5 aceita pelo SQLite ou None
+        """
+        if not search_term or not self._fts_enabled:
+            return None
+
+        fts_query = self._build_fts_query(search_term)
+        if fts_query is None:
+            return None
+
+        try:
+            with self._read_cursor() as cursor:
+                cursor.execute('''
+                    SELECT rowid FROM translations_fts
+                    WHERE translations_fts MATCH ? LIMIT 1
+                ''', (fts_query,))
+                cursor.fetchall()
+            return fts_query
+        except sqlite3.OperationalError:
+            # Consulta FTS inválida: recorre à busca por LIKE
+            return None
+
+    def iter_translations(self, category: str = None, search_term: str = None,
+                          order: str = 'usage',
+                          page_size: int = 500) -> Iterator[TranslationRow]:
+        """
+        Percorre as traduções em páginas, sem carregar a tabela inteira.
+
+        Usa paginação por keyset: cada página continua a partir da última
+        chave lida, então o custo por página é constante e a memória usada
+        não depende do tamanho da memória de tradução. Nenhum cursor fica
+        aberto entre páginas.
+
+        Args:
+            category: Filtrar por categoria
+            search_term: Termo de busca (mesma sintaxe de get_all_translations)
+            order: 'usage' (mais usadas primeiro), 'id' (ordem de inserção) ou
+                   'rank' (relevância FTS5; requer search_term, pagina por offset)
+            page_size: Quantidade de linhas lidas por consulta
+
+        Yields:
+            TranslationRow para cada tradução
+        """
+        if order not in ('usage', 'id', 'rank'):
+            raise ValueError(f"Ordenação inválida: {order}")
+
+        if not self.is_connected():
+            return
+
+        fts_query = self._fts_query_for(search_term)
+
+        if order == 'rank':
+            if fts_query:
+                yield from self._iter_ranked(category, search_term, fts_query, page_size)
+                return
+            order = 'usage'
+
+        base_query = '''
+            SELECT t.id, t.original_text, t.translated_text, t.category,
+                   t.notes, t.usage_count, t.updated_at
+            FROM translations t
+            WHERE 1=1
+        '''
+        base_params = []
+
+        if category:
+            base_query += ' AND t.category = ?'
+            base_params.append(category)
+
+        if fts_query:
+            base_query += '''
+                AND t.id IN (SELECT rowid FROM translations_fts WHERE translations_fts MATCH ?)
+            '''
+            base_params.append(fts_query)
+        elif search_term:
+            base_query += ' AND (t.original_text LIKE ? OR t.translated_text LIKE ?)'
+            base_params.extend([f'%{search_term}%', f'%{search_term}%'])
+
+        if order == 'usage':
+            order_sql = ' ORDER BY t.usage_count DESC, t.updated_at DESC, t.id DESC LIMIT ?'
+        else:
+            order_sql = ' ORDER BY t.id LIMIT ?'
+
+        last = None
+        while True:
+            query = base_query
+            params = list(base_params)
+
+            if last is not None:
+                if order == 'usage':
+                    query += ' AND (t.usage_count, t.updated_at, t.id) < (?, ?, ?)'
+                    params.extend([last.usage_count, last.updated_at, last.id])
+                else:
+                    query += ' AND t.id > ?'
+                    params.append(last.id)
+
+            params.append(page_size)
+
+            try:
+                with self._read_cursor() as cursor:
+                    cursor.execute(query + order_sql, params)
+                    rows = [TranslationRow(*row) for row in cursor.fetchall()]
+            except Exception as e:
+                print(f"Erro ao percorrer traduções: {e}")
+                return
+
+            yield from rows
+
+            if len(rows) < page_size:
+                return
+            last = rows[-1]
+
+    def iter_attached_translations(self, page_size: int = 500) -> Iterator[Tuple[str, str]]:
+        """
+        Percorre as traduções das memórias anexadas em páginas, na ordem de
+        prioridade (em cada uma, na ordem de inserção).
+
+        As anexadas podem ser de versões antigas, então só original e
+        tradução são lidos, paginados por rowid.
+
+        Args:
+            page_size: Quantidade de linhas lidas por consulta
+
+        Yields:
+            Tupla (texto_original, texto_traduzido)
+        """
+        if not self.is_connected():
+            return
+
+        for memory in list(self._attached):
+            last = 0
+            while True:
+                try:
+                    with self._read_cursor() as cursor:
+                        cursor.execute(f'''
+                            SELECT rowid, original_text, translated_text
+                            FROM "{memory['alias']}".translations
+                            WHERE rowid > ? ORDER BY rowid LIMIT ?
+                        ''', (last, page_size))
+                        rows = cursor.fetchall()
+                except Exception as e:
+                    print(f"Erro ao percorrer memória anexada: {e}")
+                    break
+
+                for _, original, translated in rows:
+                    yield original, translated
+
+                if len(rows) < page_size:
+                    break
+                last = rows[-1][0]
+
+    def _iter_ranked(self, category: Optional[str], search_term: str,
+                     fts_query: str, page_size: int) -> Iterator[TranslationRow]:
+        """
+        Percorre resultados de busca FTS5 em ordem de relevância.
+
+        A relevância não é uma coluna indexada, então as páginas usam offset;
+        o conjunto de resultados de uma busca costuma ser pequeno.
+        """
+        offset = 0
+        while True:
+            try:
+                rows = self._query_translations(category, search_term, fts_query,
+                                                page_size, offset)
+            except Exception as e:
+                print(f"Erro ao percorrer traduções: {e}")
+                return
+
+            for row in rows:
+                yield TranslationRow(row[0], row[1], row[2], row[5], row[6], row[9], row[8])
+
+            if len(rows) < page_size:
+                return
+            offset += page_size
+
+    def _query_translations(self, category: Optional[str], search_term: Optional[str],
+                            fts_query: Optional[str], limit: Optional[int],
+                            offset: int) -> List[sqlite3.Row]:
+        """
+        Executa a consulta de listagem/busca de traduções.
+
+        Com fts_query usa o índice FTS5 ordenado por relevância (bm25);
+        sem ele usa LIKE sobre os textos.
+        """
+        query = '''
+            SELECT t.id, t.original_text, t.translated_text, t.source_language,
+                   t.target_language, t.category, t.notes, t.created_at,
+                   t.updated_at, t.usage_count
+            FROM translations t
+        '''
+        params = []
+
+        if fts_query:
+            query += '''
+                JOIN translations_fts f ON f.rowid = t.id
+                WHERE translations_fts MATCH ?
+            '''
+            params.append(fts_query)
+        else:
+            query += ' WHERE 1=1'
+
+        if category:
+            query += ' AND t.category = ?'
+            params.append(category)
+
+        if search_term and not fts_query:
+            query += ' AND (t.original_text LIKE ? OR t.translated_text LIKE ?)'
+            params.extend([f'%{search_term}%', f'%{search_term}%'])
+
+        if fts_query:
+            query += ' ORDER BY bm25(translations_fts), t.usage_count DESC, t.updated_at DESC'
+        else:
+            query += ' ORDER BY t.usage_count DESC, t.updated_at DESC, t.id DESC'
+
+        if limit:
+            query += ' LIMIT ? OFFSET ?'
+            params.extend([limit, offset])
+
+        with self._read_cursor() as cursor:
+            cursor.execute(query, params)
+            return cursor.fetchall()
+
     def get_translation_by_id(self, translation_id: int) -> Optional[Dict]:
         """
         Busca uma tradução pelo ID
@@ -409,8 +3703,8 @@ class TranslationMemory:
             return None
 
         try:
-            with self._lock:
-                self.cursor.execute('''
+            with self._read_cursor() as cursor:
+                cursor.execute('''
                     SELECT id, original_text, translated_text, source_language,
                            target_language, category, notes, created_at,
                            updated_at, usage_count
@@ -418,7 +3712,7 @@ class TranslationMemory:
                     WHERE id = ?
                 ''', (translation_id,))
 
-                row = self.cursor.fetchone()
+                row = cursor.fetchone()
 
             if row:
                 return {
@@ -484,9 +3778,23 @@ class TranslationMemory:
                 WHERE id = ?
             '''
 
+            row = None
             with self._get_cursor() as cursor:
                 cursor.execute(query, params)
-                return cursor.rowcount > 0
+                updated = cursor.rowcount > 0
+
+                if updated and translated_text is not None:
+                    cursor.execute('SELECT original_text FROM translations WHERE id = ?',
+                                   (translation_id,))
+                    row = cursor.fetchone()
+                    if row:
+                        self._sync_templates(cursor, [(row[0], translated_text)])
+                        self._forget_learned(cursor, [row[0]])
+
+            # Só depois do commit: uma transação desfeita não deixa o cache adiantado
+            if row:
+                self._cache.write(row[0], translated_text)
+            return updated
 
         except Exception as e:
             print(f"Erro ao atualizar tradução: {e}")
@@ -507,8 +3815,21 @@ class TranslationMemory:
 
         try:
             with self._get_cursor() as cursor:
+                cursor.execute('SELECT original_text FROM translations WHERE id = ?',
+                               (translation_id,))
+                row = cursor.fetchone()
+
                 cursor.execute('DELETE FROM translations WHERE id = ?', (translation_id,))
-                return cursor.rowcount > 0
+                deleted = cursor.rowcount > 0
+                if row:
+                    self._cache.discard(row[0])
+                    if deleted:
+                        self._forget_templates(cursor, [row[0]])
+                        self._forget_learned(cursor, [row[0]])
+
+            if deleted:
+                self._bloom_remove(1)
+            return deleted
         except Exception as e:
             print(f"Erro ao deletar tradução: {e}")
             return False
@@ -530,10 +3851,22 @@ class TranslationMemory:
             with self._get_cursor() as cursor:
                 # Cria uma string de placeholders (?, ?, ...) para a cláusula IN
                 placeholders = ', '.join('?' for _ in ids)
+
+                cursor.execute(f'SELECT original_text FROM translations WHERE id IN ({placeholders})', ids)
+                originals = [row[0] for row in cursor.fetchall()]
+
                 query = f'DELETE FROM translations WHERE id IN ({placeholders})'
 
                 cursor.execute(query, ids)
-                return cursor.rowcount
+                deleted = cursor.rowcount
+                for original in originals:
+                    self._cache.discard(original)
+                if deleted:
+                    self._forget_templates(cursor, originals)
+                    self._forget_learned(cursor, originals)
+
+            self._bloom_remove(deleted)
+            return deleted
         except Exception as e:
             print(f"Erro ao deletar múltiplas traduções: {e}")
             return 0
@@ -549,19 +3882,67 @@ class TranslationMemory:
             return []
 
         try:
-            with self._lock:
-                self.cursor.execute('SELECT DISTINCT category FROM translations ORDER BY category')
-                return [row[0] for row in self.cursor.fetchall()]
+            with self._read_cursor() as cursor:
+                cursor.execute('''
+                    SELECT category FROM translation_stats
+                    WHERE translation_count > 0
+                    ORDER BY category
+                ''')
+                return [row[0] for row in cursor.fetchall()]
         except Exception as e:
             print(f"Erro ao buscar categorias: {e}")
             return []
 
-    def export_to_file(self, filepath: str) -> bool:
+    @staticmethod
+    def _csv_delimiter(filepath: str) -> str:
+        """Retorna o delimitador pela extensão (.tsv/.tsv.gz usam tabulação)"""
+        name = filepath.lower()
+        if name.endswith('.gz'):
+            name = name[:-3]
+        return '\t' if name.endswith('.tsv') else ','
+
+    @classmethod
+    def export_rows(cls, filepath: str, rows: Iterable[Tuple[str, str]]) -> bool:
+        """
+        Grava pares soltos no formato de export_to_file (ex: traduções que
+        não chegaram ao banco), para depois usar import_from_file.
+
+        Args:
+            filepath: Caminho do arquivo de destino (.csv, .tsv, .csv.gz, .tsv.gz)
+            rows: Pares (texto_original, texto_traduzido)
+
+        Returns:
+            True se gravou com sucesso
+        """
+        try:
+            if filepath.lower().endswith('.gz'):
+                f = gzip.open(filepath, 'wt', encoding='utf-8', newline='')
+            else:
+                f = open(filepath, 'w', encoding='utf-8', newline='')
+
+            with f:
+                writer = csv.writer(f, delimiter=cls._csv_delimiter(filepath))
+                writer.writerow(['ID', 'Original', 'Tradução', 'Categoria', 'Notas', 'Usos'])
+                for original, translated in rows:
+                    writer.writerow(['', original, translated, 'general', '', 1])
+            return True
+        except Exception as e:
+            print(f"Erro ao exportar traduções: {e}")
+            return False
+
+    def export_to_file(self, filepath: str, compress: Optional[bool] = None,
+                       progress_callback: Optional[Callable[[int, Optional[int]], None]] = None
+                       ) -> bool:
         """
-        Exporta a memória de tradução para um arquivo CSV
+        Exporta a memória de tradução para um arquivo CSV (ou TSV)
+
+        As linhas são gravadas à medida que saem do cursor, então o uso de
+        memória não depende do tamanho da memória de tradução.
 
         Args:
-            filepath: Caminho do arquivo de destino
+            filepath: Caminho do arquivo de destino (.csv, .tsv, .csv.gz, .tsv.gz)
+            compress: Grava compactado com gzip; None decide pela extensão .gz
+            progress_callback: Função chamada com (linhas_gravadas, total)
 
         Returns:
             True se a exportação foi bem-sucedida
@@ -569,36 +3950,93 @@ class TranslationMemory:
         if not self.is_connected():
             return False
 
+        if compress is None:
+            compress = filepath.lower().endswith('.gz')
+
         try:
-            import csv
+            total = self.get_stats()['total_translations'] if progress_callback else None
 
-            translations = self.get_all_translations()
+            if compress:
+                f = gzip.open(filepath, 'wt', encoding='utf-8', newline='')
+            else:
+                f = open(filepath, 'w', encoding='utf-8', newline='')
 
-            with open(filepath, 'w', encoding='utf-8', newline='') as f:
-                writer = csv.writer(f)
+            with f:
+                writer = csv.writer(f, delimiter=self._csv_delimiter(filepath))
                 writer.writerow(['ID', 'Original', 'Tradução', 'Categoria', 'Notas', 'Usos'])
 
-                for t in translations:
+                written = 0
+                for t in self.iter_translations(page_size=self.BULK_CHUNK_SIZE):
                     writer.writerow([
-                        t['id'],
-                        t['original_text'],
-                        t['translated_text'],
-                        t['category'],
-                        t['notes'],
-                        t['usage_count']
+                        t.id,
+                        t.original_text,
+                        t.translated_text,
+                        t.category,
+                        t.notes,
+                        t.usage_count
                     ])
+                    written += 1
+
+                    if progress_callback and written % 1000 == 0:
+                        progress_callback(written, total)
+
+            if progress_callback:
+                progress_callback(written, total)
 
             return True
         except Exception as e:
             print(f"Erro ao exportar memória: {e}")
             return False
 
-    def import_from_file(self, filepath: str) -> Tuple[int, int]:
+    def export_snapshot(self, filepath: str,
+                        progress_callback: Optional[Callable[[int, Optional[int]], None]] = None
+                        ) -> int:
+        """
+        Exporta a memória para um snapshot compacto e somente leitura.
+
+        O snapshot é aberto com tm_snapshot.SnapshotMemory (via mmap) e serve
+        como backend de busca para execuções que não gravam na memória.
+
+        Args:
+            filepath: Caminho do snapshot a ser criado
+            progress_callback: Função chamada com (linhas_gravadas, total)
+
+        Returns:
+            Quantidade de traduções exportadas (-1 em caso de erro)
+        """
+        if not self.is_connected():
+            return -1
+
+        # Importado aqui porque tm_snapshot depende deste módulo
+        from tm_snapshot import write_snapshot
+
+        try:
+            total = self.get_stats()['total_translations']
+            rows = ((row.original_text, row.translated_text)
+                    for row in self.iter_translations(order='id', page_size=self.BULK_CHUNK_SIZE))
+
+            def report(done, _total):
+                if progress_callback:
+                    progress_callback(done, total)
+
+            return write_snapshot(rows, filepath, report)
+        except Exception as e:
+            print(f"Erro ao exportar snapshot: {e}")
+            return -1
+
+    def import_from_file(self, filepath: str,
+                         progress_callback: Optional[Callable[[int, Optional[int]], None]] = None
+                         ) -> Tuple[int, int]:
         """
-        Importa traduções de um arquivo CSV
+        Importa traduções de um arquivo CSV (ou TSV)
+
+        O arquivo é lido incrementalmente e gravado em lotes limitados
+        (veja bulk_import), então o uso de memória é constante. Arquivos
+        compactados com gzip são detectados automaticamente.
 
         Args:
-            filepath: Caminho do arquivo de origem
+            filepath: Caminho do arquivo de origem (.csv, .tsv, .csv.gz, .tsv.gz)
+            progress_callback: Função chamada com (bytes_lidos, total_de_bytes)
 
         Returns:
             Tupla (importados, erros)
@@ -607,29 +4045,306 @@ class TranslationMemory:
             return (0, 0)
 
         try:
-            import csv
+            total_bytes = os.path.getsize(filepath)
+            raw = open(filepath, 'rb')
+        except OSError as e:
+            print(f"Erro ao importar memória: {e}")
+            return (0, 0)
+
+        try:
+            compressed = raw.read(2) == b'\x1f\x8b'
+            raw.seek(0)
 
-            translations_to_import = []
+            stream = gzip.GzipFile(fileobj=raw) if compressed else raw
+            text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
 
-            with open(filepath, 'r', encoding='utf-8') as f:
-                reader = csv.reader(f)
-                next(reader)  # Pula cabeçalho
+            def read_rows():
+                reader = csv.reader(text, delimiter=self._csv_delimiter(filepath))
+                next(reader, None)  # Pula cabeçalho
 
-                for row in reader:
-                    try:
-                        if len(row) >= 2:
-                            original = row[1] if len(row) > 1 else row[0]
-                            translated = row[2] if len(row) > 2 else row[1]
-                            translations_to_import.append((original, translated))
-                    except Exception:
-                        pass
+                for count, row in enumerate(reader, 1):
+                    if len(row) >= 2:
+                        original = row[1] if len(row) > 1 else row[0]
+                        translated = row[2] if len(row) > 2 else row[1]
+                        yield (original, translated)
+
+                    if progress_callback and count % 1000 == 0:
+                        progress_callback(raw.tell(), total_bytes)
+
+            # Estimativa de ~100 bytes por linha (arquivos gzip ~4x menores)
+            estimated_rows = total_bytes * (4 if compressed else 1) // 100
+
+            # Carga em massa (também invalida o cache)
+            result = self.bulk_import(
+                read_rows(), category='imported',
+                rebuild_indexes=estimated_rows >= self.BULK_INDEX_REBUILD_THRESHOLD
+            )
 
-            # Usa batch insert para performance
-            return self.add_translations_batch(translations_to_import, category='imported')
+            if progress_callback:
+                progress_callback(total_bytes, total_bytes)
+
+            return result
 
         except Exception as e:
             print(f"Erro ao importar memória: {e}")
             return (0, 0)
+        finally:
+            raw.close()
+
+    @staticmethod
+    def _timestamp_key(value) -> str:
+        """Converte datetime ou texto ISO para o formato de updated_at (UTC)"""
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value.strip().replace('Z', ''))
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+
+    def export_changes(self, filepath: str, since=None, compress: Optional[bool] = None,
+                       progress_callback: Optional[Callable[[int, Optional[int]], None]] = None
+                       ) -> Optional[Dict]:
+        """
+        Exporta só as traduções alteradas desde um ponto (arquivo delta).
+
+        - since inteiro: id do diário de alterações (next_since de uma
+          exportação anterior); inclui remoções
+        - since datetime ou texto ISO (UTC): usa o índice de updated_at;
+          remoções não aparecem
+        - since None: exporta tudo
+
+        O arquivo é um CSV/TSV (opcionalmente gzip) lido por apply_changes.
+
+        Args:
+            filepath: Caminho do arquivo delta (.csv, .tsv, .csv.gz, .tsv.gz)
+            since: Ponto de partida (id do diário, data/hora ou None)
+            compress: Grava compactado com gzip; None decide pela extensão .gz
+            progress_callback: Função chamada com (linhas_gravadas, None)
+
+        Returns:
+            Dicionário com rows, upserts, deletes, bytes e next_since (id do
+            diário a usar na próxima exportação), ou None em caso de erro
+        """
+        if not self.is_connected():
+            return None
+
+        if compress is None:
+            compress = filepath.lower().endswith('.gz')
+
+        try:
+            with self._read_cursor() as cursor:
+                cursor.execute('SELECT IFNULL(MIN(change_id), 1), IFNULL(MAX(change_id), 0) '
+                               'FROM translation_changes')
+                first_change, next_since = cursor.fetchone()
+
+                if isinstance(since, int) and not isinstance(since, bool):
+                    if since < first_change - 1:
+                        print("Erro ao exportar alterações: o diário já não cobre esse ponto; "
+                              "use uma data/hora")
+                        return None
+
+                    # Último estado de cada texto tocado; ausente = removido
+                    cursor.execute('''
+                        SELECT c.original_text, t.translated_text, t.category, t.notes,
+                               t.usage_count, IFNULL(t.updated_at, c.changed_at)
+                        FROM (
+                            SELECT original_text, MAX(changed_at) AS changed_at
+                            FROM translation_changes
+                            WHERE change_id > ? AND change_id <= ?
+                            GROUP BY original_text
+                        ) c
+                        LEFT JOIN translations t ON t.original_text = c.original_text
+                    ''', (since, next_since))
+                elif since is None:
+                    cursor.execute('''
+                        SELECT original_text, translated_text, category, notes, usage_count, updated_at
+                        FROM translations
+                    ''')
+                else:
+                    cursor.execute('''
+                        SELECT original_text, translated_text, category, notes, usage_count, updated_at
+                        FROM translations
+                        WHERE updated_at >= ?
+                        ORDER BY updated_at
+                    ''', (self._timestamp_key(since),))
+
+                if compress:
+                    f = gzip.open(filepath, 'wt', encoding='utf-8', newline='')
+                else:
+                    f = open(filepath, 'w', encoding='utf-8', newline='')
+
+                upserts = 0
+                deletes = 0
+                with f:
+                    writer = csv.writer(f, delimiter=self._csv_delimiter(filepath))
+                    writer.writerow(self.CHANGES_HEADER)
+
+                    for original, translated, category, notes, usage_count, updated_at in cursor:
+                        if translated is None:
+                            writer.writerow(['D', original, '', '', '', 0, updated_at])
+                            deletes += 1
+                        else:
+                            writer.writerow(['U', original, translated, category, notes,
+                                             usage_count, updated_at])
+                            upserts += 1
+
+                        if progress_callback and (upserts + deletes) % 1000 == 0:
+                            progress_callback(upserts + deletes, None)
+
+            if progress_callback:
+                progress_callback(upserts + deletes, upserts + deletes)
+
+            return {
+                'rows': upserts + deletes,
+                'upserts': upserts,
+                'deletes': deletes,
+                'bytes': os.path.getsize(filepath),
+                'next_since': next_since
+            }
+        except Exception as e:
+            print(f"Erro ao exportar alterações: {e}")
+            return None
+
+    def apply_changes(self, filepath: str,
+                      progress_callback: Optional[Callable[[int, Optional[int]], None]] = None
+                      ) -> Optional[Dict]:
+        """
+        Aplica um arquivo delta gerado por export_changes.
+
+        As linhas vão em lotes para uma tabela temporária e são mescladas
+        com UPSERT: vence quem tiver updated_at mais recente (o mesmo
+        critério de merge_database). Remoções só apagam a tradução local se
+        ela não foi alterada depois da remoção.
+
+        Args:
+            filepath: Caminho do arquivo delta
+            progress_callback: Função chamada com (bytes_lidos, total_de_bytes)
+
+        Returns:
+            Dicionário com rows, applied, deleted, skipped, errors e bytes,
+            ou None em caso de erro
+        """
+        if not self.is_connected():
+            return None
+
+        stats = {'rows': 0, 'applied': 0, 'deleted': 0, 'skipped': 0, 'errors': 0, 'bytes': 0}
+
+        try:
+            total_bytes = os.path.getsize(filepath)
+            raw = open(filepath, 'rb')
+        except OSError as e:
+            print(f"Erro ao aplicar alterações: {e}")
+            return None
+
+        try:
+            stats['bytes'] = total_bytes
+            compressed = raw.read(2) == b'\x1f\x8b'
+            raw.seek(0)
+
+            stream = gzip.GzipFile(fileobj=raw) if compressed else raw
+            text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+            reader = csv.reader(text, delimiter=self._csv_delimiter(filepath))
+
+            if next(reader, None) != self.CHANGES_HEADER:
+                print("Erro ao aplicar alterações: arquivo não é um delta da memória de tradução")
+                return None
+
+            with self._writer_lease(), self._write_lock():
+                self.cursor.execute('''
+                    CREATE TEMP TABLE IF NOT EXISTS changes_staging (
+                        operation TEXT NOT NULL,
+                        original_text TEXT NOT NULL,
+                        translated_text TEXT,
+                        category TEXT,
+                        notes TEXT,
+                        usage_count INTEGER,
+                        updated_at TEXT NOT NULL,
+                        original_hash INTEGER
+                    )
+                ''')
+
+                batch = []
+                for row in reader:
+                    if (len(row) != len(self.CHANGES_HEADER) or row[0] not in ('U', 'D')
+                            or not row[1] or not row[6] or (row[0] == 'U' and not row[2])):
+                        stats['errors'] += 1
+                        continue
+
+                    try:
+                        usage_count = int(row[5] or 0)
+                    except ValueError:
+                        usage_count = 1
+                    batch.append((row[0], row[1], row[2], row[3], row[4], usage_count,
+                                  row[6], text_hash(row[1])))
+
+                    if len(batch) >= self.BULK_COMMIT_ROWS:
+                        self._apply_staged_changes(batch, stats)
+                        batch = []
+                        if progress_callback:
+                            progress_callback(raw.tell(), total_bytes)
+
+                if batch:
+                    self._apply_staged_changes(batch, stats)
+
+            self._cache.clear()
+            self._check_bloom_capacity()
+
+            if progress_callback:
+                progress_callback(total_bytes, total_bytes)
+
+            return stats
+        except Exception as e:
+            self._cache.clear()
+            print(f"Erro ao aplicar alterações: {e}")
+            return None
+        finally:
+            raw.close()
+
+    def _apply_staged_changes(self, batch: List[tuple], stats: Dict):
+        """Mescla um lote do arquivo delta em uma transação própria"""
+        self._bloom_add(row[7] for row in batch if row[0] == 'U')
+        upserts = sum(1 for row in batch if row[0] == 'U')
+
+        try:
+            with self._transaction() as cursor:
+                for i in range(0, len(batch), self.BULK_CHUNK_SIZE):
+                    cursor.executemany('INSERT INTO changes_staging VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                                       batch[i:i + self.BULK_CHUNK_SIZE])
+
+                cursor.execute('''
+                    INSERT INTO translations
+                    (original_text, translated_text, category, notes, usage_count, updated_at,
+                     original_hash, normalized_hash)
+                    SELECT original_text, translated_text, category, notes, usage_count, updated_at,
+                           original_hash, tm_norm_hash(original_text)
+                    FROM changes_staging
+                    WHERE operation = 'U'
+                    ORDER BY rowid
+                    ON CONFLICT(original_text) DO UPDATE SET
+                        translated_text = excluded.translated_text,
+                        category = excluded.category,
+                        notes = excluded.notes,
+                        updated_at = excluded.updated_at,
+                        usage_count = MAX(usage_count, excluded.usage_count)
+                    WHERE excluded.updated_at > translations.updated_at
+                ''')
+                applied = max(cursor.rowcount, 0)
+
+                cursor.execute('''
+                    DELETE FROM translations WHERE id IN (
+                        SELECT t.id FROM changes_staging s
+                        JOIN translations t ON t.original_text = s.original_text
+                        WHERE s.operation = 'D' AND s.updated_at >= t.updated_at
+                    )
+                ''')
+                deleted = max(cursor.rowcount, 0)
+
+                cursor.execute('DELETE FROM changes_staging')
+
+            stats['rows'] += len(batch)
+            stats['applied'] += applied
+            stats['deleted'] += deleted
+            stats['skipped'] += len(batch) - applied - deleted
+        except sqlite3.Error as e:
+            print(f"Erro ao gravar lote de alterações: {e}")
+            stats['errors'] += len(batch)
 
     def clear_all(self) -> bool:
         """
@@ -644,6 +4359,16 @@ class TranslationMemory:
         try:
             with self._get_cursor() as cursor:
                 cursor.execute('DELETE FROM translations')
+                cursor.execute('DELETE FROM translation_templates')
+                cursor.execute('DELETE FROM template_sources')
+                cursor.execute('DELETE FROM learned_patterns')
+            self._learned_patterns = None
+            with self._usage_lock:
+                self._pending_promotions = {}
+            if self._archive is not None:
+                self._archive.clear_all()
+            self._cache.clear()
+            self._rebuild_bloom()
             return True
         except Exception as e:
             print(f"Erro ao limpar memória: {e}")
@@ -661,25 +4386,40 @@ class TranslationMemory:
                 'total_translations': 0,
                 'total_usage': 0,
                 'categories': 0,
-                'db_path': None
+                'templates': 0,
+                'learned_patterns': 0,
+                'db_path': None,
+                **self._cache.stats(),
+                **self._bloom_stats(),
+                **self._archive_stats()
             }
 
         try:
-            with self._lock:
-                self.cursor.execute('SELECT COUNT(*) FROM translations')
-                total = self.cursor.fetchone()[0]
+            # Contadores mantidos por triggers: uma linha por categoria
+            with self._read_cursor() as cursor:
+                cursor.execute('''
+                    SELECT IFNULL(SUM(translation_count), 0), IFNULL(SUM(usage_total), 0), COUNT(*)
+                    FROM translation_stats
+                    WHERE translation_count > 0
+                ''')
+                total, total_usage, categories = cursor.fetchone()
 
-                self.cursor.execute('SELECT SUM(usage_count) FROM translations')
-                total_usage = self.cursor.fetchone()[0] or 0
+                cursor.execute('SELECT COUNT(*) FROM translation_templates')
+                templates = cursor.fetchone()[0]
 
-                self.cursor.execute('SELECT COUNT(DISTINCT category) FROM translations')
-                categories = self.cursor.fetchone()[0]
+                cursor.execute('SELECT COUNT(*) FROM learned_patterns')
+                learned = cursor.fetchone()[0]
 
             return {
                 'total_translations': total,
                 'total_usage': total_usage,
                 'categories': categories,
-                'db_path': self.db_path
+                'templates': templates,
+                'learned_patterns': learned,
+                'db_path': self.db_path,
+                **self._cache.stats(),
+                **self._bloom_stats(),
+                **self._archive_stats()
             }
         except Exception as e:
             print(f"Erro ao obter estatísticas: {e}")
@@ -687,9 +4427,50 @@ class TranslationMemory:
                 'total_translations': 0,
                 'total_usage': 0,
                 'categories': 0,
-                'db_path': self.db_path
+                'templates': 0,
+                'learned_patterns': 0,
+                'db_path': self.db_path,
+                **self._cache.stats(),
+                **self._bloom_stats(),
+                **self._archive_stats()
             }
 
+    def _bloom_stats(self) -> dict:
+        """Métricas do filtro de Bloom (zeradas se desativado)"""
+        if self._bloom is None:
+            return {'bloom_entries': 0, 'bloom_stale': 0, 'bloom_bytes': 0, 'bloom_skips': 0}
+        return self._bloom.stats()
+
+    def get_pool_stats(self) -> dict:
+        """
+        Retorna métricas de uso do pool de conexões
+
+        Returns:
+            Dicionário com conexões ativas, leituras e disputa pelo escritor
+        """
+        pool = self._pool
+        readers = pool.reader_count() if pool else 0
+
+        return {
+            'active_connections': (readers + 1) if pool else 0,
+            'reader_connections': readers,
+            'readers_opened': pool.readers_opened if pool else 0,
+            'reads': pool.reads if pool else 0,
+            'writer_acquisitions': self._lock_acquisitions,
+            'writer_contentions': self._lock_contentions,
+            'writer_wait_ms_total': self._lock_wait_total * 1000,
+            'writer_wait_ms_max': self._lock_wait_max * 1000,
+            'busy_timeout_ms': self.busy_timeout * 1000,
+            'busy_waits': self._busy_waits,
+            'busy_wait_ms_total': self._busy_wait_total * 1000,
+            'busy_wait_ms_max': self._busy_wait_max * 1000,
+            'busy_retries': self._busy_retries,
+            'busy_failures': self._busy_failures,
+            'deferred_writes': len(self._deferred_writes),
+            'lease_waits': self._lease_waits,
+            'lease_timeouts': self._lease_timeouts
+        }
+
     def search(self, term: str) -> List[Dict]:
         """
         Busca traduções por termo
@@ -702,11 +4483,22 @@ class TranslationMemory:
         """
         return self.get_all_translations(search_term=term)
 
-    def vacuum(self) -> bool:
+    def _auto_vacuum_mode(self) -> int:
+        """Modo de auto_vacuum do banco (0 = nenhum, 1 = completo, 2 = incremental)"""
+        self.cursor.execute('PRAGMA auto_vacuum')
+        return self.cursor.fetchone()[0]
+
+    def vacuum(self, full: Optional[bool] = None) -> bool:
         """
         Otimiza o banco de dados (recupera espaço e reorganiza índices).
 
-        Recomendado após grandes exclusões.
+        Recomendado após grandes exclusões. Em bancos com auto_vacuum
+        incremental só devolve as páginas livres, em passos curtos que não
+        travam o escritor. Bancos antigos passam por um VACUUM completo, que
+        também os converte para o modo incremental.
+
+        Args:
+            full: True força o VACUUM completo (bloqueante); None decide pelo modo
 
         Returns:
             True se executou com sucesso
@@ -715,25 +4507,227 @@ class TranslationMemory:
             return False
 
         try:
-            with self._lock:
-                self.conn.execute('VACUUM')
+            with self._writer_lease(), self._write_lock():
+                incremental = self._auto_vacuum_mode() == 2
+                if full or not incremental:
+                    self.conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+                    self.conn.execute('VACUUM')
+                    return True
+
+            self.incremental_vacuum()
             return True
         except Exception as e:
             print(f"Erro ao otimizar banco: {e}")
             return False
 
-    def close(self):
-        """Fecha a conexão com o banco de dados de forma segura"""
+    def incremental_vacuum(self, max_pages: Optional[int] = None) -> int:
+        """
+        Devolve páginas livres ao sistema em passos de INCREMENTAL_VACUUM_PAGES.
+
+        O lock do escritor é adquirido e solto a cada passo, então gravações
+        da interface ou da fila assíncrona passam entre um passo e outro.
+
+        Args:
+            max_pages: Limite de páginas liberadas (None = todas)
+
+        Returns:
+            Quantidade de páginas liberadas
+        """
+        freed = 0
+        while max_pages is None or freed < max_pages:
+            step = self.INCREMENTAL_VACUUM_PAGES
+            if max_pages is not None:
+                step = min(step, max_pages - freed)
+
+            with self._write_lock():
+                if not self.is_connected() or self._auto_vacuum_mode() != 2:
+                    break
+                self.cursor.execute('PRAGMA freelist_count')
+                free = self.cursor.fetchone()[0]
+                if free == 0:
+                    break
+                step = min(step, free)
+                # Cada passo da instrução libera uma página e execute() só
+                # avança um passo; executescript roda até o fim
+                self.conn.executescript(f'PRAGMA incremental_vacuum({step})')
+
+            freed += step
+            self._vacuumed_pages += step
+
+        return freed
+
+    def start_maintenance(self, interval: Optional[float] = None):
+        """
+        Inicia a thread de manutenção em segundo plano.
+
+        A cada intervalo libera as páginas livres com incremental_vacuum e
+        roda PRAGMA optimize (que só analisa tabelas quando vale a pena).
+
+        Args:
+            interval: Segundos entre execuções (None = MAINTENANCE_INTERVAL)
+        """
+        if not self.is_connected() or self._maintenance_thread is not None:
+            return
+
+        interval = self.MAINTENANCE_INTERVAL if interval is None else interval
+        self._maintenance_stop.clear()
+        self._maintenance_thread = threading.Thread(
+            target=self._maintenance_loop, args=(interval,),
+            name="TranslationMemoryMaintenance", daemon=True
+        )
+        self._maintenance_thread.start()
+
+    def stop_maintenance(self):
+        """Encerra a thread de manutenção (aguarda o passo em andamento)"""
+        thread = self._maintenance_thread
+        if thread is None:
+            return
+
+        self._maintenance_stop.set()
+        thread.join()
+        self._maintenance_thread = None
+
+    def _maintenance_loop(self, interval: float):
+        """Laço da thread de manutenção"""
+        while not self._maintenance_stop.wait(interval):
+            # Outra instância em operação longa: a manutenção fica para depois
+            lease = self.get_writer_lease()
+            if lease is not None and not lease['own']:
+                continue
+
+            try:
+                while not self._maintenance_stop.is_set():
+                    if not self.incremental_vacuum(self.INCREMENTAL_VACUUM_PAGES):
+                        break
+                with self._write_lock():
+                    if self.is_connected():
+                        self.cursor.execute('PRAGMA optimize')
+
+                # Exclusões deixaram falsos positivos: reconstrói fora da interface
+                bloom = self._bloom
+                if bloom is not None and bloom.stale and self.is_connected():
+                    self._rebuild_bloom()
+            except Exception as e:
+                print(f"Erro na manutenção do banco: {e}")
+
+    def snapshot(self, filepath: str) -> bool:
+        """
+        Grava uma cópia compactada do banco com VACUUM INTO.
+
+        A cópia é feita por uma conexão própria, que lê um retrato consistente
+        do WAL: o escritor continua livre durante a cópia. O arquivo é gravado
+        ao lado e renomeado ao final. Memórias anexadas e o arquivo não entram.
+
+        Args:
+            filepath: Caminho da cópia
+
+        Returns:
+            True se a cópia foi criada
+        """
+        if not self.is_connected():
+            return False
+
+        # Usos pendentes e filtro de Bloom entram na cópia
+        self.flush_usage()
+        self._save_bloom()
+
+        temp_path = filepath + '.tmp'
+        conn = None
+        try:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+            conn = sqlite3.connect(self.db_path, uri=True)
+            if sqlite3.sqlite_version_info >= (3, 27, 0):
+                conn.execute('VACUUM INTO ?', (temp_path,))
+            else:
+                # SQLite antigo: API de backup, em passos
+                target = sqlite3.connect(temp_path)
+                try:
+                    conn.backup(target, pages=1024)
+                finally:
+                    target.close()
+
+            os.replace(temp_path, filepath)
+            return True
+        except Exception as e:
+            print(f"Erro ao criar cópia do banco: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return False
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def get_maintenance_stats(self) -> dict:
+        """Retorna métricas de espaço livre e da manutenção"""
+        if not self.is_connected():
+            return {}
+
+        try:
+            with self._write_lock():
+                self.cursor.execute('PRAGMA freelist_count')
+                free_pages = self.cursor.fetchone()[0]
+                self.cursor.execute('PRAGMA page_count')
+                page_count = self.cursor.fetchone()[0]
+                auto_vacuum = self._auto_vacuum_mode()
+            return {
+                'auto_vacuum': {0: 'none', 1: 'full', 2: 'incremental'}.get(auto_vacuum, auto_vacuum),
+                'page_count': page_count,
+                'free_pages': free_pages,
+                'vacuumed_pages': self._vacuumed_pages,
+                'maintenance_running': self._maintenance_thread is not None
+            }
+        except Exception as e:
+            print(f"Erro ao obter métricas de manutenção: {e}")
+            return {}
+
+    def close(self) -> List[Tuple[str, str]]:
+        """
+        Fecha a conexão com o banco de dados de forma segura
+
+        Returns:
+            Traduções aceitas por add_translation que não puderam ser gravadas
+            (banco ocupado por outro processo mesmo após flush_deferred); quem
+            chama decide o que fazer com elas (ex: exportar com export_rows)
+        """
+        # Fora do lock: a thread de manutenção pode estar esperando por ele.
+        # connect() a encerra antes de adquirir o lock e chamar close()
+        self.stop_maintenance()
+
+        unwritten = []
         with self._lock:
             if self.conn:
+                # Grava usos pendentes e o filtro de Bloom antes de fechar
+                self.flush_usage()
+                unwritten = self.flush_deferred()
+                if unwritten:
+                    print(f"Erro: {len(unwritten)} traduções não foram gravadas "
+                          f"(banco ocupado por outro processo)")
+                    with self._usage_lock:
+                        self._deferred_writes = {}
+                self.release_writer_lease()
+                self._save_bloom()
+                self._prune_journal()
+                self._release_archive()
+
+                # Atualiza estatísticas do planejador só onde mudaram
                 try:
-                    self.conn.close()
+                    self.cursor.execute('PRAGMA optimize')
+                except sqlite3.Error:
+                    pass
+
+                try:
+                    self._pool.close()
                 except Exception:
                     pass
                 finally:
+                    self._pool = None
                     self.conn = None
                     self.cursor = None
 
+        return unwritten
+
     def __enter__(self):
         """Suporte para context manager"""
         return self
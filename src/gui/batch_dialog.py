@@ -380,13 +380,11 @@ class BatchProcessorDialog(QDialog):
         
         self.status_label.setText("Aplicando memória de tradução...")
         
-        # Aplica traduções
-        translations = {}
-        for _, entry in self.batch_processor.all_entries:
-            if not entry.translated_text:
-                translation = self.smart_translator.translate(entry.original_text)
-                if translation:
-                    translations[entry.original_text] = translation
+        # Aplica traduções (textos repetidos entre arquivos são buscados uma vez)
+        untranslated = [entry.original_text for _, entry in self.batch_processor.all_entries
+                        if not entry.translated_text]
+        found = self.smart_translator.translate_many(untranslated)
+        translations = {text: translation for text, (translation, _) in found.items()}
         
         count = self.batch_processor.apply_translations(translations)
         
@@ -5,6 +5,7 @@ Interface moderna e escura para tradução de jogos com segurança e otimizaçã
 
 import sys
 import os
+from itertools import islice
 from pathlib import Path
 
 # Adiciona o diretório src ao path para funcionar com PyInstaller
@@ -24,7 +25,8 @@ from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                               QFileDialog, QComboBox, QProgressBar, QMessageBox,
                               QHeaderView, QLineEdit, QDialog, QTextEdit, QGroupBox,
                               QTabWidget, QSpinBox, QCheckBox, QSplitter, QFrame,
-                              QStatusBar, QToolBar, QMenu, QMenuBar, QApplication)
+                              QStatusBar, QToolBar, QMenu, QMenuBar, QApplication,
+                              QProgressDialog, QInputDialog)
 from PySide6.QtCore import Qt, QThread, Signal, QTimer, QSettings
 from PySide6.QtGui import QPalette, QColor, QFont, QAction, QIcon, QKeySequence, QShortcut
 
@@ -34,6 +36,7 @@ try:
     from regex_profiles import RegexProfileManager
     from file_processor import FileProcessor, TranslationEntry
     from smart_translator import SmartTranslator
+    from write_behind import WriteBehindQueue
     from translation_api import TranslationAPIManager
     from logger import app_logger
     from security import (SecurityValidator, ResourceMonitor, ChunkProcessor,
@@ -45,6 +48,7 @@ except ImportError:
     from src.regex_profiles import RegexProfileManager
     from src.file_processor import FileProcessor, TranslationEntry
     from src.smart_translator import SmartTranslator
+    from src.write_behind import WriteBehindQueue
     from src.translation_api import TranslationAPIManager
     from src.logger import app_logger
     from src.security import (SecurityValidator, ResourceMonitor, ChunkProcessor,
@@ -151,6 +155,34 @@ class TableColors:
     ALTERNATE_ROW = QColor(50, 50, 50)      # Cor de fundo para linhas ímpares
     TRANSLATED_ROW = QColor(40, 60, 40)     # Cor de fundo para linhas traduzidas
 
+# Filtros de arquivo para exportação/importação da memória de tradução
+MEMORY_FILE_FILTER = (
+    "CSV Files (*.csv);;TSV Files (*.tsv);;"
+    "CSV compactado (*.csv.gz);;TSV compactado (*.tsv.gz);;Todos os Arquivos (*)"
+)
+
+def create_progress_dialog(parent, label: str):
+    """
+    Cria um diálogo de progresso e o callback (feito, total) que o atualiza.
+    
+    Usado pelas exportações/importações da memória, que reportam progresso
+    de forma síncrona enquanto processam o arquivo.
+    
+    Returns:
+        Tupla (diálogo, callback)
+    """
+    dialog = QProgressDialog(label, None, 0, 100, parent)
+    dialog.setWindowModality(Qt.WindowModal)
+    dialog.setMinimumDuration(500)
+    dialog.setValue(0)
+    
+    def callback(done, total):
+        if total:
+            dialog.setValue(min(100, int(done / total * 100)))
+        QApplication.processEvents()
+    
+    return dialog, callback
+
 # ============================================================================
 # WORKER THREADS
 # ============================================================================
@@ -177,10 +209,21 @@ class TranslationWorker(QThread):
     def run(self):
         """Executa tradução automática com segurança"""
         try:
-            results = {}
             total = len(self.texts)
             monitor = ResourceMonitor()
             
+            # Primeiro a tradução inteligente, em lote e sem repetições
+            self.status.emit("Buscando na memória de tradução...")
+            found = self.smart_translator.translate_many(self.texts)
+            results = {text: translation for text, (translation, _) in found.items()}
+            
+            strategies = {}
+            for _, strategy in found.values():
+                strategies[strategy] = strategies.get(strategy, 0) + 1
+            if strategies:
+                summary = ", ".join(f"{name}: {count}" for name, count in sorted(strategies.items()))
+                self.status.emit(f"Memória: {len(found)} textos ({summary})")
+            
             for i, text in enumerate(self.texts):
                 if self._cancelled:
                     self.status.emit("Operação cancelada")
@@ -192,15 +235,11 @@ class TranslationWorker(QThread):
                     if not ok:
                         monitor.force_gc_if_needed()
                 
-                # Primeiro tenta tradução inteligente
-                translation = self.smart_translator.translate(text)
-                
-                # Se não encontrou, tenta API
-                if not translation and self.api_manager.active_api:
+                # Se não encontrou na memória, tenta API (repetições só uma vez)
+                if text not in results and self.api_manager.active_api:
                     translation = self.api_manager.translate(text)
-                
-                if translation:
-                    results[text] = translation
+                    if translation:
+                        results[text] = translation
                 
                 # Atualiza progresso
                 progress_value = int((i + 1) / total * 100)
@@ -375,10 +414,14 @@ class DatabaseSelectorDialog(QDialog):
 class DatabaseViewerDialog(QDialog):
     """Diálogo para visualizar e gerenciar o banco de dados"""
     
+    # Linhas carregadas por página no visualizador
+    PAGE_SIZE = 500
+    
     def __init__(self, parent, translation_memory: TranslationMemory):
         super().__init__(parent)
         
         self.translation_memory = translation_memory
+        self._row_iterator = None
         
         self.setWindowTitle("Visualizador de Banco de Dados")
         self.setGeometry(150, 150, 1000, 600)
@@ -395,12 +438,7 @@ class DatabaseViewerDialog(QDialog):
         # Informações do banco
         info_layout = QHBoxLayout()
         
-        stats = self.translation_memory.get_stats()
-        self.info_label = QLabel(
-            f"📁 Banco: {stats.get('db_path', 'Não conectado')} | "
-            f"📊 Total: {stats['total_translations']} traduções | "
-            f"🔄 Usos: {stats['total_usage']}"
-        )
+        self.info_label = QLabel()
         info_layout.addWidget(self.info_label)
         
         layout.addLayout(info_layout)
@@ -410,14 +448,19 @@ class DatabaseViewerDialog(QDialog):
         
         search_layout.addWidget(QLabel("Buscar:"))
         self.search_input = QLineEdit()
-        self.search_input.setPlaceholderText("Digite para buscar...")
+        self.search_input.setPlaceholderText("Digite para buscar... (\"frase exata\")")
         self.search_input.textChanged.connect(self._on_search)
         search_layout.addWidget(self.search_input)
         
+        # Aguarda uma pausa na digitação antes de consultar o banco
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(250)
+        self._search_timer.timeout.connect(self._run_search)
+        
         search_layout.addWidget(QLabel("Categoria:"))
         self.category_combo = QComboBox()
         self.category_combo.addItem("Todas")
-        self.category_combo.addItems(self.translation_memory.get_categories())
         self.category_combo.currentTextChanged.connect(self._on_filter)
         search_layout.addWidget(self.category_combo)
         
@@ -454,6 +497,9 @@ class DatabaseViewerDialog(QDialog):
         self.table.setSelectionBehavior(QTableWidget.SelectRows)
         self.table.itemDoubleClicked.connect(self._on_item_double_clicked)
         
+        # Próxima página só quando a rolagem chega perto do fim
+        self.table.verticalScrollBar().valueChanged.connect(self._on_table_scrolled)
+        
         # Adiciona atalho da tecla Delete para excluir
         delete_shortcut = QShortcut(QKeySequence.Delete, self.table)
         delete_shortcut.activated.connect(self._delete_selected)
@@ -488,33 +534,87 @@ class DatabaseViewerDialog(QDialog):
         layout.addLayout(buttons_layout)
     
     def _load_data(self, search_term: str = None, category: str = None):
-        """Carrega dados na tabela"""
+        """
+        Carrega dados na tabela.
+        
+        As linhas chegam em páginas pelo iterador da memória: a primeira
+        página aparece imediatamente e as demais só são buscadas quando a
+        rolagem se aproxima do fim (_on_table_scrolled), então a tabela
+        guarda apenas o que o usuário já percorreu.
+        """
         if category == "Todas":
             category = None
         
-        translations = self.translation_memory.get_all_translations(
+        self._refresh_summary()
+        
+        # Limpar a tabela rola para o topo; sem iterador, isso não busca página
+        self._row_iterator = None
+        self.table.setRowCount(0)
+        self._row_iterator = self.translation_memory.iter_translations(
             category=category,
-            search_term=search_term
+            search_term=search_term,
+            order='rank' if search_term else 'usage',
+            page_size=self.PAGE_SIZE
+        )
+        self._load_next_page()
+    
+    def _refresh_summary(self):
+        """Atualiza totais e categorias (lidos dos contadores, sem varrer a tabela)"""
+        stats = self.translation_memory.get_stats()
+        self.info_label.setText(
+            f"📁 Banco: {stats.get('db_path', 'Não conectado')} | "
+            f"📊 Total: {stats['total_translations']} traduções | "
+            f"🔄 Usos: {stats['total_usage']}"
         )
         
-        self.table.setRowCount(len(translations))
+        current = self.category_combo.currentText()
+        self.category_combo.blockSignals(True)
+        self.category_combo.clear()
+        self.category_combo.addItem("Todas")
+        self.category_combo.addItems(self.translation_memory.get_categories())
+        index = self.category_combo.findText(current)
+        self.category_combo.setCurrentIndex(max(index, 0))
+        self.category_combo.blockSignals(False)
+    
+    def _on_table_scrolled(self, value: int):
+        """Busca a próxima página quando falta menos de uma tela para o fim"""
+        scrollbar = self.table.verticalScrollBar()
+        if value >= scrollbar.maximum() - scrollbar.pageStep():
+            self._load_next_page()
+    
+    def _load_next_page(self):
+        """Anexa a próxima página de traduções à tabela"""
+        # Todas as linhas da busca atual já foram carregadas
+        if self._row_iterator is None:
+            return
+        
+        rows = list(islice(self._row_iterator, self.PAGE_SIZE))
+        if len(rows) < self.PAGE_SIZE:
+            self._row_iterator = None
+        start = self.table.rowCount()
+        self.table.setRowCount(start + len(rows))
         
-        for i, t in enumerate(translations):
-            self.table.setItem(i, 0, QTableWidgetItem(str(t['id'])))
-            self.table.setItem(i, 1, QTableWidgetItem(t['original_text'][:100]))
-            self.table.setItem(i, 2, QTableWidgetItem(t['translated_text'][:100]))
-            self.table.setItem(i, 3, QTableWidgetItem(t['category']))
-            self.table.setItem(i, 4, QTableWidgetItem(str(t['usage_count'])))
-            self.table.setItem(i, 5, QTableWidgetItem(t['updated_at'][:10] if t['updated_at'] else ''))
+        for i, t in enumerate(rows, start):
+            self.table.setItem(i, 0, QTableWidgetItem(str(t.id)))
+            self.table.setItem(i, 1, QTableWidgetItem(t.original_text[:100]))
+            self.table.setItem(i, 2, QTableWidgetItem(t.translated_text[:100]))
+            self.table.setItem(i, 3, QTableWidgetItem(t.category))
+            self.table.setItem(i, 4, QTableWidgetItem(str(t.usage_count)))
+            self.table.setItem(i, 5, QTableWidgetItem(t.updated_at[:10] if t.updated_at else ''))
             
             # Torna ID não editável
             self.table.item(i, 0).setFlags(self.table.item(i, 0).flags() & ~Qt.ItemIsEditable)
         
-        # Auto-ajusta altura das linhas após carregar dados
-        self._auto_adjust_row_heights()
+        # Auto-ajusta altura apenas das linhas recém-carregadas
+        self._adjust_row_heights_from(start)
     
     def _on_search(self, text):
-        """Callback de busca"""
+        """Callback de busca (reinicia o temporizador de digitação)"""
+        self._search_timer.start()
+    
+    def _run_search(self):
+        """Executa a busca após a pausa na digitação"""
+        text = self.search_input.text()
         category = self.category_combo.currentText()
         self._load_data(search_term=text if text else None, 
                        category=category if category != "Todas" else None)
@@ -543,11 +643,15 @@ class DatabaseViewerDialog(QDialog):
         
         Aplica altura mínima padrão e aumenta conforme necessário.
         """
+        self._adjust_row_heights_from(0)
+    
+    def _adjust_row_heights_from(self, start_row: int):
+        """Ajusta a altura das linhas a partir de start_row"""
         # Altura mínima padrão
         min_height = 30
         
         # Calcula a altura de cada linha baseado no conteúdo
-        for row in range(self.table.rowCount()):
+        for row in range(start_row, self.table.rowCount()):
             max_height = min_height
             
             # Verifica colunas de texto (Original e Tradução)
@@ -709,11 +813,15 @@ class DatabaseViewerDialog(QDialog):
             self,
             "Exportar para CSV",
             "translations.csv",
-            "CSV Files (*.csv)"
+            MEMORY_FILE_FILTER
         )
         
         if filepath:
-            if self.translation_memory.export_to_file(filepath):
+            progress, callback = create_progress_dialog(self, "Exportando memória de tradução...")
+            success = self.translation_memory.export_to_file(filepath, progress_callback=callback)
+            progress.close()
+            
+            if success:
                 QMessageBox.information(self, "Sucesso", f"Exportado para:\n{filepath}")
             else:
                 QMessageBox.critical(self, "Erro", "Falha ao exportar")
@@ -724,11 +832,15 @@ class DatabaseViewerDialog(QDialog):
             self,
             "Importar de CSV",
             "",
-            "CSV Files (*.csv)"
+            MEMORY_FILE_FILTER
         )
         
         if filepath:
-            imported, errors = self.translation_memory.import_from_file(filepath)
+            progress, callback = create_progress_dialog(self, "Importando traduções...")
+            imported, errors = self.translation_memory.import_from_file(
+                filepath, progress_callback=callback
+            )
+            progress.close()
             QMessageBox.information(
                 self, 
                 "Importação Concluída",
@@ -992,6 +1104,12 @@ class SettingsDialog(QDialog):
         monitor_layout.addWidget(self.memory_label)
         monitor_layout.addWidget(self.cpu_label)
         
+        # Métricas do pool de conexões do banco de dados
+        self.db_pool_label = QLabel()
+        self.db_pool_label.setWordWrap(True)
+        self._update_db_pool_label()
+        monitor_layout.addWidget(self.db_pool_label)
+        
         btn_refresh_monitor = QPushButton("Atualizar")
         btn_refresh_monitor.clicked.connect(self._refresh_monitor)
         monitor_layout.addWidget(btn_refresh_monitor)
@@ -1239,6 +1357,27 @@ class SettingsDialog(QDialog):
         monitor = ResourceMonitor()
         self.memory_label.setText(f"Memória em uso: {monitor.get_memory_usage_mb():.1f} MB")
         self.cpu_label.setText(f"CPU: {monitor.get_cpu_percent():.1f}%")
+        self._update_db_pool_label()
+    
+    def _update_db_pool_label(self):
+        """Atualiza as métricas do pool de conexões do banco"""
+        if not self.translation_memory or not self.translation_memory.is_connected():
+            self.db_pool_label.setText("Banco de dados: não conectado")
+            return
+        
+        pool = self.translation_memory.get_pool_stats()
+        self.db_pool_label.setText(
+            f"Conexões ativas: {pool['active_connections']} "
+            f"({pool['reader_connections']} leitura + 1 escrita) | "
+            f"Leituras: {pool['reads']}\n"
+            f"Disputas do escritor: {pool['writer_contentions']}/{pool['writer_acquisitions']} | "
+            f"Espera total: {pool['writer_wait_ms_total']:.1f} ms "
+            f"(máx. {pool['writer_wait_ms_max']:.1f} ms)\n"
+            f"Esperas por outros processos: {pool['busy_waits']} "
+            f"({pool['busy_wait_ms_total']:.1f} ms, máx. {pool['busy_wait_ms_max']:.1f} ms) | "
+            f"Novas tentativas: {pool['busy_retries']} | "
+            f"Gravações adiadas: {pool['deferred_writes']}"
+        )
     
     def _on_sensitive_memory_changed(self, state):
         """
@@ -1299,6 +1438,7 @@ class MainWindow(QMainWindow):
 
         # Inicializa componentes
         self.translation_memory = TranslationMemory()  # Sem conexão inicial
+        self.write_queue = None  # Gravação assíncrona na memória (após conectar)
         self.profile_manager = RegexProfileManager()
         self.smart_translator = None  # Inicializado após conectar ao banco
         self.suggestion_engine = None  # Motor de sugestões contextuais
@@ -1337,6 +1477,11 @@ class MainWindow(QMainWindow):
         self.resource_timer.timeout.connect(self._update_resource_status)
         self.resource_timer.start(5000)  # A cada 5 segundos
 
+        # Timer para detectar alterações feitas por outras instâncias no mesmo banco
+        self.memory_poll_timer = QTimer()
+        self.memory_poll_timer.timeout.connect(self._poll_memory_changes)
+        self.memory_poll_timer.start(2000)  # A cada 2 segundos
+
         # Habilita drag and drop
         self.setAcceptDrops(True)
 
@@ -1662,10 +1807,52 @@ class MainWindow(QMainWindow):
         action_export_db.triggered.connect(self._export_database)
         db_menu.addAction(action_export_db)
         
+        action_export_snapshot = QAction("Exportar Snapshot Compilado...", self)
+        action_export_snapshot.triggered.connect(self._export_snapshot)
+        db_menu.addAction(action_export_snapshot)
+        
         action_import_db = QAction("Importar de CSV...", self)
         action_import_db.triggered.connect(self._import_database)
         db_menu.addAction(action_import_db)
         
+        action_merge_db = QAction("Mesclar Outro Banco de Dados...", self)
+        action_merge_db.triggered.connect(self._merge_database)
+        db_menu.addAction(action_merge_db)
+        
+        action_export_delta = QAction("Exportar Alterações (Delta)...", self)
+        action_export_delta.triggered.connect(self._export_changes)
+        db_menu.addAction(action_export_delta)
+        
+        action_apply_delta = QAction("Aplicar Alterações (Delta)...", self)
+        action_apply_delta.triggered.connect(self._apply_changes)
+        db_menu.addAction(action_apply_delta)
+        
+        action_backup_db = QAction("Criar Cópia Compactada...", self)
+        action_backup_db.triggered.connect(self._snapshot_database)
+        db_menu.addAction(action_backup_db)
+        
+        action_archive_db = QAction("Arquivar Traduções Pouco Usadas...", self)
+        action_archive_db.triggered.connect(self._archive_memory)
+        db_menu.addAction(action_archive_db)
+        
+        action_build_templates = QAction("Gerar Modelos Numéricos", self)
+        action_build_templates.triggered.connect(self._build_templates)
+        db_menu.addAction(action_build_templates)
+        
+        action_check_stats = QAction("Verificar Estatísticas", self)
+        action_check_stats.triggered.connect(self._check_database_stats)
+        db_menu.addAction(action_check_stats)
+        
+        db_menu.addSeparator()
+        
+        action_attach_db = QAction("Anexar Memória Compartilhada...", self)
+        action_attach_db.triggered.connect(self._attach_memory)
+        db_menu.addAction(action_attach_db)
+        
+        action_detach_db = QAction("Desanexar Memórias Compartilhadas", self)
+        action_detach_db.triggered.connect(self._detach_memories)
+        db_menu.addAction(action_detach_db)
+        
         # Menu Ferramentas
         tools_menu = menubar.addMenu("Ferramentas")
         
@@ -1782,6 +1969,7 @@ class MainWindow(QMainWindow):
         layout.addWidget(QLabel("Perfil:"))
         self.combo_profile = QComboBox()
         self.combo_profile.addItems(self.profile_manager.get_all_profile_names())
+        self.combo_profile.currentTextChanged.connect(self._apply_profile_variations)
         layout.addWidget(self.combo_profile)
         
         # Botão editar perfis
@@ -1980,12 +2168,24 @@ class MainWindow(QMainWindow):
     
     def _connect_database(self, db_path: str):
         """Conecta a um banco de dados"""
+        # Grava edições pendentes no banco atual antes de trocar
+        self._close_write_queue()
+        self._close_memory()
+
         if self.translation_memory.connect(db_path):
+            self.write_queue = WriteBehindQueue(self.translation_memory)
+            self.translation_memory.start_maintenance()
+            self._attach_saved_memories()
+            self._remove_memory_listeners()
             self.smart_translator = SmartTranslator(self.translation_memory)
+            self.smart_translator.set_write_queue(self.write_queue)
+            self._apply_profile_variations()
+            self.translation_memory.add_change_listener(self.smart_translator.apply_memory_changes)
             
             # Inicializa motor de sugestões contextuais
             if ContextualSuggestionEngine is not None:
                 self.suggestion_engine = ContextualSuggestionEngine(self.translation_memory)
+                self.translation_memory.add_change_listener(self.suggestion_engine.apply_memory_changes)
             
             stats = self.translation_memory.get_stats()
             self.db_info_label.setText(
@@ -2001,6 +2201,92 @@ class MainWindow(QMainWindow):
         else:
             QMessageBox.critical(self, "Erro", "Falha ao conectar ao banco de dados")
     
+    def _remember_translation(self, original: str, translated: str, learn: bool = True):
+        """
+        Grava uma tradução na memória sem bloquear a interface
+
+        Args:
+            original: Texto original
+            translated: Texto traduzido
+            learn: Se True, também aprende o padrão numérico
+        """
+        if self.write_queue:
+            self.write_queue.put(original, translated)
+        else:
+            self.translation_memory.add_translation(original, translated)
+
+        if learn and self.smart_translator:
+            self.smart_translator.learn_pattern(original, translated, persist=False)
+
+    def _flush_memory_writes(self):
+        """Grava imediatamente as traduções pendentes na fila"""
+        if self.write_queue and not self.write_queue.flush():
+            app_logger.error("Falha ao gravar traduções pendentes na memória")
+
+    def _remove_memory_listeners(self):
+        """Remove os listeners de alterações do tradutor e das sugestões atuais"""
+        if self.smart_translator:
+            self.translation_memory.remove_change_listener(self.smart_translator.apply_memory_changes)
+        if self.suggestion_engine is not None:
+            self.translation_memory.remove_change_listener(self.suggestion_engine.apply_memory_changes)
+
+    def _poll_memory_changes(self):
+        """Atualiza caches com traduções gravadas por outras instâncias no mesmo banco"""
+        if not self.translation_memory.is_connected():
+            return
+
+        changes = self.translation_memory.poll_changes()
+        if changes is None or changes:
+            count = 'várias' if changes is None else len(changes)
+            app_logger.info(f"Memória alterada por outra instância: {count} alterações")
+
+    def _close_write_queue(self):
+        """Grava o que está pendente e encerra a fila de gravação"""
+        if self.write_queue:
+            if not self.write_queue.close():
+                self._offer_unwritten_export(self.write_queue.unwritten(),
+                                             self.write_queue.last_error or "falha de gravação")
+            self.write_queue = None
+            if self.smart_translator:
+                self.smart_translator.set_write_queue(None)
+
+    def _close_memory(self):
+        """Fecha a memória e oferece exportar o que o banco ocupado não aceitou"""
+        if self.translation_memory.is_connected():
+            unwritten = self.translation_memory.close()
+            self._offer_unwritten_export(unwritten, "banco ocupado por outro processo")
+
+    def _offer_unwritten_export(self, rows: list, reason: str):
+        """
+        Avisa que traduções não foram gravadas e oferece exportá-las
+
+        Args:
+            rows: Pares (original, tradução) que ficaram fora do banco
+            reason: Motivo mostrado ao usuário
+        """
+        if not rows:
+            return
+
+        app_logger.error(f"{len(rows)} traduções não foram gravadas na memória: {reason}")
+        reply = QMessageBox.question(
+            self,
+            "Traduções Não Gravadas",
+            f"{len(rows)} traduções não foram gravadas na memória ({reason}).\n"
+            "Deseja exportá-las para um arquivo? (Use depois \"Importar de CSV...\")",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if reply != QMessageBox.Yes:
+            return
+
+        filepath, _ = QFileDialog.getSaveFileName(
+            self,
+            "Exportar Traduções Não Gravadas",
+            "traducoes_nao_gravadas.csv",
+            MEMORY_FILE_FILTER
+        )
+        if filepath and not TranslationMemory.export_rows(filepath, rows):
+            QMessageBox.critical(self, "Erro", "Falha ao exportar as traduções")
+
     def _create_new_database(self):
         """Cria um novo banco de dados"""
         filepath, _ = QFileDialog.getSaveFileName(
@@ -2036,6 +2322,8 @@ class MainWindow(QMainWindow):
         if not self.translation_memory.is_connected():
             QMessageBox.warning(self, "Aviso", "Conecte a um banco de dados primeiro")
             return
+
+        self._flush_memory_writes()
         
         dialog = DatabaseViewerDialog(self, self.translation_memory)
         dialog.exec()
@@ -2045,41 +2333,344 @@ class MainWindow(QMainWindow):
         if not self.translation_memory.is_connected():
             QMessageBox.warning(self, "Aviso", "Conecte a um banco de dados primeiro")
             return
+
+        self._flush_memory_writes()
         
         filepath, _ = QFileDialog.getSaveFileName(
             self,
             "Exportar para CSV",
             "translations.csv",
-            "CSV Files (*.csv)"
+            MEMORY_FILE_FILTER
         )
         
         if filepath:
-            if self.translation_memory.export_to_file(filepath):
+            progress, callback = create_progress_dialog(self, "Exportando memória de tradução...")
+            success = self.translation_memory.export_to_file(filepath, progress_callback=callback)
+            progress.close()
+            
+            if success:
                 QMessageBox.information(self, "Sucesso", f"Exportado para:\n{filepath}")
             else:
                 QMessageBox.critical(self, "Erro", "Falha ao exportar")
     
+    def _export_snapshot(self):
+        """Exporta a memória para um snapshot somente leitura (uso em lote)"""
+        if not self.translation_memory.is_connected():
+            QMessageBox.warning(self, "Aviso", "Conecte a um banco de dados primeiro")
+            return
+
+        self._flush_memory_writes()
+        
+        filepath, _ = QFileDialog.getSaveFileName(
+            self,
+            "Exportar Snapshot Compilado",
+            "translation_memory.tmsnap",
+            "Snapshot da Memória (*.tmsnap)"
+        )
+        
+        if filepath:
+            progress, callback = create_progress_dialog(self, "Compilando snapshot da memória...")
+            count = self.translation_memory.export_snapshot(filepath, progress_callback=callback)
+            progress.close()
+            
+            if count >= 0:
+                QMessageBox.information(
+                    self, "Sucesso", f"{count} traduções exportadas para:\n{filepath}"
+                )
+            else:
+                QMessageBox.critical(self, "Erro", "Falha ao exportar snapshot")
+    
     def _import_database(self):
         """Importa traduções de CSV"""
         if not self.translation_memory.is_connected():
             QMessageBox.warning(self, "Aviso", "Conecte a um banco de dados primeiro")
             return
+
+        self._flush_memory_writes()
         
         filepath, _ = QFileDialog.getOpenFileName(
             self,
             "Importar de CSV",
             "",
-            "CSV Files (*.csv)"
+            MEMORY_FILE_FILTER
         )
         
         if filepath:
-            imported, errors = self.translation_memory.import_from_file(filepath)
+            progress, callback = create_progress_dialog(self, "Importando traduções...")
+            imported, errors = self.translation_memory.import_from_file(
+                filepath, progress_callback=callback
+            )
+            progress.close()
             QMessageBox.information(
                 self,
                 "Importação Concluída",
                 f"Importados: {imported}\nErros: {errors}"
             )
     
+    def _merge_database(self):
+        """Mescla outra memória de tradução (.db) no banco conectado"""
+        if not self.translation_memory.is_connected():
+            QMessageBox.warning(self, "Aviso", "Conecte a um banco de dados primeiro")
+            return
+
+        self._flush_memory_writes()
+        
+        filepath, _ = QFileDialog.getOpenFileName(
+            self,
+            "Mesclar Banco de Dados",
+            "",
+            "Banco de Dados (*.db)"
+        )
+        
+        if filepath:
+            merged, errors = self.translation_memory.merge_database(filepath)
+            QMessageBox.information(
+                self,
+                "Mesclagem Concluída",
+                f"Inseridas/atualizadas: {merged}\nErros: {errors}"
+            )
+            self._update_statistics()
+    
+    def _snapshot_database(self):
+        """Cria uma cópia compactada do banco sem bloquear as gravações"""
+        if not self.translation_memory.is_connected():
+            QMessageBox.warning(self, "Aviso", "Conecte a um banco de dados primeiro")
+            return
+
+        self._flush_memory_writes()
+        
+        filepath, _ = QFileDialog.getSaveFileName(
+            self,
+            "Criar Cópia Compactada",
+            "translation_memory_backup.db",
+            "Banco de Dados (*.db)"
+        )
+        
+        if filepath:
+            if os.path.abspath(filepath) == os.path.abspath(self.translation_memory.get_db_path()):
+                QMessageBox.warning(self, "Aviso", "Escolha um arquivo diferente do banco conectado")
+                return
+            
+            if self.translation_memory.snapshot(filepath):
+                QMessageBox.information(self, "Sucesso", f"Cópia criada em:\n{filepath}")
+            else:
+                QMessageBox.critical(self, "Erro", "Falha ao criar cópia do banco")
+    
+    def _archive_memory(self):
+        """Move traduções pouco usadas para o banco de arquivo"""
+        if not self.translation_memory.is_connected():
+            QMessageBox.warning(self, "Aviso", "Conecte a um banco de dados primeiro")
+            return
+
+        self._flush_memory_writes()
+        
+        max_usage, ok = QInputDialog.getInt(
+            self,
+            "Arquivar Traduções",
+            "Arquivar traduções usadas no máximo quantas vezes?\n"
+            "(Elas continuam disponíveis e voltam ao banco principal quando usadas)",
+            1, 0, 1000000
+        )
+        if not ok:
+            return
+        
+        progress, callback = create_progress_dialog(self, "Arquivando traduções...")
+        moved = self.translation_memory.archive_entries(max_usage=max_usage, progress_callback=callback)
+        progress.close()
+        
+        QMessageBox.information(
+            self,
+            "Arquivamento Concluído",
+            f"Traduções arquivadas: {moved}\n"
+            f"Arquivo: {self.translation_memory.get_archive_path() or '-'}"
+        )
+        self._update_statistics()
+    
+    def _build_templates(self):
+        """Gera modelos numéricos ("Wave {0} of {1}") a partir das traduções do banco"""
+        if not self.translation_memory.is_connected():
+            QMessageBox.warning(self, "Aviso", "Conecte a um banco de dados primeiro")
+            return
+
+        self._flush_memory_writes()
+        
+        progress, callback = create_progress_dialog(self, "Gerando modelos numéricos...")
+        created = self.translation_memory.build_templates(progress_callback=callback)
+        progress.close()
+        
+        QMessageBox.information(
+            self,
+            "Modelos Numéricos",
+            f"Modelos criados: {created}\n"
+            f"Total de modelos: {self.translation_memory.get_stats().get('templates', 0)}"
+        )
+    
+    def _export_changes(self):
+        """Exporta só o que mudou desde a última exportação de delta deste banco"""
+        if not self.translation_memory.is_connected():
+            QMessageBox.warning(self, "Aviso", "Conecte a um banco de dados primeiro")
+            return
+
+        self._flush_memory_writes()
+        
+        settings = QSettings(SETTINGS_ORG_NAME, SETTINGS_APP_NAME)
+        positions = settings.value("delta_export_positions", {}) or {}
+        db_path = os.path.abspath(self.translation_memory.get_db_path())
+        since = positions.get(db_path)
+        
+        if since is not None:
+            reply = QMessageBox.question(
+                self,
+                "Exportar Alterações",
+                "Exportar apenas as alterações desde a última exportação deste banco?\n"
+                "(Não = exportar todas as traduções)",
+                QMessageBox.Yes | QMessageBox.No
+            )
+            if reply != QMessageBox.Yes:
+                since = None
+        
+        filepath, _ = QFileDialog.getSaveFileName(
+            self,
+            "Exportar Alterações",
+            "translation_delta.csv.gz",
+            MEMORY_FILE_FILTER
+        )
+        
+        if filepath:
+            progress, callback = create_progress_dialog(self, "Exportando alterações...")
+            stats = self.translation_memory.export_changes(
+                filepath, since=int(since) if since is not None else None,
+                progress_callback=callback
+            )
+            progress.close()
+            
+            if stats is None:
+                QMessageBox.critical(
+                    self, "Erro",
+                    "Falha ao exportar alterações.\nSe a última exportação for muito antiga, "
+                    "exporte todas as traduções."
+                )
+                return
+            
+            positions[db_path] = stats['next_since']
+            settings.setValue("delta_export_positions", positions)
+            QMessageBox.information(
+                self,
+                "Exportação Concluída",
+                f"Alteradas: {stats['upserts']}\nRemovidas: {stats['deletes']}\n"
+                f"Tamanho: {stats['bytes'] / 1024:.1f} KB"
+            )
+    
+    def _apply_changes(self):
+        """Aplica um delta exportado por outro banco (vence a alteração mais recente)"""
+        if not self.translation_memory.is_connected():
+            QMessageBox.warning(self, "Aviso", "Conecte a um banco de dados primeiro")
+            return
+
+        self._flush_memory_writes()
+        
+        filepath, _ = QFileDialog.getOpenFileName(
+            self,
+            "Aplicar Alterações",
+            "",
+            MEMORY_FILE_FILTER
+        )
+        
+        if filepath:
+            progress, callback = create_progress_dialog(self, "Aplicando alterações...")
+            stats = self.translation_memory.apply_changes(filepath, progress_callback=callback)
+            progress.close()
+            
+            if stats is None:
+                QMessageBox.critical(self, "Erro", "Falha ao aplicar alterações")
+                return
+            
+            QMessageBox.information(
+                self,
+                "Alterações Aplicadas",
+                f"Linhas no arquivo: {stats['rows']}\n"
+                f"Inseridas/atualizadas: {stats['applied']}\n"
+                f"Removidas: {stats['deleted']}\n"
+                f"Ignoradas (versão local mais recente): {stats['skipped']}\n"
+                f"Erros: {stats['errors']}\n"
+                f"Tamanho: {stats['bytes'] / 1024:.1f} KB"
+            )
+            self._update_statistics()
+    
+    def _attach_saved_memories(self):
+        """Anexa as memórias compartilhadas salvas nas configurações"""
+        settings = QSettings(SETTINGS_ORG_NAME, SETTINGS_APP_NAME)
+        saved = settings.value("attached_memories", [], type=list)
+        attached = {m['path'] for m in self.translation_memory.get_attached_memories()}
+        
+        for path in saved:
+            if os.path.abspath(path) not in attached and os.path.exists(path):
+                if not self.translation_memory.attach_memory(path):
+                    app_logger.warning(f"Falha ao anexar memória compartilhada: {path}")
+    
+    def _save_attached_memories(self):
+        """Salva a lista de memórias anexadas nas configurações"""
+        settings = QSettings(SETTINGS_ORG_NAME, SETTINGS_APP_NAME)
+        settings.setValue(
+            "attached_memories",
+            [m['path'] for m in self.translation_memory.get_attached_memories()]
+        )
+    
+    def _attach_memory(self):
+        """Anexa outra memória (.db) para consulta, sem gravar nela"""
+        if not self.translation_memory.is_connected():
+            QMessageBox.warning(self, "Aviso", "Conecte a um banco de dados primeiro")
+            return
+        
+        filepath, _ = QFileDialog.getOpenFileName(
+            self,
+            "Anexar Memória Compartilhada",
+            "",
+            "Banco de Dados (*.db)"
+        )
+        
+        if filepath:
+            if self.translation_memory.attach_memory(filepath):
+                self._save_attached_memories()
+                names = ", ".join(
+                    os.path.basename(m['path'])
+                    for m in self.translation_memory.get_attached_memories()
+                )
+                QMessageBox.information(
+                    self,
+                    "Memória Anexada",
+                    f"Consultando também (em ordem de prioridade):\n{names}"
+                )
+                app_logger.info(f"Memória compartilhada anexada: {filepath}")
+            else:
+                QMessageBox.critical(self, "Erro", "Falha ao anexar a memória")
+    
+    def _detach_memories(self):
+        """Remove todas as memórias anexadas"""
+        for memory in self.translation_memory.get_attached_memories():
+            self.translation_memory.detach_memory(memory['alias'])
+        self._save_attached_memories()
+        self.status_label.setText("Memórias compartilhadas desanexadas")
+    
+    def _check_database_stats(self):
+        """Confere os contadores de estatísticas e recalcula se divergirem"""
+        if not self.translation_memory.is_connected():
+            QMessageBox.warning(self, "Aviso", "Conecte a um banco de dados primeiro")
+            return
+        
+        self._flush_memory_writes()
+        
+        if self.translation_memory.verify_stats(repair=True):
+            QMessageBox.information(self, "Estatísticas", "Estatísticas consistentes.")
+        else:
+            QMessageBox.information(
+                self,
+                "Estatísticas",
+                "Estatísticas divergentes foram recalculadas."
+            )
+            app_logger.warning("Estatísticas da memória recalculadas")
+        self._update_statistics()
+    
     def import_file(self):
         """Importa arquivo para tradução"""
         # Verifica banco de dados
@@ -2293,10 +2884,13 @@ class MainWindow(QMainWindow):
         if not self.smart_translator:
             return
         
+        translations = self.smart_translator.translate_many(
+            [entry.original_text for entry in self.entries]
+        )
         for entry in self.entries:
-            translation = self.smart_translator.translate(entry.original_text)
-            if translation:
-                entry.translated_text = translation
+            found = translations.get(entry.original_text)
+            if found:
+                entry.translated_text = found[0]
     
     def _populate_table(self):
         """Popula a tabela com as entradas"""
@@ -2429,10 +3023,7 @@ class MainWindow(QMainWindow):
                         return
             
             if translated and self.translation_memory.is_connected():
-                self.translation_memory.add_translation(original, translated)
-                
-                if self.smart_translator:
-                    self.smart_translator.learn_pattern(original, translated)
+                self._remember_translation(original, translated)
                 
                 app_logger.log_translation(original, translated, "manual")
                 
@@ -2681,10 +3272,7 @@ class MainWindow(QMainWindow):
             
             # Adiciona à memória
             if self.translation_memory.is_connected():
-                self.translation_memory.add_translation(original, translation)
-                
-                if self.smart_translator:
-                    self.smart_translator.learn_pattern(original, translation)
+                self._remember_translation(original, translation)
                 
                 app_logger.log_translation(original, translation, "paste")
             
@@ -2861,9 +3449,10 @@ class MainWindow(QMainWindow):
                 
                 # Adiciona à memória
                 if self.translation_memory.is_connected():
-                    self.translation_memory.add_translation(
+                    self._remember_translation(
                         entry.original_text,
-                        entry.translated_text
+                        entry.translated_text,
+                        learn=False
                     )
                 count += 1
         
@@ -2895,6 +3484,9 @@ class MainWindow(QMainWindow):
         try:
             self.status_label.setText("Salvando arquivo...")
 
+            # Garante que a memória tem todas as edições antes de salvar
+            self._flush_memory_writes()
+
             # Atualiza status do Discord para "salvando"
             if self.discord_rpc and self.discord_rpc.is_connected:
                 self.discord_rpc.set_saving(os.path.basename(self.current_file))
@@ -3060,6 +3652,17 @@ class MainWindow(QMainWindow):
         idx = self.combo_profile.findText(current)
         if idx >= 0:
             self.combo_profile.setCurrentIndex(idx)
+        
+        # Variações do perfil podem ter sido editadas
+        self._apply_profile_variations()
+    
+    def _apply_profile_variations(self):
+        """Usa na memória sensível os pares de variação do perfil selecionado"""
+        if not self.smart_translator:
+            return
+        
+        profile = self.profile_manager.get_profile(self.combo_profile.currentText())
+        self.smart_translator.set_variations(profile.variations if profile else None)
     
     def _import_translations(self):
         """Importa traduções de arquivo existente"""
@@ -3082,9 +3685,10 @@ class MainWindow(QMainWindow):
                             
                             # Adiciona à memória
                             if self.translation_memory.is_connected():
-                                self.translation_memory.add_translation(
+                                self._remember_translation(
                                     entry.original_text,
-                                    translation
+                                    translation,
+                                    learn=False
                                 )
                             break
             
@@ -3283,9 +3887,10 @@ class MainWindow(QMainWindow):
         if self.discord_rpc:
             self.discord_rpc.disconnect()
 
-        # Fecha conexão com banco de dados
+        # Grava edições pendentes e fecha conexão com banco de dados
+        self._close_write_queue()
         if self.translation_memory:
-            self.translation_memory.close()
+            self._close_memory()
 
         # Para timer de recursos
         self.resource_timer.stop()
@@ -3463,7 +4068,7 @@ class MainWindow(QMainWindow):
         # Salva na memória
         if self.translation_memory.is_connected():
             original = self.entries[row].original_text
-            self.translation_memory.add_translation(original, translation)
+            self._remember_translation(original, translation, learn=False)
             
             # Atualiza status visual
             self.table.item(row, 3).setText("✅")
@@ -26,8 +26,10 @@ else:
 
 try:
     from regex_profiles import RegexProfileManager, RegexProfile
+    from variation_lexicon import format_variations, parse_variations
 except ImportError:
     from src.regex_profiles import RegexProfileManager, RegexProfile
+    from src.variation_lexicon import format_variations, parse_variations
 
 
 class RegexTestWidget(QWidget):
@@ -293,6 +295,18 @@ class ProfileEditorDialog(QDialog):
         self.exclude_editor = RegexPatternEditor("Padrões de Exclusão (textos a ignorar)")
         patterns_layout.addWidget(self.exclude_editor)
         
+        # Pares de variação da memória sensível
+        variations_group = QGroupBox("Variações (um par por linha)")
+        variations_layout = QVBoxLayout()
+        self.variations_input = QTextEdit()
+        self.variations_input.setPlaceholderText(
+            "Iron = Steel\nLight = Heavy | Leve = Pesada\n(vazio = pares padrão)"
+        )
+        self.variations_input.setMaximumHeight(120)
+        variations_layout.addWidget(self.variations_input)
+        variations_group.setLayout(variations_layout)
+        patterns_layout.addWidget(variations_group)
+        
         splitter.addWidget(patterns_widget)
         
         # Painel direito - Teste
@@ -353,6 +367,7 @@ class ProfileEditorDialog(QDialog):
         
         self.capture_editor.set_patterns(self.profile.capture_patterns)
         self.exclude_editor.set_patterns(self.profile.exclude_patterns)
+        self.variations_input.setPlainText(format_variations(self.profile.variations))
     
     def _test_capture_pattern(self):
         """Testa o primeiro padrão de captura"""
@@ -379,7 +394,8 @@ class ProfileEditorDialog(QDialog):
             description=self.desc_input.text().strip(),
             capture_patterns=capture_patterns,
             exclude_patterns=self.exclude_editor.get_patterns(),
-            file_type=self.type_combo.currentText()
+            file_type=self.type_combo.currentText(),
+            variations=parse_variations(self.variations_input.toPlainText())
         )
         
         self.accept()
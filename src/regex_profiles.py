@@ -64,7 +64,8 @@ class RegexProfile:
     def __init__(self, name: str, description: str = "", 
                  capture_patterns: List[str] = None,
                  exclude_patterns: List[str] = None,
-                 file_type: str = "json"):
+                 file_type: str = "json",
+                 variations: List[List[str]] = None):
         """
         Inicializa um perfil de regex
         
@@ -74,12 +75,15 @@ class RegexProfile:
             capture_patterns: Lista de padrões regex para capturar texto
             exclude_patterns: Lista de padrões regex para excluir texto
             file_type: Tipo de arquivo (json ou xml)
+            variations: Pares de variação do projeto, como ["Iron", "Steel"] ou
+                        ["Iron", "Steel", "Ferro", "Aço"] (vazio = pares padrão)
         """
         self.name = name
         self.description = description
         self.capture_patterns = capture_patterns or []
         self.exclude_patterns = exclude_patterns or []
         self.file_type = file_type
+        self.variations = variations or []
     
     def to_dict(self) -> dict:
         """Converte o perfil para dicionário"""
@@ -88,7 +92,8 @@ class RegexProfile:
             'description': self.description,
             'capture_patterns': self.capture_patterns,
             'exclude_patterns': self.exclude_patterns,
-            'file_type': self.file_type
+            'file_type': self.file_type,
+            'variations': self.variations
         }
     
     @classmethod
@@ -99,7 +104,8 @@ class RegexProfile:
             description=data.get('description', ''),
             capture_patterns=data.get('capture_patterns', []),
             exclude_patterns=data.get('exclude_patterns', []),
-            file_type=data.get('file_type', 'json')
+            file_type=data.get('file_type', 'json'),
+            variations=data.get('variations', [])
         )
 
 class RegexProfileManager:
@@ -5,25 +5,86 @@ Inclui memória sensível a padrões (ativável/desativável)
 """
 
 import re
-from typing import Dict, Optional, List, Tuple
-from database import TranslationMemory
+from typing import Dict, Optional, List, Tuple, Union
+from database import TranslationMemory, TranslationChange
+from translation_templates import extract_template, fill_template
+from variation_lexicon import DEFAULT_VARIATIONS, VariationLexicon
+from tm_snapshot import SnapshotMemory
+from write_behind import WriteBehindQueue
 
 class SmartTranslator:
     """Gerencia tradução inteligente com reaproveitamento automático"""
     
-    def __init__(self, translation_memory: TranslationMemory):
+    # Formas "Base<separador><número>" reconhecidas pela memória sensível
+    NUMERIC_SUFFIX_PATTERNS = [
+        (re.compile(r'^(.+?)\s+(\d+)$'), ' '),
+        (re.compile(r'^(.+?)_(\d+)$'), '_'),
+        (re.compile(r'^(.+?)-(\d+)$'), '-'),
+        (re.compile(r'^(.+?)(\d+)$'), ''),
+    ]
+    
+    def __init__(self, translation_memory: Union[TranslationMemory, SnapshotMemory],
+                 variations: Optional[List[List[str]]] = None):
         """
         Inicializa o tradutor inteligente
         
         Args:
-            translation_memory: Instância da memória de tradução
+            translation_memory: Instância da memória de tradução, ou um
+                                SnapshotMemory para uso somente leitura
+            variations: Pares de variação do perfil (None = DEFAULT_VARIATIONS)
         """
         self.memory = translation_memory
-        self.pattern_cache: Dict[str, str] = {}
+        self._write_queue: Optional[WriteBehindQueue] = None
+        self._variation_lexicon = VariationLexicon(variations or DEFAULT_VARIATIONS)
+        
+        # Índice de padrões numéricos: (base, separador, dígitos) ->
+        # (base traduzida, separador traduzido, original de origem, número).
+        # Dígitos 0 = qualquer largura. Montado na primeira consulta.
+        self._pattern_index: Optional[Dict[Tuple[str, str, int], Tuple[str, str, str, str]]] = None
+        self._pattern_sources: Dict[str, List[Tuple[str, str, int]]] = {}
+        self._pattern_index_epoch: Optional[int] = None
         
         # Configuração da memória sensível a padrões
         self._sensitive_memory_enabled = True  # Ativado por padrão
     
+    @property
+    def pattern_cache(self) -> Dict[str, str]:
+        """
+        Padrões aprendidos com learn_pattern ({base original: base traduzida}).
+        
+        Ficam na tabela learned_patterns do banco, compartilhados com outras
+        instâncias e mantidos entre execuções.
+        """
+        return {base: translated for base, (translated, _) in self.memory.get_learned_patterns().items()}
+    
+    def set_variations(self, variations: Optional[List[List[str]]]):
+        """
+        Troca os pares de variação (ex: os do perfil do projeto).
+        
+        Args:
+            variations: Pares ["Light", "Heavy"] ou ["Light", "Heavy", "Leve", "Pesada"];
+                        None ou lista vazia volta para DEFAULT_VARIATIONS
+        """
+        self._variation_lexicon = VariationLexicon(variations or DEFAULT_VARIATIONS)
+    
+    def set_write_queue(self, write_queue: Optional[WriteBehindQueue]):
+        """
+        Define a fila de gravação usada por learn_pattern com persist=False.
+        
+        Args:
+            write_queue: Fila da mesma memória, ou None para gravar na hora
+        """
+        self._write_queue = write_queue
+    
+    def get_variations(self) -> List[Tuple[str, str, str, str]]:
+        """
+        Retorna os pares de variação em uso.
+        
+        Returns:
+            Lista de (termo_a, termo_b, traduzido_a, traduzido_b)
+        """
+        return list(self._variation_lexicon.pairs)
+    
     # ============================================================================
     # CONFIGURAÇÃO DA MEMÓRIA SENSÍVEL
     # ============================================================================
@@ -83,25 +144,232 @@ class SmartTranslator:
         if exact_match:
             return exact_match
         
-        # 2. Se memória sensível está ativada, busca por padrões
+        found = self._translate_miss(text)
+        return found[0] if found else None
+    
+    def translate_many(self, texts: List[str]) -> Dict[str, Tuple[str, str]]:
+        """
+        Traduz vários textos por camadas, do mais barato ao mais caro.
+        
+        - textos repetidos são resolvidos uma vez
+        - as buscas exatas vão todas em uma chamada a get_translations_batch
+        - só o que faltou passa pela busca normalizada e pelos padrões
+        
+        Args:
+            texts: Lista de textos (pode ter repetições)
+            
+        Returns:
+            Dicionário {texto: (tradução, estratégia)} só com os textos
+            traduzidos. Estratégias: 'exact', 'normalized', 'learned',
+            'template', 'sensitive_numeric', 'numeric' e 'variation'
+        """
+        unique = [text for text in dict.fromkeys(texts) if text]
+        if not unique:
+            return {}
+        
+        # 1. Buscas exatas em lote
+        exact = self.memory.get_translations_batch(unique)
+        results = {text: (translation, 'exact') for text, translation in exact.items()
+                   if translation}
+        self.memory.record_usage(results)
+        
+        # Modelos numéricos das faltas buscados em uma consulta
+        misses = [text for text in unique if text not in results]
+        templates = None
+        if misses and self._sensitive_memory_enabled:
+            extracted = [extract_template(text) for text in misses]
+            templates = self.memory.get_templates_batch(
+                [(source.skeleton, source.slot_types) for source in extracted if source]
+            )
+        
+        # 2 e 3. Estratégias caras só para as faltas
+        for text in misses:
+            found = self._translate_miss(text, templates)
+            if found:
+                results[text] = found
+        
+        return results
+    
+    def _translate_miss(self, text: str, templates: Optional[Dict] = None
+                        ) -> Optional[Tuple[str, str]]:
+        """
+        Camadas aplicadas quando a busca exata falha.
+        
+        Args:
+            text: Texto a ser traduzido
+            templates: Modelos já buscados com get_templates_batch (None = buscar)
+            
+        Returns:
+            Tupla (tradução, estratégia) ou None
+        """
+        # 2. Mesma frase com outros espaços, quebras de linha ou maiúsculas
+        normalized_match = self._find_normalized_match(text)
+        if normalized_match:
+            return (normalized_match, 'normalized')
+        
+        # 3. Se memória sensível está ativada, busca por padrões
         if self._sensitive_memory_enabled:
-            # 2.1 Busca por padrão numérico sensível (ex: Soldier 01 -> Soldado 01)
+            # 3.0 Padrão aprendido, consultado no índice em memória
+            learned_match = self._find_learned_pattern(text)
+            if learned_match:
+                return (learned_match, 'learned')
+            
+            # 3.1 Modelo numérico (ex: "Wave {0} of {1}" -> "Onda {0} de {1}")
+            template_match = self._find_template_match(text, templates)
+            if template_match:
+                return (template_match, 'template')
+            
+            # 3.2 Busca por padrão numérico sensível (ex: Soldier 01 -> Soldado 01)
             sensitive_match = self._find_sensitive_numeric_pattern(text)
             if sensitive_match:
-                return sensitive_match
+                return (sensitive_match, 'sensitive_numeric')
             
-            # 2.2 Busca por padrão numérico simples
+            # 3.3 Busca por padrão numérico simples
             pattern_match = self._find_numeric_pattern(text)
             if pattern_match:
-                return pattern_match
+                return (pattern_match, 'numeric')
             
-            # 2.3 Busca por padrão de variação
+            # 3.4 Busca por padrão de variação
             variation_match = self._find_variation_pattern(text)
             if variation_match:
-                return variation_match
+                return (variation_match, 'variation')
         
         return None
     
+    # ============================================================================
+    # BUSCA NORMALIZADA (ESPAÇOS E MAIÚSCULAS)
+    # ============================================================================
+    
+    def _find_normalized_match(self, text: str) -> Optional[str]:
+        """
+        Reaproveita uma tradução cujo original difere só na forma.
+        
+        Exemplos:
+            - "Hello world" traduzido como "Olá mundo" -> "HELLO WORLD  " será "OLÁ MUNDO  "
+            - "Open the door\\n" -> "open the door\\r\\n" mantém o "\\r\\n" do arquivo
+        
+        Args:
+            text: Texto a ser verificado
+            
+        Returns:
+            Tradução com a forma do texto consultado ou None
+        """
+        match = self.memory.get_normalized_translation(text)
+        if not match:
+            return None
+        
+        stored_original, translated = match
+        return self._restore_form(text, stored_original, translated)
+    
+    def _restore_form(self, text: str, stored_original: str, translated: str) -> str:
+        """
+        Aplica na tradução a forma do texto consultado: espaços nas pontas,
+        final de linha (\\r\\n ou \\n) e maiúsculas/minúsculas.
+        
+        A caixa só é alterada quando o texto consultado difere da forma do
+        original armazenado, para não estragar nomes próprios da tradução.
+        
+        Args:
+            text: Texto consultado
+            stored_original: Original encontrado na memória
+            translated: Tradução do original armazenado
+            
+        Returns:
+            Tradução ajustada
+        """
+        core = translated.strip()
+        
+        # Final de linha do arquivo consultado
+        if '\r\n' in text:
+            core = core.replace('\r\n', '\n').replace('\n', '\r\n')
+        elif '\n' in text:
+            core = core.replace('\r\n', '\n')
+        
+        # Maiúsculas: só quando a forma consultada difere da armazenada
+        text_core = text.strip()
+        stored_core = stored_original.strip()
+        if text_core.isupper() and not stored_core.isupper():
+            core = core.upper()
+        elif text_core.islower() and not stored_core.islower():
+            core = core.lower()
+        elif text_core[:1].isupper() and stored_core[:1].islower():
+            core = core[:1].upper() + core[1:]
+        elif text_core[:1].islower() and stored_core[:1].isupper():
+            core = core[:1].lower() + core[1:]
+        
+        # Espaços nas pontas do texto consultado
+        leading = text[:len(text) - len(text.lstrip())]
+        trailing = text[len(text.rstrip()):]
+        return leading + core + trailing
+    
+    # ============================================================================
+    # PADRÕES APRENDIDOS
+    # ============================================================================
+    
+    def _find_learned_pattern(self, text: str) -> Optional[str]:
+        """
+        Aplica um padrão gravado por learn_pattern, sem consultar o banco.
+        
+        Exemplo:
+            - learn_pattern("Soldier 01", "Soldado 01") -> "Soldier 57" será "Soldado 57"
+        
+        Args:
+            text: Texto a ser verificado
+            
+        Returns:
+            Tradução com número preservado ou None
+        """
+        match = re.match(r'^(.+?)\s*(\d+)$', text)
+        if not match:
+            return None
+        
+        learned = self.memory.get_learned_pattern(match.group(1).strip())
+        if not learned:
+            return None
+        
+        translated_base, separator = learned
+        return f"{translated_base}{separator}{match.group(2)}"
+    
+    # ============================================================================
+    # MODELOS NUMÉRICOS
+    # ============================================================================
+    
+    def _find_template_match(self, text: str, templates: Optional[Dict] = None) -> Optional[str]:
+        """
+        Traduz pelo modelo numérico aprendido, preenchendo os números do texto.
+        
+        Exemplo:
+            - "Wave 3 of 10" traduzido como "Onda 3 de 10" -> "Wave 7 of 12" será "Onda 7 de 12"
+        
+        Args:
+            text: Texto a ser verificado
+            templates: Modelos já buscados com get_templates_batch (None = buscar)
+            
+        Returns:
+            Tradução preenchida ou None
+        """
+        source = extract_template(text)
+        if source is None:
+            return None
+        
+        key = (source.skeleton, source.slot_types)
+        if templates is None:
+            templates = self.memory.get_templates_batch([key])
+        match = templates.get(key)
+        if not match:
+            return None
+        
+        stored_skeleton, translated_template = match
+        translated = fill_template(translated_template, source.values)
+        if translated is None:
+            return None
+        
+        # Modelo guardado com outra forma (espaços/maiúsculas)
+        if stored_skeleton != source.skeleton:
+            stored_original = fill_template(stored_skeleton, source.values)
+            return self._restore_form(text, stored_original, translated)
+        return translated
+    
     # ============================================================================
     # MEMÓRIA SENSÍVEL A PADRÕES
     # ============================================================================
@@ -152,9 +420,7 @@ class SmartTranslator:
                 number_format = len(number_str)
                 
                 # Busca traduções similares na memória
-                translation = self._find_translation_by_pattern(
-                    base_text, separator, number_format
-                )
+                translation = self._lookup_pattern(base_text, separator, number_format)
                 
                 if translation:
                     translated_base, trans_separator = translation
@@ -163,6 +429,130 @@ class SmartTranslator:
         
         return None
     
+    def _lookup_pattern(self, base_text: str, separator: str, number_format: int,
+                        any_width: bool = True) -> Optional[Tuple[str, str]]:
+        """
+        Resolve um padrão numérico com uma consulta ao índice de padrões.
+        
+        Memórias sem iter_translations (snapshots) continuam na busca por
+        candidatos de _find_translation_by_pattern.
+        
+        Args:
+            base_text: Texto base (sem número)
+            separator: Separador usado (espaço, underscore, hífen, vazio)
+            number_format: Quantidade de dígitos no número original
+            any_width: Se True, aceita exemplos com outra quantidade de dígitos
+            
+        Returns:
+            Tupla (base_traduzida, separador_usado) ou None
+        """
+        index = self._get_pattern_index()
+        if index is None:
+            return self._find_translation_by_pattern(base_text, separator, number_format)
+        
+        entry = index.get((base_text, separator, number_format))
+        if entry is None and any_width:
+            entry = index.get((base_text, separator, 0))
+        if entry is None:
+            return None
+        
+        # Confere o exemplo na memória: ele pode ter sido editado ou removido
+        translated_base, trans_separator, source, number = entry
+        current = self.memory.get_translation(source)
+        if current is None:
+            self._unindex_source(source)
+            return None
+        
+        extracted = self._extract_translated_base(current, number)
+        if extracted != (translated_base, trans_separator):
+            self._unindex_source(source)
+            if extracted:
+                self._index_translation(source, current, overwrite=True)
+        return extracted
+    
+    def _get_pattern_index(self) -> Optional[Dict[Tuple[str, str, int], Tuple[str, str, str, str]]]:
+        """
+        Retorna o índice de padrões, montando-o na primeira consulta ou depois
+        de uma alteração em massa da memória (get_write_epoch, que também
+        muda ao anexar ou remover memórias).
+        
+        Os exemplos das memórias anexadas entram depois dos da principal, na
+        ordem de prioridade, como nas buscas exatas.
+        
+        Returns:
+            Índice ou None se a memória não pode ser percorrida
+        """
+        if not hasattr(self.memory, 'iter_translations'):
+            return None
+        
+        epoch = self.memory.get_write_epoch()
+        if self._pattern_index is None or epoch != self._pattern_index_epoch:
+            self._pattern_index = {}
+            self._pattern_sources = {}
+            self._pattern_index_epoch = epoch
+            
+            # Mais usadas primeiro: em caso de empate fica o exemplo mais usado
+            for row in self.memory.iter_translations(order='usage', page_size=5000):
+                self._index_translation(row.original_text, row.translated_text)
+            if hasattr(self.memory, 'iter_attached_translations'):
+                for original, translated in self.memory.iter_attached_translations(page_size=5000):
+                    self._index_translation(original, translated)
+        
+        return self._pattern_index
+    
+    def _index_translation(self, original: str, translated: str, overwrite: bool = False):
+        """
+        Registra no índice os padrões numéricos de uma tradução.
+        
+        O original entra em cada forma "base + separador + número" que o
+        reconstrói exatamente, como na busca por candidatos.
+        
+        Args:
+            original: Texto original
+            translated: Texto traduzido
+            overwrite: Se True, substitui exemplos já indexados
+        """
+        if self._pattern_index is None or not original[-1:].isdigit():
+            return
+        
+        for regex, separator in self.NUMERIC_SUFFIX_PATTERNS:
+            match = regex.match(original)
+            if not match:
+                continue
+            
+            base_text = match.group(1).strip()
+            number_str = match.group(2)
+            if f"{base_text}{separator}{number_str}" != original:
+                continue
+            
+            extracted = self._extract_translated_base(translated, number_str)
+            if not extracted:
+                continue
+            
+            entry = (extracted[0], extracted[1], original, number_str)
+            for key in ((base_text, separator, len(number_str)), (base_text, separator, 0)):
+                if overwrite or key not in self._pattern_index:
+                    previous = self._pattern_index.get(key)
+                    if previous is not None and previous[2] != original:
+                        self._forget_key(previous[2], key)
+                    self._pattern_index[key] = entry
+                    self._pattern_sources.setdefault(original, []).append(key)
+    
+    def _forget_key(self, source: str, key: Tuple[str, str, int]):
+        """Remove uma chave da lista de chaves de um original"""
+        keys = self._pattern_sources.get(source)
+        if keys and key in keys:
+            keys.remove(key)
+            if not keys:
+                del self._pattern_sources[source]
+    
+    def _unindex_source(self, original: str):
+        """Remove do índice as chaves cujo exemplo é este original"""
+        for key in self._pattern_sources.pop(original, []):
+            entry = self._pattern_index.get(key)
+            if entry is not None and entry[2] == original:
+                del self._pattern_index[key]
+    
     def _find_translation_by_pattern(
         self, 
         base_text: str, 
@@ -172,6 +562,9 @@ class SmartTranslator:
         """
         Busca uma tradução existente que siga o mesmo padrão.
         
+        Testa números candidatos um a um; usado só quando a memória não
+        oferece o índice de padrões (ver _lookup_pattern).
+        
         Args:
             base_text: Texto base (sem número)
             separator: Separador usado (espaço, underscore, hífen, vazio)
@@ -297,6 +690,12 @@ class SmartTranslator:
         """
         results = []
         
+        if self._get_pattern_index() is not None:
+            translation = self._lookup_pattern(base_text, ' ', 1, any_width=False)
+            if translation:
+                results.append(translation[0])
+            return results
+        
         # Busca na memória por padrões como "base_text 1", "base_text 2", etc.
         for i in range(1, 10):  # Verifica até 10
             pattern = f"{base_text} {i}"
@@ -320,39 +719,28 @@ class SmartTranslator:
         """
         Busca padrões de variação (ex: "Heavy Armor" baseado em "Light Armor")
         
+        Os termos do léxico são achados em uma passada pelo texto e todas as
+        alternativas vão em uma única chamada a get_translations_batch, então
+        o custo não cresce com a quantidade de pares.
+        
         Args:
             text: Texto a ser verificado
             
         Returns:
             Tradução baseada em padrão ou None
         """
-        # Lista de prefixos/sufixos comuns
-        variations = [
-            ('Light', 'Heavy'), ('Small', 'Large'), ('Minor', 'Major'),
-            ('Weak', 'Strong'), ('Basic', 'Advanced'), ('Old', 'New'),
-            ('Young', 'Old'), ('Male', 'Female'), ('Upper', 'Lower')
-        ]
+        candidates = self._variation_lexicon.candidates(text)
+        if not candidates:
+            return None
         
-        for var1, var2 in variations:
-            # Verifica se o texto contém uma variação
-            if var1 in text:
-                # Busca a outra variação
-                alternative = text.replace(var1, var2)
-                alt_translation = self.memory.get_translation(alternative)
-                
-                if alt_translation and var2 in alt_translation:
-                    # Aplica a mesma transformação
-                    result = alt_translation.replace(var2, var1)
-                    return result
-            
-            elif var2 in text:
-                # Verifica variação inversa
-                alternative = text.replace(var2, var1)
-                alt_translation = self.memory.get_translation(alternative)
-                
-                if alt_translation and var1 in alt_translation:
-                    result = alt_translation.replace(var1, var2)
-                    return result
+        found = self.memory.get_translations_batch([c.alternative for c in candidates])
+        for candidate in candidates:
+            alt_translation = found.get(candidate.alternative)
+            
+            if alt_translation and candidate.search in alt_translation:
+                # Aplica a mesma transformação
+                self.memory.record_usage([candidate.alternative])
+                return alt_translation.replace(candidate.search, candidate.replacement)
         
         return None
     
@@ -370,36 +758,41 @@ class SmartTranslator:
         Returns:
             Dicionário {original: tradução}
         """
-        results = {}
-        
-        for text in texts:
-            translation = self.translate(text)
-            if translation:
-                results[text] = translation
-        
-        return results
+        return {text: translation for text, (translation, _) in self.translate_many(texts).items()}
     
-    def learn_pattern(self, original: str, translated: str):
+    def learn_pattern(self, original: str, translated: str, persist: bool = True):
         """
         Aprende um novo padrão de tradução
         
         Args:
             original: Texto original
             translated: Texto traduzido
+            persist: Se False, não grava a tradução (quem chama já gravou
+                     ou agendou a gravação) e o padrão aprendido vai para a
+                     fila de set_write_queue, se houver
         """
         # Adiciona à memória
-        self.memory.add_translation(original, translated)
+        if persist:
+            self.memory.add_translation(original, translated)
         
-        # Detecta e armazena padrão numérico
+        # Detecta e grava o padrão numérico (o número precisa aparecer na tradução)
         match_orig = re.match(r'^(.+?)\s*(\d+)$', original)
-        match_trans = re.match(r'^(.+?)\s*(\d+)$', translated)
-        
-        if match_orig and match_trans:
-            base_orig = match_orig.group(1).strip()
-            base_trans = match_trans.group(1).strip()
-            
-            # Armazena o padrão base
-            self.pattern_cache[base_orig] = base_trans
+        if match_orig:
+            extracted = self._extract_translated_base(translated, match_orig.group(2))
+            if extracted:
+                base = match_orig.group(1).strip()
+                if persist or self._write_queue is None:
+                    self.memory.add_learned_pattern(base, *extracted)
+                else:
+                    self._write_queue.put_learned_pattern(base, *extracted)
+        
+        # O modelo numérico ("Wave 3 of 10" -> "Wave {0} of {1}") é gravado
+        # junto com a tradução (add_translation ou a fila de gravação)
+        
+        # O exemplo mais recente passa a valer no índice de padrões
+        if self._pattern_index is not None:
+            self._unindex_source(original)
+            self._index_translation(original, translated, overwrite=True)
     
     def auto_translate_batch(self, texts: List[str]) -> Dict[str, str]:
         """
@@ -411,16 +804,14 @@ class SmartTranslator:
         Returns:
             Dicionário com traduções automáticas
         """
-        results = {}
+        results = self.batch_translate(texts)
         
         # Agrupa textos por padrão
         patterns = {}
         
-        for text in texts:
+        for text in dict.fromkeys(texts):
             # Verifica se já tem tradução
-            existing = self.translate(text)
-            if existing:
-                results[text] = existing
+            if text in results:
                 continue
             
             # Detecta padrão
@@ -433,6 +824,11 @@ class SmartTranslator:
                     patterns[base] = []
                 patterns[base].append((text, number))
         
+        # Todas as variações "base número" buscadas em uma chamada
+        probes = self.memory.get_translations_batch(
+            [f"{base} {num}" for base, items in patterns.items() for _, num in items]
+        ) if patterns else {}
+        
         # Processa padrões
         for base, items in patterns.items():
             # Busca tradução do base
@@ -441,7 +837,7 @@ class SmartTranslator:
             # Tenta encontrar tradução de qualquer variação
             for text, num in items:
                 test_pattern = f"{base} {num}"
-                trans = self.memory.get_translation(test_pattern)
+                trans = probes.get(test_pattern)
                 
                 if trans:
                     match = re.match(r'^(.+?)\s*\d+$', trans)
@@ -456,6 +852,35 @@ class SmartTranslator:
         
         return results
     
+    def apply_memory_changes(self, changes: Optional[List[TranslationChange]]):
+        """
+        Reindexa os exemplos de textos alterados por outra instância.
+        
+        Registrado em TranslationMemory.add_change_listener. Os exemplos
+        alterados são reindexados no índice de padrões numéricos; com None o
+        índice é remontado na próxima tradução. Os padrões aprendidos são
+        recarregados pela própria memória (poll_changes).
+        
+        Args:
+            changes: Alterações do diário, ou None para descartar todos
+        """
+        if changes is None:
+            self._pattern_index = None
+            return
+        
+        if self._pattern_index is None:
+            return
+        
+        # Reindexa os exemplos alterados com a tradução atual
+        changed = [change.original_text for change in changes
+                   if change.original_text[-1:].isdigit()]
+        for original in changed:
+            self._unindex_source(original)
+        if changed:
+            current = self.memory.get_translations_batch(changed)
+            for original, translated in current.items():
+                self._index_translation(original, translated, overwrite=True)
+    
     # ============================================================================
     # UTILITÁRIOS
     # ============================================================================
@@ -492,9 +917,7 @@ class SmartTranslator:
                 base_text = match.group(1).strip()
                 number_str = match.group(2)
                 
-                translation = self._find_translation_by_pattern(
-                    base_text, separator, len(number_str)
-                )
+                translation = self._lookup_pattern(base_text, separator, len(number_str))
                 
                 if translation:
                     translated_base, trans_separator = translation
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark de TranslationMemory.get_translations_batch
+Compara, em uma conexão própria, os lotes IN de 500 usados pela memória com
+uma tabela temporária + join (as conexões de leitura da memória ficam sempre
+em query_only, que bloqueia tabelas temporárias). A última coluna é o
+get_translations_batch completo, com cache e verificação de texto
+
+Uso:
+    python tests/bench_translations_batch.py [linhas_no_banco]
+"""
+
+import sys
+import os
+import tempfile
+import shutil
+import sqlite3
+import time
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import TranslationMemory, text_hash
+
+PROBE_SIZES = (1000, 10000, 100000)
+REPEATS = 3
+
+
+def _build_memory(db_path: str, rows: int) -> TranslationMemory:
+    """Cria um banco com textos parecidos com diálogos de jogos"""
+    memory = TranslationMemory(db_path, track_usage=False)
+    memory.bulk_import(
+        (f"Dialogue line {i}: the caravan leaves at dawn", f"Fala {i}: a caravana parte ao amanhecer")
+        for i in range(rows)
+    )
+    return memory
+
+
+def _probes(size: int, rows: int) -> list:
+    """Metade dos textos existe no banco e metade não"""
+    step = max(1, rows // size)
+    hits = [f"Dialogue line {(i * step) % rows}: the caravan leaves at dawn" for i in range(size // 2)]
+    misses = [f"Missing line {i}: nobody translated this" for i in range(size - len(hits))]
+    return hits + misses
+
+
+def _in_chunks_lookup(conn: sqlite3.Connection, probes: list) -> dict:
+    """Consultas IN (...) pelo hash em lotes de 500, como get_translations_batch"""
+    pending = list(dict.fromkeys(probes))
+    found = {}
+    for i in range(0, len(pending), 500):
+        chunk = pending[i:i + 500]
+        placeholders = ','.join('?' * len(chunk))
+        rows = conn.execute(f'''
+            SELECT original_text, translated_text FROM translations
+            WHERE original_hash IN ({placeholders})
+        ''', [text_hash(text) for text in chunk]).fetchall()
+        found.update(rows)
+    # O texto confirma o hash
+    return {text: found[text] for text in pending if text in found}
+
+
+def _temp_join_lookup(conn: sqlite3.Connection, probes: list) -> dict:
+    """Carrega os textos em uma tabela temporária e faz um único join pelo hash"""
+    conn.execute('''
+        CREATE TEMP TABLE IF NOT EXISTS batch_probe (
+            original_hash INTEGER NOT NULL,
+            original_text TEXT NOT NULL
+        )
+    ''')
+    conn.execute('DELETE FROM temp.batch_probe')
+    conn.executemany('INSERT INTO temp.batch_probe VALUES (?, ?)',
+                     [(text_hash(text), text) for text in dict.fromkeys(probes)])
+
+    # CROSS JOIN fixa a tabela de probe como laço externo; o texto é
+    # conferido depois, como nos lotes IN
+    rows = conn.execute('''
+        SELECT t.original_text, t.translated_text
+        FROM temp.batch_probe p CROSS JOIN translations t
+        WHERE t.original_hash = p.original_hash AND +t.original_text = p.original_text
+    ''').fetchall()
+    conn.commit()
+    return dict(rows)
+
+
+def _measure(lookup, probes: list) -> float:
+    """Melhor tempo (segundos) entre as repetições"""
+    best = float('inf')
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        found = lookup(probes)
+        best = min(best, time.perf_counter() - start)
+        assert len(found) == len(probes) // 2
+    return best
+
+
+def _memory_lookup(memory: TranslationMemory):
+    """get_translations_batch sempre com cache e filtro de Bloom frios"""
+    def lookup(probes):
+        bloom = memory._bloom
+        memory._bloom = None
+        memory._cache.clear()
+        try:
+            return memory.get_translations_batch(probes)
+        finally:
+            memory._bloom = bloom
+    return lookup
+
+
+def main():
+    """Executa o benchmark"""
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    temp_dir = tempfile.mkdtemp(prefix="tm_bench_")
+
+    try:
+        print(f"\n📊 get_translations_batch: banco com {rows} traduções\n")
+        db_path = os.path.join(temp_dir, "bench.db")
+        memory = _build_memory(db_path, rows)
+        conn = sqlite3.connect(db_path)
+
+        print(f"{'probes':>8} | {'in (ms)':>9} | {'temp (ms)':>9} | {'temp/in':>7} | {'memória (ms)':>12}")
+        print("-" * 59)
+        for size in PROBE_SIZES:
+            probes = _probes(size, rows)
+            in_time = _measure(lambda texts: _in_chunks_lookup(conn, texts), probes)
+            temp_time = _measure(lambda texts: _temp_join_lookup(conn, texts), probes)
+            memory_time = _measure(_memory_lookup(memory), probes)
+            print(f"{size:>8} | {in_time * 1000:>9.1f} | {temp_time * 1000:>9.1f} | "
+                  f"{temp_time / in_time:>7.2f} | {memory_time * 1000:>12.1f}")
+
+        conn.close()
+        memory.close()
+        return 0
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1464 @@
+#!/usr/bin/env python3
+"""
+Testes da memória de tradução (database.TranslationMemory)
+Usa bancos temporários para não tocar nos arquivos em bds/
+"""
+
+import sys
+import os
+import tempfile
+import shutil
+import sqlite3
+import threading
+import time
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import TranslationMemory, text_hash, normalized_hash
+from write_behind import WriteBehindQueue
+
+
+def _temp_db():
+    """Cria um diretório temporário e retorna o caminho de um banco novo"""
+    temp_dir = tempfile.mkdtemp(prefix="tm_test_")
+    return temp_dir, os.path.join(temp_dir, "memory.db")
+
+
+def _usage_of(memory: TranslationMemory, original: str) -> int:
+    """Lê o contador de uso diretamente do banco"""
+    with memory._lock:
+        memory.cursor.execute(
+            'SELECT usage_count FROM translations WHERE original_text = ?', (original,)
+        )
+        return memory.cursor.fetchone()[0]
+
+
+def test_lookup_is_write_free():
+    """Buscas não devem gravar no banco até o flush dos contadores"""
+    temp_dir, db_path = _temp_db()
+    try:
+        memory = TranslationMemory(db_path)
+        memory.add_translation("Cancel", "Cancelar")
+        before = memory.conn.total_changes
+
+        for _ in range(10):
+            assert memory.get_translation("Cancel") == "Cancelar"
+
+        assert memory.conn.total_changes == before
+        assert _usage_of(memory, "Cancel") == 1
+
+        assert memory.flush_usage() == 1
+        assert _usage_of(memory, "Cancel") == 11
+        memory.close()
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_usage_flushed_on_close():
+    """Contadores pendentes são gravados ao fechar a conexão"""
+    temp_dir, db_path = _temp_db()
+    try:
+        memory = TranslationMemory(db_path)
+        memory.add_translation("Soldier 01", "Soldado 01")
+        memory.get_translation("Soldier 01")
+        memory.get_translation("Soldier 01")
+        memory.close()
+
+        memory = TranslationMemory(db_path)
+        assert _usage_of(memory, "Soldier 01") == 3
+        memory.close()
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_usage_tracking_disabled():
+    """Com track_usage=False as buscas não alteram o contador"""
+    temp_dir, db_path = _temp_db()
+    try:
+        memory = TranslationMemory(db_path, track_usage=False)
+        memory.add_translation("Cancel", "Cancelar")
+        memory.get_translation("Cancel")
+
+        assert memory.flush_usage() == 0
+        assert _usage_of(memory, "Cancel") == 1
+        memory.close()
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_reader_connection_per_thread():
+    """Cada thread lê pela sua própria conexão, separada do escritor"""
+    temp_dir, db_path = _temp_db()
+    try:
+        memory = TranslationMemory(db_path)
+        memory.add_translation("Cancel", "Cancelar")
+
+        results = []
+
+        def worker():
+            results.append(memory.get_translation_by_id(1)['translated_text'])
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == ["Cancelar"] * 4
+        assert memory.get_translation_by_id(1)['translated_text'] == "Cancelar"
+
+        stats = memory.get_pool_stats()
+        assert stats['readers_opened'] == 5
+        assert stats['reads'] >= 5
+
+        memory.close()
+        assert memory.get_pool_stats()['active_connections'] == 0
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_hot_cache_write_through():
+    """Cache LRU é atualizado nas escritas e evita idas ao banco"""
+    temp_dir, db_path = _temp_db()
+    try:
+        memory = TranslationMemory(db_path)
+        memory.add_translation("Cancel", "Cancelar")
+
+        assert memory.get_translation("Cancel") == "Cancelar"
+        assert memory.get_translation("Missing") is None
+        assert memory.get_translation("Missing") is None
+
+        # Ausências certas são descartadas pelo filtro de Bloom antes do cache negativo
+        stats = memory.get_stats()
+        assert stats['cache_hits'] == 1
+        assert stats['cache_negative_hits'] == 0
+        assert stats['cache_misses'] == 2
+        assert stats['bloom_skips'] == 2
+
+        # Escritas invalidam o cache negativo e atualizam o positivo
+        memory.add_translation("Missing", "Ausente")
+        assert memory.get_translation("Missing") == "Ausente"
+
+        translation_id = memory.get_all_translations(search_term="Cancel")[0]['id']
+        memory.update_translation(translation_id, translated_text="Cancelar!")
+        assert memory.get_translation("Cancel") == "Cancelar!"
+
+        # Transação desfeita não deixa a tradução nova no cache
+        sync = memory._sync_templates
+
+        def failing_sync(cursor, pairs):
+            raise sqlite3.OperationalError("falha simulada")
+
+        memory._sync_templates = failing_sync
+        assert not memory.update_translation(translation_id, translated_text="Nunca gravada")
+        memory._sync_templates = sync
+        assert memory.get_translation("Cancel") == "Cancelar!"
+
+        memory.delete_translation(translation_id)
+        assert memory.get_translation("Cancel") is None
+
+        memory.clear_all()
+        assert memory.get_translation("Missing") is None
+        memory.close()
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_cache_bounds():
+    """Cache respeita os limites de entradas e de bytes"""
+    from database import TranslationCache
+
+    cache = TranslationCache(max_entries=3, max_bytes=10 ** 6)
+    for i in range(5):
+        cache.put(f"key {i}", f"value {i}")
+    assert cache.stats()['cache_entries'] == 3
+    assert cache.get("key 0") == (False, None)
+    assert cache.get("key 4") == (True, "value 4")
+
+    cache = TranslationCache(max_entries=100, max_bytes=400)
+    for i in range(20):
+        cache.put(f"key {i}", "x" * 50)
+    assert cache.stats()['cache_bytes'] <= 400
+
+
+def test_fts_search():
+    """Busca usa FTS5 com prefixo, frase e ranking"""
+    temp_dir, db_path = _temp_db()
+    try:
+        memory = TranslationMemory(db_path)
+        memory.add_translations_batch([
+            ("Heavy Armor", "Armadura Pesada"),
+            ("Light Armor", "Armadura Leve"),
+            ("Armor of the Heavy Guard", "Armadura da Guarda Pesada"),
+            ("Cancel", "Cancelar"),
+        ])
+
+        assert memory._fts_enabled
+        found = {t['original_text'] for t in memory.search("arm")}
+        assert found == {"Heavy Armor", "Light Armor", "Armor of the Heavy Guard"}
+
+        found = [t['original_text'] for t in memory.search('"heavy armor"')]
+        assert found == ["Heavy Armor"]
+
+        # Busca também pelo texto traduzido e reflete edições
+        assert [t['original_text'] for t in memory.search("cancel")] == ["Cancel"]
+        memory.add_translation("Cancel", "Anular")
+        assert [t['original_text'] for t in memory.search("anul")] == ["Cancel"]
+        assert memory.search("cancelar") == []
+
+        # Termos sem palavras recorrem ao LIKE
+        assert len(memory.search("%")) == 4
+        memory.close()
+
+        # Índice é reconstruído se estiver marcado como desatualizado
+        memory = TranslationMemory(db_path)
+        memory.cursor.execute("DROP TRIGGER translations_fts_ai")
+        memory.conn.commit()
+        memory.add_translation("Shield", "Escudo")
+        memory.close()
+
+        memory = TranslationMemory(db_path)
+        assert [t['original_text'] for t in memory.search("shie")] == ["Shield"]
+        memory.close()
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_iter_translations_keyset():
+    """Iterador paginado percorre tudo na mesma ordem da listagem"""
+    temp_dir, db_path = _temp_db()
+    try:
+        memory = TranslationMemory(db_path)
+        memory.add_translations_batch([(f"Soldier {i:02d}", f"Soldado {i:02d}") for i in range(57)])
+        memory.add_translations_batch([(f"Soldier {i:02d}", f"Soldado {i:02d}") for i in range(0, 57, 3)])
+        memory.add_translations_batch([("Cancel", "Cancelar")], category='ui')
+
+        expected = [t['id'] for t in memory.get_all_translations()]
+        rows = list(memory.iter_translations(page_size=7))
+        assert [row.id for row in rows] == expected
+        assert rows[0].usage_count == 2
+
+        by_id = [row.id for row in memory.iter_translations(order='id', page_size=5)]
+        assert by_id == sorted(expected)
+
+        assert [row.original_text for row in memory.iter_translations(category='ui')] == ["Cancel"]
+        assert len(list(memory.iter_translations(search_term="soldier", order='rank', page_size=10))) == 57
+        memory.close()
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_contextual_suggestions_use_iterator():
+    """Sugestões contextuais são montadas a partir do iterador da memória"""
+    from contextual_suggestions import ContextualSuggestionEngine
+
+    temp_dir, db_path = _temp_db()
+    try:
+        memory = TranslationMemory(db_path)
+        memory.add_translations_batch([
+            ("Heavy Armor", "Armadura Pesada"),
+            ("Armor Repair Kit", "Kit de Reparo de Armadura"),
+        ])
+
+        engine = ContextualSuggestionEngine(memory)
+        originals = {s.original_text for s in engine.get_suggestions("Light Armor")}
+        assert originals == {"Heavy Armor", "Armor Repair Kit"}
+        memory.close()
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_bulk_import_and_merge():
+    """Carga em massa mescla com a tabela e recria índices quando pedido"""
+    temp_dir, db_path = _temp_db()
+    try:
+        memory = TranslationMemory(db_path)
+        memory.add_translation("Cancel", "Cancelar")
+        memory.get_translation("Missing")
+
+        progress = []
+        rows = [(f"Item {i}", f"Item {i}") for i in range(12000)]
+        rows += [("Cancel", "Anular"), ("", "vazio"), (None, "x"), ("Missing", "Ausente")]
+
+        imported, errors = memory.bulk_import(
+            rows, progress_callback=lambda done, total: progress.append((done, total)),
+            rebuild_indexes=True
+        )
+        assert (imported, errors) == (12002, 2)
+        assert progress[-1] == (len(rows), len(rows))
+        assert memory.get_translation("Cancel") == "Anular"
+        assert memory.get_translation("Missing") == "Ausente"
+        assert memory.get_stats()['total_translations'] == 12002
+
+        memory.cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+        indexes = {row[0] for row in memory.cursor.fetchall()}
+        assert set(TranslationMemory.SECONDARY_INDEXES) <= indexes
+
+        # Mescla de outro banco: vence a atualização mais recente
+        other_path = os.path.join(temp_dir, "other.db")
+        other = TranslationMemory(other_path)
+        other.add_translations_batch([("Cancel", "Cancelar agora"), ("Shield", "Escudo")])
+        other.cursor.execute("UPDATE translations SET updated_at = '2999-01-01 00:00:00'")
+        other.conn.commit()
+        other.close()
+
+        merged, errors = memory.merge_database(other_path)
+        assert (merged, errors) == (2, 0)
+        assert memory.get_translation("Cancel") == "Cancelar agora"
+        assert memory.get_translation("Shield") == "Escudo"
+        memory.close()
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_streaming_export_import():
+    """Exportação e importação em fluxo, com TSV e gzip"""
+    temp_dir, db_path = _temp_db()
+    try:
+        memory = TranslationMemory(db_path)
+        rows = [(f"Line {i}, with comma", f"Linha {i}\tcom tab") for i in range(2500)]
+        memory.bulk_import(rows)
+
+        for name in ("export.csv", "export.tsv", "export.csv.gz", "export.tsv.gz"):
+            path = os.path.join(temp_dir, name)
+            progress = []
+            assert memory.export_to_file(path, progress_callback=lambda d, t: progress.append((d, t)))
+            assert progress[-1] == (2500, 2500)
+
+            with open(path, 'rb') as f:
+                assert (f.read(2) == b'\x1f\x8b') == name.endswith('.gz')
+
+            target = TranslationMemory(os.path.join(temp_dir, name + ".db"))
+            progress = []
+            imported, errors = target.import_from_file(
+                path, progress_callback=lambda d, t: progress.append((d, t))
+            )
+            assert (imported, errors) == (2500, 0)
+            assert progress[-1][0] == progress[-1][1] == os.path.getsize(path)
+            assert target.get_translation("Line 7, with comma") == "Linha 7\tcom tab"
+            target.close()
+
+        memory.close()
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_hash_key_migration():
+    """Bancos antigos ganham a coluna de hash e as buscas conferem o texto"""
+    temp_dir, db_path = _temp_db()
+    try:
+        # Esquema anterior: sem original_hash e com idx_original_text
+        conn = sqlite3.connect(db_path)
+        conn.execute('''
+            CREATE TABLE translations (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                original_text TEXT NOT NULL UNIQUE,
+                translated_text TEXT NOT NULL,
+                source_language TEXT DEFAULT 'en',
+                target_language TEXT DEFAULT 'pt',
+                category TEXT DEFAULT 'general',
+                notes TEXT DEFAULT '',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                usage_count INTEGER DEFAULT 1
+            )
+        ''')
+        conn.execute('CREATE INDEX idx_original_text ON translations(original_text)')
+        conn.executemany('INSERT INTO translations (original_text, translated_text) VALUES (?, ?)',
+                         [("Hello", "Olá"), ("Bye", "Tchau")])
+        conn.commit()
+        conn.close()
+
+        memory = TranslationMemory(db_path, track_usage=False)
+        indexes = {row[1] for row in memory.conn.execute('PRAGMA index_list(translations)')}
+        assert 'idx_original_hash' in indexes
+        assert 'idx_original_text' not in indexes
+
+        stored = memory.conn.execute(
+            "SELECT original_hash FROM translations WHERE original_text = 'Hello'"
+        ).fetchone()[0]
+        assert stored == text_hash("Hello")
+        assert memory.get_translation("Hello") == "Olá"
+
+        # Simula uma colisão: o texto confirma qual linha é a certa
+        memory.conn.execute('UPDATE translations SET original_hash = ? WHERE original_text = ?',
+                            (text_hash("Hello"), "Bye"))
+        memory.conn.commit()
+        memory._cache.clear()
+        assert memory.get_translation("Hello") == "Olá"
+        assert memory.get_translations_batch(["Hello", "Hi"]) == {"Hello": "Olá"}
+        assert memory.get_translation("Hi") is None
+
+        # Escritas de versões antigas (sem hash) são preenchidas no connect
+        memory.add_translation("Yes", "Sim")
+        memory.conn.execute("UPDATE translations SET original_hash = NULL WHERE original_text = 'Yes'")
+        memory.conn.commit()
+        memory.close()
+
+        memory = TranslationMemory(db_path, track_usage=False)
+        assert memory.get_translation("Yes") == "Sim"
+        memory.close()
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_bloom_filter():
+    """Filtro de Bloom evita o SQLite em ausências e é persistido em metadata"""
+    temp_dir, db_path = _temp_db()
+    try:
+        memory = TranslationMemory(db_path, track_usage=False)
+        memory.bulk_import([(f"Base {i}", f"Base {i} pt") for i in range(3000)])
+        memory.add_translation("Hello", "Olá")
+
+        reads = memory.get_pool_stats()['reads']
+        for i in range(100):
+            assert memory.get_translation(f"Missing {i}") is None
+        assert memory.get_translations_batch([f"Other {i}" for i in range(100)]) == {}
+        assert memory.get_pool_stats()['reads'] - reads < 10
+        assert memory.get_translation("Base 2999") == "Base 2999 pt"
+
+        # Exclusões só marcam entradas vencidas, sem reconstruir o filtro
+        rebuild = memory._rebuild_bloom
+        rebuilds = []
+        memory._rebuild_bloom = lambda: rebuilds.append(1) or rebuild()
+        translation_id = memory.get_all_translations(search_term="Hello")[0]['id']
+        memory.delete_translation(translation_id)
+        assert memory.get_translation("Hello") is None
+        assert rebuilds == [] and memory.get_stats()['bloom_stale'] == 1
+        memory.close()
+
+        # Reabre usando o filtro gravado, sem reconstruir
+        memory = TranslationMemory(db_path, track_usage=False)
+        rebuilds = []
+        memory._rebuild_bloom = lambda: rebuilds.append(1)
+        memory._load_bloom()
+        assert rebuilds == []
+        assert memory.get_stats()['bloom_entries'] >= 3000
+        assert memory.get_stats()['bloom_stale'] == 1
+        assert memory.get_translation("Base 10") == "Base 10 pt"
+
+        # Removidos acima de STALE_RATIO pedem a reconstrução
+        ids = [row['id'] for row in memory.get_all_translations(search_term="Base", limit=3000)]
+        memory.delete_translations_by_ids(ids[:1000])
+        assert rebuilds == []
+        memory.delete_translations_by_ids(ids[1000:2000])
+        assert rebuilds == [1]
+        memory.close()
+
+        # Escrita externa invalida a assinatura e força a reconstrução
+        conn = sqlite3.connect(db_path)
+        conn.execute("INSERT INTO translations (original_text, translated_text) VALUES ('Bye', 'Tchau')")
+        conn.commit()
+        conn.close()
+
+        memory = TranslationMemory(db_path, track_usage=False)
+        assert memory.get_translation("Bye") == "Tchau"
+
+        # A thread de manutenção reconstrói o filtro com entradas vencidas
+        memory.delete_translation(memory.get_all_translations(search_term="Bye")[0]['id'])
+        assert memory.get_stats()['bloom_stale'] == 1
+        memory.start_maintenance(interval=0.01)
+        deadline = time.time() + 5
+        while memory.get_stats()['bloom_stale'] and time.time() < deadline:
+            time.sleep(0.02)
+        assert memory.get_stats()['bloom_stale'] == 0
+        memory.close()
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_write_behind_queue():
+    """Fila assíncrona agrupa edições, respeita flush() e limita o tamanho"""
+    temp_dir, db_path = _temp_db()
+    try:
+        memory = TranslationMemory(db_path, track_usage=False)
+        queue = WriteBehindQueue(memory, flush_interval_ms=10000, max_batch=1000, max_pending=1000)
+
+        queue.put("Cancel", "Cancela")
+        queue.put("Cancel", "Cancelar")
+        queue.put("Save", "Salvar")
+
+        # Visível pelo cache antes da gravação, mas ainda fora do banco
+        assert memory.get_translation("Cancel") == "Cancelar"
+        assert memory.get_translation_by_id(1) is None
+
+        assert queue.flush(timeout=5)
+        stats = queue.stats()
+        assert stats['write_queue_coalesced'] == 1
+        assert stats['write_queue_written'] == 2
+        assert stats['write_queue_batches'] == 1
+        assert memory.get_stats()['total_translations'] == 2
+
+        memory._cache.clear()
+        assert memory.get_translation("Cancel") == "Cancelar"
+
+        # Back-pressure: acima de max_pending o put() espera a gravação
+        for i in range(2500):
+            queue.put(f"Line {i}", f"Linha {i}")
+        assert queue.stats()['write_queue_blocked'] >= 1
+        assert queue.close(timeout=5)
+        assert memory.get_stats()['total_translations'] == 2502
+
+        # learn_pattern com persist=False não grava de novo
+        from smart_translator import SmartTranslator
+        translator = SmartTranslator(memory)
+        translator.learn_pattern("Level 1", "Nível 1", persist=False)
+        assert translator.pattern_cache == {"Level": "Nível"}
+        assert memory.get_stats()['total_translations'] == 2502
+
+        # Com fila, o padrão aprendido também é gravado por ela
+        queue = WriteBehindQueue(memory, flush_interval_ms=10000)
+        translator.set_write_queue(queue)
+        queue.put("Stage 2", "Fase 2")
+        translator.learn_pattern("Stage 2", "Fase 2", persist=False)
+        assert translator.translate("Stage 9") == "Fase 9"
+        assert memory.get_stats()['learned_patterns'] == 1
+        assert queue.pending_count() == 2
+        assert queue.close(timeout=5)
+        assert queue.stats()['write_queue_patterns_written'] == 1
+        assert memory.get_stats()['learned_patterns'] == 2
+        memory.close()
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_write_behind_failures():
+    """Linhas recusadas são descartadas; memória fechada para as tentativas"""
+    temp_dir, db_path = _temp_db()
+    try:
+        memory = TranslationMemory(db_path, track_usage=False)
+        memory.conn.execute('''
+            CREATE TRIGGER reject_bad BEFORE INSERT ON translations
+            WHEN new.original_text = 'Bad' BEGIN SELECT RAISE(ABORT, 'recusada'); END
+        ''')
+        memory.conn.commit()
+
+        queue = WriteBehindQueue(memory, flush_interval_ms=10000)
+        queue.put("Bad", "Ruim")
+        queue.put("Good", "Bom")
+        assert queue.flush(timeout=5)
+        stats = queue.stats()
+        assert stats['write_queue_rejected'] == 1 and stats['write_queue_errors'] == 0
+        assert queue.pending_count() == 0
+        assert memory.get_translation("Bad") is None
+        assert memory.get_translation("Good") == "Bom"
+
+        # Só "Bad" recusada de novo: nada volta para a fila
+        queue.put("Bad", "Péssimo")
+        assert queue.flush(timeout=5) and queue.pending_count() == 0
+
+        # Memória fechada: flush falha logo, sem contar um erro por tentativa
+        queue.put("Later", "Depois")
+        memory.close()
+        assert not queue.flush(timeout=5)
+        assert not queue.flush(timeout=5)
+        assert queue.stats()['write_queue_errors'] == 1
+        assert not queue.close(timeout=5)
+        assert queue.unwritten() == [("Later", "Depois")]
+        assert queue.stats()['write_queue_last_error'] == "Memória de tradução fechada"
+
+        export_path = os.path.join(temp_dir, "pendentes.csv")
+        assert TranslationMemory.export_rows(export_path, queue.unwritten())
+        memory = TranslationMemory(db_path, track_usage=False)
+        assert memory.import_from_file(export_path) == (1, 0)
+        assert memory.get_translation("Later") == "Depois"
+        memory.close()
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_stats_counters():
+    """Estatísticas por categoria mantidas por triggers batem com a tabela"""
+    temp_dir, db_path = _temp_db()
+    try:
+        memory = TranslationMemory(db_path, track_usage=False)
+        memory.add_translation("Cancel", "Cancelar", category="ui")
+        memory.add_translation("Cancel", "Cancelar!", category="ui")
+        memory.add_translation("Sword", "Espada", category="items")
+        memory.bulk_import([(f"Line {i}", f"Linha {i}") for i in range(50)], category="dialog")
+
+        stats = memory.get_stats()
+        assert stats['total_translations'] == 52
+        assert stats['total_usage'] == 53
+        assert stats['categories'] == 3
+        assert memory.get_categories() == ["dialog", "items", "ui"]
+
+        sword_id = memory.get_all_translations(search_term="Sword")[0]['id']
+        memory.update_translation(sword_id, category="ui")
+        assert memory.get_categories() == ["dialog", "ui"]
+
+        memory.delete_translation(sword_id)
+        memory.get_translation("Line 1")
+        memory.track_usage = True
+        memory.get_translation("Line 2")
+        memory.flush_usage()
+        stats = memory.get_stats()
+        assert (stats['total_translations'], stats['total_usage']) == (51, 53)
+        assert memory.verify_stats()
+
+        # Divergência é detectada e corrigida
+        memory.conn.execute("UPDATE translation_stats SET translation_count = 999 WHERE category = 'ui'")
+        memory.conn.commit()
+        assert not memory.verify_stats(repair=True)
+        assert memory.verify_stats()
+        assert memory.get_stats()['total_translations'] == 51
+
+        memory.clear_all()
+        assert memory.get_stats()['total_translations'] == 0
+        assert memory.get_categories() == []
+        memory.close()
+
+        # Bancos sem a tabela de estatísticas são preenchidos no connect
+        conn = sqlite3.connect(db_path)
+        conn.execute("INSERT INTO translations (original_text, translated_text) VALUES ('Bye', 'Tchau')")
+        for name in ('translation_stats_ai', 'translation_stats_ad', 'translation_stats_au'):
+            conn.execute(f'DROP TRIGGER {name}')
+        conn.execute('DROP TABLE translation_stats')
+        conn.commit()
+        conn.close()
+
+        memory = TranslationMemory(db_path, track_usage=False)
+        assert memory.get_stats()['total_translations'] == 1
+        assert memory.get_categories() == ["general"]
+        memory.close()
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_attached_memories():
+    """Memórias anexadas são consultadas por prioridade; escritas vão à principal"""
+    temp_dir, db_path = _temp_db()
+    try:
+        common_path = os.path.join(temp_dir, "common.db")
+        extra_path = os.path.join(temp_dir, "extra.db")
+        with TranslationMemory(common_path) as common:
+            common.add_translation("OK", "OK (comum)")
+            common.add_translation("Cancel", "Cancelar (comum)")
+            common.add_translation("Back", "Voltar (comum)")
+        with TranslationMemory(extra_path) as extra:
+            extra.add_translation("Back", "Voltar (extra)")
+            extra.add_translation("Exit", "Sair (extra)")
+
+        memory = TranslationMemory(db_path, track_usage=False)
+        memory.add_translation("Cancel", "Cancelar (jogo)")
+        assert memory.get_translation("OK") is None
+
+        assert memory.attach_memory(common_path)
+        assert memory.attach_memory(extra_path, priority=0)
+        assert not memory.attach_memory(extra_path)
+        assert [m['path'] for m in memory.get_attached_memories()] == [extra_path, common_path]
+
+        # A principal vence; entre anexadas vence a de menor prioridade
+        assert memory.get_translation("Cancel") == "Cancelar (jogo)"
+        assert memory.get_translation("Back") == "Voltar (extra)"
+        assert memory.get_translation("OK") == "OK (comum)"
+        assert memory.get_translation("Nothing") is None
+
+        # Leitura por outra thread usa sua própria conexão já anexada
+        results = []
+        worker = threading.Thread(
+            target=lambda: results.append(memory.get_translations_batch(
+                ["Cancel", "Back", "OK", "Exit", "Nothing"]
+            ))
+        )
+        worker.start()
+        worker.join()
+        assert results[0] == {
+            "Cancel": "Cancelar (jogo)", "Back": "Voltar (extra)",
+            "OK": "OK (comum)", "Exit": "Sair (extra)"
+        }
+
+        # Escritas vão só para a principal
+        memory.add_translation("OK", "Certo")
+        assert memory.get_translation("OK") == "Certo"
+        with TranslationMemory(common_path) as common:
+            assert common.get_translation("OK") == "OK (comum)"
+
+        assert memory.detach_memory(extra_path)
+        assert memory.get_translation("Back") == "Voltar (comum)"
+        assert memory.get_translation("Exit") is None
+
+        # Continua anexada ao reconectar
+        memory.close()
+        memory.connect(db_path)
+        assert memory.get_translation("Back") == "Voltar (comum)"
+        assert memory.detach_memory("mem1")
+        assert memory.get_translation("Back") is None
+        memory.close()
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_snapshot_backend():
+    """Snapshot mmap responde como a memória e serve de backend ao SmartTranslator"""
+    temp_dir, db_path = _temp_db()
+    try:
+        from tm_snapshot import SnapshotMemory
+        from smart_translator import SmartTranslator
+
+        memory = TranslationMemory(db_path, track_usage=False)
+        memory.bulk_import([(f"Soldier {i}", f"Soldado {i}") for i in range(1, 200)])
+        memory.add_translation("Café", "Coffee ☕")
+        memory.add_translation("Base 01", "Base 01 pt")
+
+        snapshot_path = os.path.join(temp_dir, "memory.tmsnap")
+        progress = []
+        assert memory.export_snapshot(snapshot_path, lambda d, t: progress.append((d, t))) == 201
+        assert progress[-1] == (201, 201)
+
+        with SnapshotMemory(snapshot_path) as snapshot:
+            assert len(snapshot) == 201
+            for text in ("Soldier 7", "Café", "Missing", ""):
+                assert snapshot.get_translation(text) == memory.get_translation(text)
+
+            probes = ["Soldier 1", "Soldier 199", "Nope", "Café", "Soldier 1"]
+            assert snapshot.get_translations_batch(probes) == memory.get_translations_batch(probes)
+
+            # Backend somente leitura do tradutor inteligente
+            translator = SmartTranslator(snapshot)
+            assert translator.translate("Soldier 7") == "Soldado 7"
+            assert not snapshot.add_translation("New", "Novo")
+
+        # Arquivos que não são snapshots são recusados
+        bogus = os.path.join(temp_dir, "bogus.tmsnap")
+        with open(bogus, 'wb') as f:
+            f.write(b'not a snapshot' * 10)
+        try:
+            SnapshotMemory(bogus)
+            assert False, "snapshot inválido aceito"
+        except ValueError:
+            pass
+        memory.close()
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_batch_lookup():
+    """Busca em lote igual à busca unitária, com anexadas e metadados; leitores só leem"""
+    temp_dir, db_path = _temp_db()
+    try:
+        extra_path = os.path.join(temp_dir, "extra.db")
+        with TranslationMemory(extra_path) as extra:
+            extra.add_translation("Shared", "Compartilhado")
+            extra.add_translation("Item 3", "Outro item")
+
+        memory = TranslationMemory(db_path, track_usage=False)
+        memory.bulk_import([(f"Item {i}", f"Item pt {i}") for i in range(1200)])
+        memory.add_translation("Potion", "Poção", category="items")
+        probes = [f"Item {i}" for i in range(0, 2400, 2)] + ["Potion", "Shared", "Item 3"]
+
+        for attach in (False, True):
+            if attach:
+                assert memory.attach_memory(extra_path)
+            memory._cache.clear()
+            # Leitura em outra thread: usa a conexão de leitura da thread
+            results = []
+            worker = threading.Thread(
+                target=lambda: results.append(memory.get_translations_batch(probes))
+            )
+            worker.start()
+            worker.join()
+            memory._cache.clear()
+            expected = {text: memory.get_translation(text) for text in probes}
+            assert results[0] == {text: value for text, value in expected.items() if value}
+            assert results[0]["Item 3"] == "Item pt 3"
+            assert ("Shared" in results[0]) == attach
+            assert len(results[0]) == 602 + int(attach)
+
+        meta = memory.get_translations_batch(["Potion", "Missing"], with_metadata=True)
+        assert meta == {"Potion": {"translated_text": "Poção", "usage_count": 1, "category": "items"}}
+
+        # A conexão de leitura continua em query_only
+        with memory._read_cursor() as cursor:
+            cursor.execute("PRAGMA query_only")
+            assert cursor.fetchone()[0] == 1
+        memory.close()
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_change_journal_polling():
+    """Alterações de outra instância chegam pelo diário e atualizam os caches"""
+    temp_dir, db_path = _temp_db()
+    try:
+        from contextual_suggestions import ContextualSuggestionEngine
+
+        memory = TranslationMemory(db_path, track_usage=False)
+        memory.add_translation("Iron sword", "Espada de ferro")
+        memory.add_translation("Old shield", "Escudo velho")
+        other = TranslationMemory(db_path, track_usage=False)
+
+        # Nada mudou fora desta instância
+        assert memory.poll_changes() == []
+
+        # Cache positivo e negativo aquecidos, depois alterados por outra instância
+        assert memory.get_translation("Iron sword") == "Espada de ferro"
+        assert memory.get_translation("Steel sword") is None
+        engine = ContextualSuggestionEngine(memory)
+        assert engine.get_term_translations("sword") == [
+            ("Iron sword", "Espada de ferro", "Iron sword")
+        ]
+        received = []
+        memory.add_change_listener(received.append)
+        memory.add_change_listener(engine.apply_memory_changes)
+
+        other.add_translation("Iron sword", "Espada férrea")
+        other.add_translation("Steel sword", "Espada de aço")
+        other.delete_translation(other.get_all_translations(search_term="Old shield")[0]['id'])
+        other.add_translation("Iron sword", "Espada férrea")  # só uso: fora do diário
+
+        changes = memory.poll_changes()
+        assert [(c.original_text, c.operation) for c in changes] == [
+            ("Iron sword", "U"), ("Steel sword", "I"), ("Old shield", "D")
+        ]
+        assert received == [changes]
+        assert memory.get_translation("Iron sword") == "Espada férrea"
+        assert memory.get_translation("Steel sword") == "Espada de aço"
+        assert memory.get_translation("Old shield") is None
+        assert sorted(engine.get_term_translations("sword")) == [
+            ("Iron sword", "Espada férrea", "Iron sword"),
+            ("Steel sword", "Espada de aço", "Steel sword")
+        ]
+        assert memory.poll_changes() == []
+
+        # Diário podado além do que foi visto: caches descartados por inteiro
+        other.add_translation("Gold ring", "Anel de ouro")
+        other.add_translation("Gold coin", "Moeda de ouro")
+        with other._get_cursor() as cursor:
+            cursor.execute("DELETE FROM translation_changes WHERE original_text = 'Gold ring'")
+        assert memory.poll_changes() is None
+        assert received[-1] is None
+        assert memory.get_translation("Gold ring") == "Anel de ouro"
+
+        other.close()
+        memory.close()
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_change_deltas():
+    """Deltas exportados por diário ou data são aplicados com last-writer-wins"""
+    temp_dir, db_path = _temp_db()
+    try:
+        source = TranslationMemory(db_path, track_usage=False)
+        source.bulk_import([(f"Quest {i}", f"Missão {i}") for i in range(500)])
+        target = TranslationMemory(os.path.join(temp_dir, "target.db"), track_usage=False)
+
+        # Primeira troca: tudo
+        full_path = os.path.join(temp_dir, "full.csv.gz")
+        full = source.export_changes(full_path)
+        assert full['rows'] == 500 and full['deletes'] == 0 and full['bytes'] > 0
+        stats = target.apply_changes(full_path)
+        assert stats['applied'] == 500 and stats['errors'] == 0
+        assert target.get_translation("Quest 42") == "Missão 42"
+
+        # Delta pelo diário: atualização, inserção e remoção
+        source.add_translation("Quest 1", "Missão um")
+        source.add_translation("Quest new", "Missão nova")
+        source.delete_translation(source.get_all_translations(search_term="Quest 7")[0]['id'])
+        delta_path = os.path.join(temp_dir, "delta.tsv")
+        delta = source.export_changes(delta_path, since=full['next_since'])
+        assert (delta['rows'], delta['upserts'], delta['deletes']) == (3, 2, 1)
+        assert delta['bytes'] < full['bytes']
+
+        # Edição local mais nova que o delta não é sobrescrita
+        with target._get_cursor() as cursor:
+            cursor.execute("UPDATE translations SET translated_text = 'Missão local', "
+                           "updated_at = '2999-01-01 00:00:00' WHERE original_text = 'Quest 1'")
+        stats = target.apply_changes(delta_path)
+        assert (stats['rows'], stats['applied'], stats['deleted'], stats['skipped']) == (3, 1, 1, 1)
+        assert target.get_translation("Quest 1") == "Missão local"
+        assert target.get_translation("Quest new") == "Missão nova"
+        assert target.get_translation("Quest 7") is None
+        assert target.get_stats()['total_translations'] == 500
+
+        # Delta por data usa updated_at (sem remoções)
+        with source._get_cursor() as cursor:
+            cursor.execute("UPDATE translations SET updated_at = '2000-01-01 00:00:00'")
+            cursor.execute("UPDATE translations SET updated_at = '2030-05-01 12:00:00' "
+                           "WHERE original_text = 'Quest 9'")
+        by_date = source.export_changes(delta_path, since="2030-05-01")
+        assert (by_date['rows'], by_date['deletes']) == (1, 0)
+
+        # Ponto já podado do diário e arquivos que não são deltas são recusados
+        with source._get_cursor() as cursor:
+            cursor.execute("DELETE FROM translation_changes WHERE change_id <= 10")
+        assert source.export_changes(delta_path, since=5) is None
+        bogus = os.path.join(temp_dir, "bogus.csv")
+        assert source.export_to_file(bogus)
+        assert target.apply_changes(bogus) is None
+
+        source.close()
+        target.close()
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_archive_tier():
+    """Traduções pouco usadas vão para o arquivo e voltam ao serem encontradas"""
+    temp_dir, db_path = _temp_db()
+    try:
+        memory = TranslationMemory(db_path, track_usage=False)
+        memory.bulk_import([(f"Rare line {i}", f"Linha rara {i}") for i in range(300)])
+        memory.add_translation("Start", "Iniciar")
+        with memory._get_cursor() as cursor:
+            cursor.execute("UPDATE translations SET usage_count = 50 WHERE original_text = 'Start'")
+
+        assert memory.archive_entries(max_usage=1) == 300
+        archive_path = memory.get_archive_path()
+        assert archive_path.endswith("_archive.db") and os.path.exists(archive_path)
+        stats = memory.get_stats()
+        assert stats['total_translations'] == 1
+        assert stats['archived_translations'] == 300
+
+        # Falta na camada principal cai no arquivo; o acerto é promovido depois
+        assert memory.get_translation("Start") == "Iniciar"
+        assert memory.get_translation("Rare line 5") == "Linha rara 5"
+        assert memory.get_translation("Never seen") is None
+        batch = memory.get_translations_batch(["Rare line 6", "Rare line 7", "Start", "Nope"])
+        assert batch == {"Rare line 6": "Linha rara 6", "Rare line 7": "Linha rara 7", "Start": "Iniciar"}
+        assert memory.get_stats()['total_translations'] == 1
+
+        memory.flush_usage()
+        stats = memory.get_stats()
+        assert stats['total_translations'] == 4
+        assert stats['archived_translations'] == 297
+        assert stats['archive_promotions'] == 3
+
+        # O arquivo é reaberto ao reconectar
+        memory.close()
+        memory.connect(db_path)
+        assert memory.get_archive_path() == archive_path
+        assert memory.get_translation("Rare line 100") == "Linha rara 100"
+        assert memory.get_translations_batch(["Rare line 6"], with_metadata=True)["Rare line 6"][
+            "translated_text"] == "Linha rara 6"
+
+        assert memory.close_archive()
+        assert memory.get_archive_path() is None
+        assert memory.get_translation("Rare line 200") is None
+        memory.close()
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_online_maintenance():
+    """auto_vacuum incremental, manutenção em segundo plano e cópia com VACUUM INTO"""
+    temp_dir, db_path = _temp_db()
+    try:
+        # Banco criado por versão antiga, sem auto_vacuum
+        legacy_path = os.path.join(temp_dir, "legacy.db")
+        conn = sqlite3.connect(legacy_path)
+        conn.execute("CREATE TABLE filler (x)")
+        conn.commit()
+        conn.close()
+        legacy = TranslationMemory(legacy_path)
+        assert legacy.get_maintenance_stats()['auto_vacuum'] == 'none'
+        assert legacy.vacuum()
+        assert legacy.get_maintenance_stats()['auto_vacuum'] == 'incremental'
+        legacy.close()
+
+        memory = TranslationMemory(db_path, track_usage=False)
+        assert memory.get_maintenance_stats()['auto_vacuum'] == 'incremental'
+        memory.bulk_import([(f"Entry {i} " + "x" * 200, f"Entrada {i}") for i in range(3000)])
+        with memory._get_cursor() as cursor:
+            cursor.execute("DELETE FROM translations WHERE id % 2 = 0")
+            cursor.execute("DELETE FROM translation_changes")
+        free_pages = memory.get_maintenance_stats()['free_pages']
+        assert free_pages > memory.INCREMENTAL_VACUUM_PAGES
+
+        # Passos limitados, depois a thread de fundo termina o serviço
+        assert memory.incremental_vacuum(max_pages=10) == 10
+        memory.start_maintenance(interval=0.01)
+        deadline = time.time() + 5
+        while memory.get_maintenance_stats()['free_pages'] and time.time() < deadline:
+            time.sleep(0.02)
+        stats = memory.get_maintenance_stats()
+        assert stats['free_pages'] == 0 and stats['maintenance_running']
+        assert stats['vacuumed_pages'] == free_pages
+        memory.stop_maintenance()
+
+        # A cópia não espera uma transação aberta no escritor
+        copy_path = os.path.join(temp_dir, "copy.db")
+        with memory._write_lock():
+            memory.cursor.execute("BEGIN")
+            memory.cursor.execute("DELETE FROM translations")
+            assert memory.snapshot(copy_path)
+            memory.conn.rollback()
+
+        with TranslationMemory(copy_path) as copy:
+            assert copy.get_stats()['total_translations'] == 1500
+            assert copy.get_translation("Entry 0 " + "x" * 200) == "Entrada 0"
+
+        # Trocar de banco com a manutenção no meio de um passo não trava
+        entered = threading.Event()
+        vacuum = memory.incremental_vacuum
+
+        def slow_vacuum(max_pages):
+            entered.set()
+            time.sleep(0.2)
+            return vacuum(max_pages)
+
+        memory.incremental_vacuum = slow_vacuum
+        memory.start_maintenance(interval=0.01)
+        assert entered.wait(5)
+        connected = []
+        worker = threading.Thread(target=lambda: connected.append(memory.connect(copy_path)),
+                                  daemon=True)
+        worker.start()
+        worker.join(10)
+        assert connected == [True]
+        assert not memory.get_maintenance_stats()['maintenance_running']
+        memory.close()
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_normalized_lookup():
+    """Variantes de espaços, quebras de linha e maiúsculas reaproveitam a tradução"""
+    from smart_translator import SmartTranslator
+
+    temp_dir, db_path = _temp_db()
+    try:
+        memory = TranslationMemory(db_path, track_usage=False)
+        memory.add_translation("Open the door", "Abra a porta")
+        memory.bulk_import([("Close  the\nwindow", "Feche a\njanela")])
+
+        # Coluna preenchida em todos os caminhos de escrita
+        rows = memory.conn.execute(
+            "SELECT original_text, normalized_hash FROM translations"
+        ).fetchall()
+        assert all(stored == normalized_hash(original) for original, stored in rows)
+
+        assert memory.get_normalized_translation("  OPEN THE DOOR ") == ("Open the door", "Abra a porta")
+        assert memory.get_normalized_translation("Open the doors") is None
+
+        translator = SmartTranslator(memory)
+        assert translator.translate("Open the door") == "Abra a porta"
+        assert translator.translate("OPEN THE DOOR  ") == "ABRA A PORTA  "
+        assert translator.translate("open the door") == "abra a porta"
+        assert translator.translate("close the\r\nwindow\r\n") == "feche a\r\njanela\r\n"
+        translator.set_sensitive_memory_enabled(False)
+        assert translator.translate("\tOpen   the door") == "\tAbra a porta"
+
+        # Bancos antigos ganham a coluna no connect
+        memory.conn.execute("UPDATE translations SET normalized_hash = NULL")
+        memory.conn.commit()
+        memory.close()
+        memory = TranslationMemory(db_path, track_usage=False)
+        assert memory.get_normalized_translation("open the DOOR") == ("Open the door", "Abra a porta")
+        memory.close()
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_busy_retry_and_writer_lease():
+    """Lock de outro processo: novas tentativas, gravação adiada e concessão de escritor"""
+    temp_dir, db_path = _temp_db()
+    try:
+        memory = TranslationMemory(db_path, track_usage=False, busy_timeout=0.05)
+        other = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+
+        # Lock segurado por pouco tempo: o BEGIN IMMEDIATE tenta de novo
+        other.execute("BEGIN IMMEDIATE")
+        timer = threading.Timer(0.2, other.execute, ("COMMIT",))
+        timer.start()
+        assert memory.add_translation("Hello", "Olá")
+        timer.join()
+        stats = memory.get_pool_stats()
+        assert stats['busy_retries'] > 0 and stats['busy_waits'] > 0
+        assert stats['busy_failures'] == 0
+
+        # Lock segurado além das tentativas: nada se perde
+        memory.BUSY_RETRIES = 1
+        other.execute("BEGIN IMMEDIATE")
+        assert memory.add_translation("Bye", "Tchau")
+        assert memory.get_pool_stats()['deferred_writes'] == 1
+        assert memory.get_translation("Bye") == "Tchau"
+        assert memory.flush_usage() == 0
+        other.execute("COMMIT")
+        memory.flush_usage()
+        assert memory.get_pool_stats()['deferred_writes'] == 0
+        assert other.execute("SELECT translated_text FROM translations WHERE original_text = 'Bye'"
+                             ).fetchone() == ("Tchau",)
+        other.close()
+
+        # Concessão de escritor: uma instância por vez nas operações longas
+        second = TranslationMemory(db_path, track_usage=False)
+        assert memory.acquire_writer_lease()
+        assert second.get_writer_lease()['own'] is False
+        assert not second.acquire_writer_lease(wait=0.1)
+        assert second.get_pool_stats()['lease_timeouts'] == 1
+        memory.release_writer_lease()
+        assert second.get_writer_lease() is None
+
+        # A operação longa libera a concessão ao terminar
+        assert second.bulk_import([("Yes", "Sim")]) == (1, 0)
+        assert memory.get_writer_lease() is None
+        memory.poll_changes()
+        assert memory.get_translation("Yes") == "Sim"
+        second.close()
+        memory.close()
+
+        # close() insiste nas gravações adiadas e devolve o que sobrar
+        memory = TranslationMemory(db_path, track_usage=False, busy_timeout=0.05)
+        memory.BUSY_RETRIES = 0
+        other = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+        other.execute("BEGIN IMMEDIATE")
+        assert memory.add_translation("Late", "Tarde")
+        timer = threading.Timer(0.3, other.execute, ("COMMIT",))
+        timer.start()
+        assert memory.close() == []
+        timer.join()
+        assert other.execute("SELECT translated_text FROM translations WHERE original_text = 'Late'"
+                             ).fetchone() == ("Tarde",)
+
+        memory = TranslationMemory(db_path, track_usage=False, busy_timeout=0.05)
+        memory.BUSY_RETRIES = 0
+        memory.DEFERRED_FLUSH_WAIT = 0.2
+        other.execute("BEGIN IMMEDIATE")
+        assert memory.add_translation("Stuck", "Preso")
+        assert memory.close() == [("Stuck", "Preso")]
+        other.execute("COMMIT")
+        other.close()
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_numeric_pattern_index():
+    """Padrões numéricos resolvidos pelo índice, sem testar números candidatos"""
+    from smart_translator import SmartTranslator
+
+    temp_dir, db_path = _temp_db()
+    try:
+        memory = TranslationMemory(db_path, track_usage=False)
+        memory.bulk_import([("Soldier 01", "Soldado 01"), ("Item_007", "Objeto_007"),
+                            ("Level 1", "Nível 1")])
+        translator = SmartTranslator(memory)
+
+        lookups = []
+        original_get = memory.get_translation
+        memory.get_translation = lambda text: lookups.append(text) or original_get(text)
+
+        assert translator.translate("Soldier 57") == "Soldado 57"
+        assert translator.translate("Item_123") == "Objeto_123"
+        assert translator.translate("Level 9") == "Nível 9"
+        assert len(lookups) <= 6
+
+        # learn_pattern atualiza o índice na hora
+        translator.learn_pattern("Archer 01", "Arqueiro 01")
+        assert translator.translate("Archer 02") == "Arqueiro 02"
+
+        # Exemplo editado ou removido localmente não vale mais
+        memory.update_translation(memory.get_all_translations(search_term="Soldier 01")[0]['id'],
+                                  translated_text="Guerreiro 01")
+        assert translator.translate("Soldier 58") == "Guerreiro 58"
+        memory.delete_translation(memory.get_all_translations(search_term="Archer 01")[0]['id'])
+        assert translator.translate("Archer 03") is None
+
+        # Alterações em massa remontam o índice
+        memory.bulk_import([("Knight 01", "Cavaleiro 01")])
+        assert translator.translate("Knight 05") == "Cavaleiro 05"
+
+        # Alterações de outra instância chegam pelo listener
+        other = TranslationMemory(db_path, track_usage=False)
+        other.add_translation("Mage 01", "Mago 01")
+        other.close()
+        memory.get_translation = original_get
+        memory.add_change_listener(translator.apply_memory_changes)
+        memory.poll_changes()
+        assert translator.translate("Mage 10") == "Mago 10"
+        other = TranslationMemory(db_path, track_usage=False)
+        other.delete_translation(other.get_all_translations(search_term="Mage 01")[0]['id'])
+        other.close()
+        memory.poll_changes()
+        assert ("Mage", " ", 2) not in translator._pattern_index
+        assert translator.translate("Mage 11") is None
+
+        # Exemplos das memórias anexadas também entram no índice; a principal vence
+        shared_path = os.path.join(temp_dir, "shared.db")
+        with TranslationMemory(shared_path, track_usage=False) as shared:
+            shared.add_translations_batch([("Goblin 01", "Goblin Verde 01"),
+                                           ("Knight 01", "Paladino 01")])
+        assert memory.attach_memory(shared_path)
+        assert translator.translate("Goblin 12") == "Goblin Verde 12"
+        assert translator.translate("Knight 12") == "Cavaleiro 12"
+        assert memory.detach_memory(shared_path)
+        assert translator.translate("Goblin 13") is None
+        memory.close()
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_translate_many_tiers():
+    """translate_many: deduplicação, exatas em lote e estratégia de cada resultado"""
+    from smart_translator import SmartTranslator
+
+    temp_dir, db_path = _temp_db()
+    try:
+        memory = TranslationMemory(db_path)
+        memory.bulk_import([("Hello", "Olá"), ("Soldier 01", "Soldado 01"),
+                            ("Light Armor", "Armadura Leve Light")])
+        translator = SmartTranslator(memory)
+
+        batches = []
+        original_batch = memory.get_translations_batch
+        memory.get_translations_batch = lambda texts, *args, **kwargs: (
+            batches.append(list(texts)) or original_batch(texts, *args, **kwargs))
+
+        texts = ["Hello", "Hello", "HELLO ", "Soldier 07", "Heavy Armor", "Unknown", ""]
+        results = translator.translate_many(texts)
+        assert results == {
+            "Hello": ("Olá", 'exact'),
+            "HELLO ": ("OLÁ ", 'normalized'),
+            "Soldier 07": ("Soldado 07", 'sensitive_numeric'),
+            "Heavy Armor": ("Armadura Leve Heavy", 'variation'),
+        }
+        assert batches[0] == ["Hello", "HELLO ", "Soldier 07", "Heavy Armor", "Unknown"]
+
+        # Uso contado pela exata e pela normalizada; mesmo resultado de translate()
+        memory.flush_usage()
+        assert _usage_of(memory, "Hello") == 3
+        assert all(translator.translate(text) == translation
+                   for text, (translation, _) in results.items())
+        assert translator.batch_translate(texts) == {
+            text: translation for text, (translation, _) in results.items()
+        }
+        memory.close()
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_numeric_templates():
+    """Modelos numéricos: aprendidos, preenchidos, buscados em lote e invalidados"""
+    from smart_translator import SmartTranslator
+    from translation_templates import extract_template, build_translated_template
+
+    assert extract_template("Wave 3 of 10").skeleton == "Wave {0} of {1}"
+    assert extract_template("Hello") is None and extract_template("42") is None
+    assert build_translated_template("Lv.12 Archer", "Arqueiro Nv. 12").skeleton == "Arqueiro Nv. {0}"
+    assert build_translated_template("1 item", "um item") is None
+
+    temp_dir, db_path = _temp_db()
+    try:
+        memory = TranslationMemory(db_path, track_usage=False)
+        translator = SmartTranslator(memory)
+        translator.learn_pattern("Wave 3 of 10", "Onda 3 de 10")
+        assert translator.translate("Wave 7 of 12") == "Onda 7 de 12"
+        assert translator.translate("WAVE 7 OF 12") == "ONDA 7 DE 12"
+        assert translator.translate("Wave 2.5 of 12") is None
+
+        # Modelos de traduções existentes, mais usadas primeiro
+        memory.bulk_import([("Deal 25 damage for 3 turns", "Causa 25 de dano por 3 turnos"),
+                            ("Lv.12 Archer", "Arqueiro Nv. 12"), ("1 item", "um item")])
+        assert memory.build_templates() == 2
+        assert memory.get_stats()['templates'] == 3
+
+        batches = []
+        original_batch = memory.get_templates_batch
+        memory.get_templates_batch = lambda templates: (
+            batches.append(list(templates)) or original_batch(templates))
+        results = translator.translate_many(["Deal 40 damage for 2 turns", "Lv.3 Archer", "2 item"])
+        assert results == {
+            "Deal 40 damage for 2 turns": ("Causa 40 de dano por 2 turnos", 'template'),
+            "Lv.3 Archer": ("Arqueiro Nv. 3", 'template'),
+        }
+        assert len(batches) == 1
+
+        # Exemplo removido leva o modelo junto
+        memory.delete_translation(memory.get_all_translations(search_term="Archer")[0]['id'])
+        assert translator.translate("Lv.4 Archer") is None
+
+        # Outra linha ainda produz o modelo: remoção e edição não o apagam
+        memory.add_translations_batch([("Wave 5 of 8", "Onda 5 de 8")])
+        first = memory.get_all_translations(search_term="Wave 3 of 10")[0]['id']
+        memory.delete_translation(first)
+        assert translator.translate("Wave 7 of 12") == "Onda 7 de 12"
+        second = memory.get_all_translations(search_term="Wave 5 of 8")[0]['id']
+        memory.add_translation("Wave 1 of 2", "Onda 1 de 2")
+        memory.update_translation(second, "Onda final")
+        assert translator.translate("Wave 7 of 12") == "Onda 7 de 12"
+
+        # Edição com números atualiza o modelo; sem linha que o produza, ele sai
+        third = memory.get_all_translations(search_term="Wave 1 of 2")[0]['id']
+        memory.update_translation(third, "Horda 1 de 2")
+        assert translator.translate("Wave 7 of 12") == "Horda 7 de 12"
+        memory.update_translation(third, "Horda")
+        assert translator.translate("Wave 7 of 12") is None
+
+        # Texto que começa com número: as linhas restantes vêm de template_sources
+        memory.add_translations_batch([("10 Gold", "10 Ouro"), ("25 Gold", "25 Ouro")])
+        memory.delete_translation(memory.get_all_translations(search_term="10 Gold")[0]['id'])
+        assert translator.translate("7 Gold") == "7 Ouro"
+        memory.delete_translation(memory.get_all_translations(search_term="25 Gold")[0]['id'])
+        assert translator.translate("7 Gold") is None
+        memory.close()
+
+        # Banco com modelos anteriores a template_sources: preenchida ao conectar
+        memory = TranslationMemory(db_path, track_usage=False)
+        memory.add_translations_batch([("Room 1", "Sala 1"), ("Room 2", "Sala 2")])
+        memory.conn.execute("DROP TABLE template_sources")
+        memory.conn.commit()
+        memory.close()
+        memory = TranslationMemory(db_path, track_usage=False)
+        memory.delete_translation(memory.get_all_translations(search_term="Room 1")[0]['id'])
+        assert SmartTranslator(memory).translate("Room 5") == "Sala 5"
+        memory.close()
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_learned_patterns_persisted():
+    """Padrões de learn_pattern gravados no banco e vistos por outras instâncias"""
+    from smart_translator import SmartTranslator
+
+    temp_dir, db_path = _temp_db()
+    try:
+        memory = TranslationMemory(db_path, track_usage=False)
+        other = TranslationMemory(db_path, track_usage=False)
+        assert other.get_learned_patterns() == {}
+
+        translator = SmartTranslator(memory)
+        translator.learn_pattern("Soldier 01", "Soldado 01", persist=False)
+        translator.learn_pattern("Chapter 1", "Capítulo Um", persist=False)
+        assert translator.pattern_cache == {"Soldier": "Soldado"}
+        assert translator.translate_many(["Soldier 57"]) == {"Soldier 57": ("Soldado 57", 'learned')}
+
+        # Instância já aberta recarrega o índice ao ver a escrita de outra
+        other.poll_changes()
+        assert SmartTranslator(other).translate("Soldier 9") == "Soldado 9"
+        other.close()
+        memory.close()
+
+        # Mantidos entre execuções
+        memory = TranslationMemory(db_path, track_usage=False)
+        assert memory.get_learned_pattern("Soldier") == ("Soldado", ' ')
+        assert memory.get_stats()['learned_patterns'] == 1
+        memory.clear_all()
+        assert SmartTranslator(memory).translate("Soldier 3") is None
+        memory.close()
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_variation_lexicon():
+    """Variações do perfil: autômato de uma passada e alternativas em uma consulta"""
+    from smart_translator import SmartTranslator
+    from regex_profiles import RegexProfile
+    from variation_lexicon import VariationLexicon, parse_variations, format_variations
+
+    lexicon = VariationLexicon([["Iron", "Steel"], ["Iron Guard", "Royal Guard"], ["Bad"]])
+    assert len(lexicon) == 2
+    assert lexicon.find_terms("Iron Guard of Ironwood Iron") == {
+        "Iron": [(0, 4), (23, 27)], "Iron Guard": [(0, 10)]
+    }
+    assert [c.alternative for c in lexicon.candidates("Iron Guard Iron")] == [
+        "Steel Guard Steel", "Royal Guard Iron"
+    ]
+
+    pairs = parse_variations("Iron = Steel\n# comentário\nLight = Heavy | Leve = Pesada\nx =")
+    assert pairs == [["Iron", "Steel"], ["Light", "Heavy", "Leve", "Pesada"]]
+    assert parse_variations(format_variations(pairs)) == pairs
+    profile = RegexProfile.from_dict(RegexProfile("Jogo", variations=pairs).to_dict())
+    assert profile.variations == pairs
+
+    temp_dir, db_path = _temp_db()
+    try:
+        memory = TranslationMemory(db_path, track_usage=False)
+        memory.bulk_import([("Light Armor", "Armadura Leve"), ("Iron Sword", "Espada de Ferro"),
+                            ("Steel Shield", "Escudo de Steel")])
+        translator = SmartTranslator(memory, variations=profile.variations)
+
+        batches = []
+        original_batch = memory.get_translations_batch
+        memory.get_translations_batch = lambda texts, *args, **kwargs: (
+            batches.append(list(texts)) or original_batch(texts, *args, **kwargs))
+
+        assert translator.translate("Heavy Armor") == "Armadura Pesada"
+        assert translator.translate("Iron Shield") == "Escudo de Iron"
+        # "Steel" traduzido não aparece na tradução: sem par de tradução, não adapta
+        assert translator.translate("Steel Sword") is None
+        assert translator.translate("Lightning Armor") is None
+        assert batches == [["Light Armor"], ["Steel Shield"], ["Iron Sword"]]
+
+        # Léxico grande: uma consulta por texto, qualquer que seja o tamanho
+        translator.set_variations([[f"Tier{i}", f"Rank{i}"] for i in range(500)] + pairs)
+        batches.clear()
+        assert translator.translate("Heavy Armor") == "Armadura Pesada"
+        assert len(batches) == 1
+
+        translator.set_variations(None)
+        assert len(translator.get_variations()) == 9
+        memory.close()
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def main():
+    """Executa todos os testes"""
+    print("\n🧪 TESTANDO MEMÓRIA DE TRADUÇÃO\n")
+
+    tests = [
+        ("Busca sem escrita", test_lookup_is_write_free),
+        ("Flush de uso no close", test_usage_flushed_on_close),
+        ("Contagem de uso desativada", test_usage_tracking_disabled),
+        ("Conexão de leitura por thread", test_reader_connection_per_thread),
+        ("Cache com write-through", test_hot_cache_write_through),
+        ("Limites do cache", test_cache_bounds),
+        ("Busca FTS5", test_fts_search),
+        ("Iterador por keyset", test_iter_translations_keyset),
+        ("Sugestões contextuais", test_contextual_suggestions_use_iterator),
+        ("Carga em massa e mesclagem", test_bulk_import_and_merge),
+        ("Exportação/importação em fluxo", test_streaming_export_import),
+        ("Migração da chave hash", test_hash_key_migration),
+        ("Filtro de Bloom", test_bloom_filter),
+        ("Fila de gravação assíncrona", test_write_behind_queue),
+        ("Falhas da fila de gravação", test_write_behind_failures),
+        ("Estatísticas por triggers", test_stats_counters),
+        ("Memórias anexadas", test_attached_memories),
+        ("Snapshot mmap", test_snapshot_backend),
+        ("Busca em lote", test_batch_lookup),
+        ("Diário de alterações entre instâncias", test_change_journal_polling),
+        ("Deltas de alterações", test_change_deltas),
+        ("Camada de arquivo", test_archive_tier),
+        ("Manutenção online", test_online_maintenance),
+        ("Busca normalizada", test_normalized_lookup),
+        ("Disputa entre processos", test_busy_retry_and_writer_lease),
+        ("Índice de padrões numéricos", test_numeric_pattern_index),
+        ("Tradução em lote por camadas", test_translate_many_tiers),
+        ("Modelos numéricos", test_numeric_templates),
+        ("Padrões aprendidos persistidos", test_learned_patterns_persisted),
+        ("Léxico de variações", test_variation_lexicon),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            results.append((test_name, True))
+        except Exception as e:
+            print(f"❌ Erro em '{test_name}': {e}")
+            import traceback
+            traceback.print_exc()
+            results.append((test_name, False))
+
+    print("\n" + "=" * 70)
+    print("RESUMO DOS TESTES")
+    print("=" * 70)
+
+    for test_name, passed in results:
+        status = "✅ PASSOU" if passed else "❌ FALHOU"
+        print(f"{status} - {test_name}")
+
+    all_passed = all(result[1] for result in results)
+
+    if all_passed:
+        print("\n🎉 Todos os testes passaram!")
+        return 0
+    else:
+        print("\n⚠️  Alguns testes falharam")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,308 @@
+"""
+Módulo de Snapshot da Memória de Tradução
+Formato compacto, imutável e somente leitura, carregado via mmap
+
+Pensado para execuções em lote (máquinas de build) que só leem a memória:
+abrir o arquivo é praticamente instantâneo e as páginas mapeadas são
+compartilhadas pelo cache do sistema entre vários processos de trabalho.
+
+Layout do arquivo (seções alinhadas em 8 bytes):
+- cabeçalho fixo (little-endian, ver HEADER_FORMAT)
+- hashes:   N inteiros de 64 bits sem sinal, em ordem crescente
+- offsets:  N inteiros de 64 bits, posição do texto original na tabela
+- orig_len: N inteiros de 32 bits, tamanho em bytes do texto original
+- tran_len: N inteiros de 32 bits, tamanho em bytes da tradução
+- tabela de strings: original seguido da tradução, em UTF-8
+
+Os vetores usam a ordem de bytes da máquina que gerou o snapshot; o
+cabeçalho registra essa ordem e arquivos de outra arquitetura são recusados.
+"""
+
+import bisect
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from typing import Optional, List, Dict, Callable, Iterable, Tuple
+
+from database import text_hash
+
+SNAPSHOT_MAGIC = b'TMSNAP\x00\x01'
+SNAPSHOT_VERSION = 1
+
+# magic, versão, ordem de bytes (1 = little, 2 = big), quantidade,
+# offsets das seções: hashes, offsets, orig_len, tran_len, strings, tamanho das strings
+HEADER_FORMAT = '<8sIIQQQQQQQ'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+_BYTE_ORDER = 1 if sys.byteorder == 'little' else 2
+_HASH_MASK = 0xFFFFFFFFFFFFFFFF
+
+
+def _align(value: int) -> int:
+    """Arredonda para o próximo múltiplo de 8"""
+    return (value + 7) & ~7
+
+
+def _array_bytes(typecode: str, values: List[int]) -> bytes:
+    """Serializa uma lista de inteiros na ordem de bytes da máquina"""
+    return memoryview(struct.pack(f'={len(values)}{typecode}', *values)).tobytes()
+
+
+def write_snapshot(rows: Iterable[Tuple[str, str]], filepath: str,
+                   progress_callback: Optional[Callable[[int, Optional[int]], None]] = None) -> int:
+    """
+    Grava um snapshot a partir de pares (texto_original, texto_traduzido).
+
+    As strings vão para um arquivo temporário à medida que são lidas; só o
+    índice (24 bytes por tradução) fica em memória para ser ordenado. O
+    arquivo final é escrito ao lado e renomeado, então leitores nunca veem
+    um snapshot pela metade.
+
+    Args:
+        rows: Iterável de pares (original, tradução)
+        filepath: Caminho do snapshot
+        progress_callback: Função chamada com (linhas_lidas, None)
+
+    Returns:
+        Quantidade de traduções gravadas
+    """
+    entries = []
+    directory = os.path.dirname(os.path.abspath(filepath))
+
+    with tempfile.TemporaryFile(dir=directory) as strings:
+        offset = 0
+        for original, translated in rows:
+            original_bytes = original.encode('utf-8')
+            translated_bytes = translated.encode('utf-8')
+            strings.write(original_bytes)
+            strings.write(translated_bytes)
+            entries.append((text_hash(original) & _HASH_MASK, offset,
+                            len(original_bytes), len(translated_bytes)))
+            offset += len(original_bytes) + len(translated_bytes)
+
+            if progress_callback and len(entries) % 10000 == 0:
+                progress_callback(len(entries), None)
+
+        entries.sort()
+        count = len(entries)
+
+        hashes_offset = _align(HEADER_SIZE)
+        offsets_offset = hashes_offset + 8 * count
+        orig_len_offset = offsets_offset + 8 * count
+        tran_len_offset = orig_len_offset + 4 * count
+        strings_offset = _align(tran_len_offset + 4 * count)
+
+        header = struct.pack(HEADER_FORMAT, SNAPSHOT_MAGIC, SNAPSHOT_VERSION, _BYTE_ORDER, count,
+                             hashes_offset, offsets_offset, orig_len_offset, tran_len_offset,
+                             strings_offset, offset)
+
+        temp_path = filepath + '.tmp'
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(header)
+                f.write(b'\0' * (hashes_offset - HEADER_SIZE))
+                f.write(_array_bytes('Q', [entry[0] for entry in entries]))
+                f.write(_array_bytes('Q', [entry[1] for entry in entries]))
+                f.write(_array_bytes('I', [entry[2] for entry in entries]))
+                f.write(_array_bytes('I', [entry[3] for entry in entries]))
+                f.write(b'\0' * (strings_offset - tran_len_offset - 4 * count))
+
+                strings.seek(0)
+                shutil.copyfileobj(strings, f, 1024 * 1024)
+
+            os.replace(temp_path, filepath)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    if progress_callback:
+        progress_callback(count, count)
+
+    return count
+
+
+class SnapshotMemory:
+    """
+    Memória de tradução somente leitura sobre um snapshot mapeado em memória.
+
+    Tem a mesma interface de busca de TranslationMemory (get_translation,
+    get_translations_batch, is_connected), então pode ser usada como backend
+    do SmartTranslator. A busca faz bisect nos hashes ordenados e confere o
+    texto original na tabela de strings.
+    """
+
+    def __init__(self, filepath: str):
+        """
+        Abre e mapeia um snapshot
+
+        Args:
+            filepath: Caminho do arquivo gerado por write_snapshot
+
+        Raises:
+            ValueError: Se o arquivo não for um snapshot válido
+        """
+        self.filepath = filepath
+        self._file = open(filepath, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._load_header()
+        except Exception:
+            self._file.close()
+            raise
+
+    def _load_header(self):
+        """Valida o cabeçalho e cria as visões dos vetores do índice"""
+        if len(self._mm) < HEADER_SIZE:
+            raise ValueError("Arquivo de snapshot truncado")
+
+        (magic, version, byte_order, count, hashes_offset, offsets_offset, orig_len_offset,
+         tran_len_offset, strings_offset, strings_size) = struct.unpack_from(HEADER_FORMAT, self._mm)
+
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError("Arquivo não é um snapshot de memória de tradução compatível")
+        if byte_order != _BYTE_ORDER:
+            raise ValueError("Snapshot gerado em máquina com outra ordem de bytes")
+        if strings_offset + strings_size > len(self._mm):
+            raise ValueError("Arquivo de snapshot truncado")
+
+        view = memoryview(self._mm)
+        self._view = view
+        self._count = count
+        self._hashes = view[hashes_offset:hashes_offset + 8 * count].cast('Q')
+        self._offsets = view[offsets_offset:offsets_offset + 8 * count].cast('Q')
+        self._orig_len = view[orig_len_offset:orig_len_offset + 4 * count].cast('I')
+        self._tran_len = view[tran_len_offset:tran_len_offset + 4 * count].cast('I')
+        self._strings_offset = strings_offset
+
+    def __len__(self) -> int:
+        return self._count
+
+    def is_connected(self) -> bool:
+        """Snapshot aberto e pronto para buscas"""
+        return self._mm is not None
+
+    def get_db_path(self) -> Optional[str]:
+        """Retorna o caminho do snapshot"""
+        return self.filepath
+
+    def get_translation(self, original: str) -> Optional[str]:
+        """
+        Busca uma tradução exata
+
+        Args:
+            original: Texto original
+
+        Returns:
+            Texto traduzido ou None se não encontrado
+        """
+        if self._mm is None:
+            return None
+
+        key_hash = text_hash(original) & _HASH_MASK
+        hashes = self._hashes
+        index = bisect.bisect_left(hashes, key_hash)
+        if index >= self._count or hashes[index] != key_hash:
+            return None
+
+        encoded = original.encode('utf-8')
+        # Hashes iguais podem vir de textos diferentes: confere cada um
+        while index < self._count and hashes[index] == key_hash:
+            start = self._strings_offset + self._offsets[index]
+            orig_len = self._orig_len[index]
+            if orig_len == len(encoded) and self._mm[start:start + orig_len] == encoded:
+                end = start + orig_len + self._tran_len[index]
+                return self._mm[start + orig_len:end].decode('utf-8')
+            index += 1
+
+        return None
+
+    def get_translations_batch(self, originals: List[str]) -> Dict[str, str]:
+        """
+        Busca múltiplas traduções
+
+        Args:
+            originals: Lista de textos originais
+
+        Returns:
+            Dicionário {texto_original: texto_traduzido}
+        """
+        results = {}
+        for original in dict.fromkeys(originals):
+            translation = self.get_translation(original)
+            if translation is not None:
+                results[original] = translation
+        return results
+
+    def get_normalized_translation(self, text: str) -> Optional[Tuple[str, str]]:
+        """O snapshot só indexa o texto exato: sem busca normalizada"""
+        return None
+
+    def get_templates_batch(self, templates: List[Tuple[str, str]]) -> Dict:
+        """Snapshots não guardam modelos numéricos"""
+        return {}
+
+    def add_template(self, original: str, translated: str) -> bool:
+        """Snapshots são imutáveis: modelos não são aprendidos"""
+        return False
+
+    def get_learned_patterns(self) -> Dict[str, Tuple[str, str]]:
+        """Snapshots não guardam padrões aprendidos"""
+        return {}
+
+    def get_learned_pattern(self, base_text: str) -> Optional[Tuple[str, str]]:
+        """Snapshots não guardam padrões aprendidos"""
+        return None
+
+    def add_learned_pattern(self, base_text: str, translated_base: str,
+                            separator: str = ' ') -> bool:
+        """Snapshots são imutáveis: padrões não são aprendidos"""
+        return False
+
+    def record_usage(self, originals: Iterable[str]):
+        """Snapshots não guardam contadores de uso"""
+
+    def add_translation(self, original: str, translated: str, *args, **kwargs) -> bool:
+        """Snapshots são imutáveis: escritas são ignoradas"""
+        return False
+
+    def get_stats(self) -> dict:
+        """Retorna estatísticas do snapshot"""
+        return {
+            'total_translations': self._count,
+            'db_path': self.filepath,
+            'snapshot_bytes': len(self._mm) if self._mm is not None else 0
+        }
+
+    def close(self):
+        """Libera o mapeamento e fecha o arquivo"""
+        if self._mm is None:
+            return
+
+        # As visões precisam ser liberadas antes de fechar o mmap
+        for name in ('_hashes', '_offsets', '_orig_len', '_tran_len', '_view'):
+            view = getattr(self, name, None)
+            if view is not None:
+                view.release()
+        self._mm.close()
+        self._mm = None
+        self._file.close()
+
+    def __enter__(self):
+        """Suporte para context manager"""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Fecha o snapshot ao sair do context manager"""
+        self.close()
+        return False
+
+    def __del__(self):
+        """Destrutor - garante que o arquivo seja fechado"""
+        try:
+            self.close()
+        except Exception:
+            pass
@@ -0,0 +1,142 @@
+"""
+Módulo de Modelos de Tradução (templates numéricos)
+Abstrai os números de um texto em posições para que uma única tradução
+cubra todas as strings geradas a partir do mesmo modelo
+
+Exemplos:
+    "Wave 3 of 10"               -> "Wave {0} of {1}"        valores ['3', '10']
+    "Deal 25 damage for 3 turns" -> "Deal {0} damage for {1} turns"
+    "Lv.12 Archer"               -> "Lv.{0} Archer"
+
+Cada posição tem um tipo ('i' inteiro, 'f' número com separador, como
+"2.5" ou "1,000"), e o modelo traduzido pode reordenar as posições:
+"Wave {0} of {1}" -> "Onda {0} de {1}". Chaves literais do texto são
+dobradas ("{{" e "}}") para não se confundirem com as posições.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import List, Optional
+
+# Números inteiros ou com separadores internos ("2.5", "1,000", "1.2.3")
+NUMBER_PATTERN = re.compile(r'\d+(?:[.,]\d+)*')
+
+# Posição "{n}" ou chave literal escapada
+SLOT_PATTERN = re.compile(r'\{\{|\}\}|\{(\d+)\}')
+
+
+@dataclass
+class TextTemplate:
+    """Texto decomposto em modelo e valores numéricos"""
+    skeleton: str  # Texto com {n} no lugar de cada número
+    values: List[str]  # Números na ordem em que aparecem
+    slot_types: str  # Um caractere por posição ('i' ou 'f')
+
+
+def _escape(text: str) -> str:
+    """Dobra chaves literais"""
+    return text.replace('{', '{{').replace('}', '}}')
+
+
+def _slot_type(value: str) -> str:
+    """Tipo de uma posição: 'i' para só dígitos, 'f' para números com separador"""
+    return 'i' if value.isdigit() else 'f'
+
+
+def extract_template(text: str) -> Optional[TextTemplate]:
+    """
+    Decompõe um texto em modelo e valores.
+
+    Args:
+        text: Texto original
+
+    Returns:
+        TextTemplate ou None se o texto não tem números ou não tem letras
+        fora deles (um número sozinho não é um modelo útil)
+    """
+    if not text or not any(char.isdigit() for char in text):
+        return None
+
+    parts = []
+    values = []
+    position = 0
+    for match in NUMBER_PATTERN.finditer(text):
+        parts.append(_escape(text[position:match.start()]))
+        parts.append(f"{{{len(values)}}}")
+        values.append(match.group(0))
+        position = match.end()
+    parts.append(_escape(text[position:]))
+
+    skeleton = ''.join(parts)
+    if not any(char.isalpha() for char in NUMBER_PATTERN.sub('', text)):
+        return None
+
+    return TextTemplate(skeleton, values, ''.join(_slot_type(value) for value in values))
+
+
+def build_translated_template(original: str, translated: str) -> Optional[TextTemplate]:
+    """
+    Deduz o modelo traduzido a partir de um par original/tradução.
+
+    Cada número da tradução é associado a uma posição do original com o
+    mesmo valor (na ordem, quando o valor se repete). O par só vira modelo
+    se todas as posições aparecem na tradução e a tradução não tem números
+    próprios: "1 item" -> "um item" não generaliza.
+
+    Args:
+        original: Texto original
+        translated: Texto traduzido
+
+    Returns:
+        TextTemplate do original cujo skeleton é o modelo traduzido, ou None
+    """
+    source = extract_template(original)
+    if source is None:
+        return None
+
+    free = {}
+    for index, value in enumerate(source.values):
+        free.setdefault(value, []).append(index)
+
+    parts = []
+    used = set()
+    position = 0
+    for match in NUMBER_PATTERN.finditer(translated):
+        value = match.group(0)
+        slots = [index for index in free.get(value, ()) if index not in used]
+        if not slots:
+            # Valor repetido mais vezes na tradução: reaproveita a primeira posição
+            slots = free.get(value)
+            if not slots:
+                return None
+        used.add(slots[0])
+        parts.append(_escape(translated[position:match.start()]))
+        parts.append(f"{{{slots[0]}}}")
+        position = match.end()
+    parts.append(_escape(translated[position:]))
+
+    if len(used) != len(source.values):
+        return None
+
+    return TextTemplate(''.join(parts), source.values, source.slot_types)
+
+
+def fill_template(template: str, values: List[str]) -> Optional[str]:
+    """
+    Preenche as posições de um modelo.
+
+    Args:
+        template: Modelo com posições {n}
+        values: Valores na ordem das posições do original
+
+    Returns:
+        Texto preenchido ou None se o modelo usa uma posição inexistente
+    """
+    try:
+        return SLOT_PATTERN.sub(
+            lambda match: match.group(0)[0] if match.group(1) is None
+            else values[int(match.group(1))],
+            template
+        )
+    except IndexError:
+        return None
@@ -0,0 +1,253 @@
+"""
+Módulo de Léxico de Variações
+Pares de termos intercambiáveis ("Light"/"Heavy", "Iron"/"Steel") usados
+pelo SmartTranslator para traduzir "Heavy Armor" a partir de "Light Armor"
+
+Os termos são encontrados por um autômato de Aho-Corasick: uma única
+passada pelo texto acha todas as ocorrências, qualquer que seja o tamanho
+do léxico. Só valem ocorrências de palavra inteira ("Light" não casa com
+"Lightning").
+
+Cada par pode trazer a forma traduzida dos termos:
+    ["Light", "Heavy"]                    -> o termo aparece igual na tradução
+    ["Light", "Heavy", "Leve", "Pesada"]  -> "Armadura Leve" vira "Armadura Pesada"
+
+No editor de perfis, um par por linha: "Light = Heavy" ou
+"Light = Heavy | Leve = Pesada".
+"""
+
+from collections import deque
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+# Pares usados quando o perfil não define os seus
+DEFAULT_VARIATIONS = [
+    ['Light', 'Heavy'], ['Small', 'Large'], ['Minor', 'Major'],
+    ['Weak', 'Strong'], ['Basic', 'Advanced'], ['Old', 'New'],
+    ['Young', 'Old'], ['Male', 'Female'], ['Upper', 'Lower']
+]
+
+
+class VariationCandidate(NamedTuple):
+    """Texto alternativo a buscar na memória e como adaptar sua tradução"""
+    alternative: str  # Texto com o termo trocado pelo outro lado do par
+    search: str  # Termo (traduzido) procurado na tradução da alternativa
+    replacement: str  # Termo (traduzido) que o substitui
+
+
+def _normalize_pair(pair: Sequence[str]) -> Optional[Tuple[str, str, str, str]]:
+    """
+    Valida um par do perfil.
+
+    Args:
+        pair: [termo_a, termo_b] ou [termo_a, termo_b, traduzido_a, traduzido_b]
+
+    Returns:
+        Tupla (termo_a, termo_b, traduzido_a, traduzido_b) ou None se inválido
+    """
+    if not isinstance(pair, (list, tuple)) or len(pair) not in (2, 4):
+        return None
+    if not all(isinstance(term, str) and term.strip() for term in pair):
+        return None
+
+    terms = [term.strip() for term in pair]
+    if terms[0] == terms[1]:
+        return None
+    if len(terms) == 2:
+        terms += terms
+    return tuple(terms)
+
+
+def parse_variations(text: str) -> List[List[str]]:
+    """
+    Lê pares no formato do editor ("Light = Heavy | Leve = Pesada").
+
+    Linhas vazias, comentários (#) e linhas inválidas são ignorados.
+
+    Args:
+        text: Um par por linha
+
+    Returns:
+        Lista de pares no formato do perfil
+    """
+    pairs = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+
+        source, _, target = line.partition('|')
+        pair = [term.strip() for term in source.split('=')]
+        if target.strip():
+            pair += [term.strip() for term in target.split('=')]
+
+        if _normalize_pair(pair):
+            pairs.append(pair)
+    return pairs
+
+
+def format_variations(pairs: Iterable[Sequence[str]]) -> str:
+    """
+    Converte pares do perfil para o formato do editor.
+
+    Args:
+        pairs: Pares no formato do perfil
+
+    Returns:
+        Um par por linha
+    """
+    lines = []
+    for pair in pairs:
+        line = f"{pair[0]} = {pair[1]}"
+        if len(pair) == 4 and (pair[2], pair[3]) != (pair[0], pair[1]):
+            line += f" | {pair[2]} = {pair[3]}"
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+class VariationLexicon:
+    """Pares de variação com busca de todos os termos em uma passada"""
+
+    def __init__(self, pairs: Iterable[Sequence[str]]):
+        """
+        Monta o autômato dos termos.
+
+        Args:
+            pairs: Pares no formato do perfil (inválidos são ignorados)
+        """
+        self.pairs: List[Tuple[str, str, str, str]] = []
+        # Termo -> lados em que aparece: (índice do par, lado 0 ou 1)
+        self._sides: Dict[str, List[Tuple[int, int]]] = {}
+
+        for pair in pairs:
+            normalized = _normalize_pair(pair)
+            if normalized is None:
+                continue
+            index = len(self.pairs)
+            self.pairs.append(normalized)
+            for side in (0, 1):
+                self._sides.setdefault(normalized[side], []).append((index, side))
+
+        self._build_automaton()
+
+    def __len__(self) -> int:
+        return len(self.pairs)
+
+    def _build_automaton(self):
+        """Trie dos termos com links de falha (Aho-Corasick)"""
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[str]] = [[]]
+
+        for term in self._sides:
+            node = 0
+            for char in term:
+                child = self._goto[node].get(char)
+                if child is None:
+                    child = len(self._goto)
+                    self._goto[node][char] = child
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                node = child
+            self._output[node].append(term)
+
+        # Em largura: o link de falha de um nó aponta para o maior sufixo
+        # dele que também é prefixo de algum termo
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+        # Transições completas, preenchidas sob demanda por _step
+        self._moves: List[Dict[str, int]] = [dict(edges) for edges in self._goto]
+
+    def _step(self, node: int, char: str) -> int:
+        """Transição seguindo os links de falha; o resultado fica memorizado"""
+        state = node
+        while state and char not in self._goto[state]:
+            state = self._fail[state]
+        target = self._goto[state].get(char, 0)
+        self._moves[node][char] = target
+        return target
+
+    def find_terms(self, text: str) -> Dict[str, List[Tuple[int, int]]]:
+        """
+        Acha todas as ocorrências de palavra inteira dos termos.
+
+        Args:
+            text: Texto a percorrer
+
+        Returns:
+            Dicionário {termo: [(início, fim), ...]} sem sobreposições por termo
+        """
+        found: Dict[str, List[Tuple[int, int]]] = {}
+        moves, output = self._moves, self._output
+        node = 0
+        for position, char in enumerate(text):
+            target = moves[node].get(char)
+            node = self._step(node, char) if target is None else target
+            if not output[node]:
+                continue
+
+            for term in output[node]:
+                end = position + 1
+                start = end - len(term)
+                if start > 0 and text[start - 1].isalnum():
+                    continue
+                if end < len(text) and text[end].isalnum():
+                    continue
+                spans = found.setdefault(term, [])
+                if not spans or spans[-1][1] <= start:
+                    spans.append((start, end))
+        return found
+
+    def candidates(self, text: str) -> List[VariationCandidate]:
+        """
+        Textos alternativos para o texto, na ordem dos pares do léxico.
+
+        Como na lista fixa anterior, de cada par vale o primeiro lado
+        presente no texto.
+
+        Args:
+            text: Texto a traduzir
+
+        Returns:
+            Lista de candidatos (sem alternativas repetidas)
+        """
+        found = self.find_terms(text)
+        if not found:
+            return []
+
+        # Par -> lado encontrado (o lado 0 tem prioridade)
+        matched: Dict[int, Tuple[int, str]] = {}
+        for term in found:
+            for index, side in self._sides[term]:
+                if index not in matched or side < matched[index][0]:
+                    matched[index] = (side, term)
+
+        candidates = []
+        seen = set()
+        for index in sorted(matched):
+            side, term = matched[index]
+            pair = self.pairs[index]
+            partner = pair[1 - side]
+
+            parts = []
+            position = 0
+            for start, end in found[term]:
+                parts.append(text[position:start])
+                parts.append(partner)
+                position = end
+            parts.append(text[position:])
+            alternative = ''.join(parts)
+
+            if alternative not in seen:
+                seen.add(alternative)
+                candidates.append(VariationCandidate(alternative, pair[3 - side], pair[2 + side]))
+        return candidates
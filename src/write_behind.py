@@ -0,0 +1,362 @@
+"""
+Módulo de Gravação Assíncrona (write-behind)
+Grava traduções da memória em segundo plano, fora da thread da interface
+
+As edições interativas entram em uma fila que agrupa gravações repetidas do
+mesmo texto e é descarregada por uma thread própria em uma única transação a
+cada N milissegundos ou M itens. Enquanto a gravação não acontece, a tradução
+já fica visível no cache da memória.
+
+Os padrões aprendidos por SmartTranslator.learn_pattern seguem pela mesma
+fila e ficam visíveis no índice em memória da TranslationMemory.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from database import TranslationMemory
+
+
+class WriteBehindQueue:
+    """
+    Fila de gravação assíncrona para uma TranslationMemory.
+
+    - put() só registra a tradução e retorna imediatamente
+    - put_learned_pattern() faz o mesmo com um padrão aprendido
+    - gravações pendentes do mesmo texto são fundidas (vale a última)
+    - a thread de escrita grava lotes com add_translations_batch
+    - flush() bloqueia até tudo estar gravado (usado ao salvar e fechar)
+    - se a fila passar de max_pending itens, put() espera a gravação
+    - só uma transação desfeita devolve o lote à fila; linhas recusadas
+      isoladamente são descartadas e contadas em rejected
+    - com a memória fechada a fila para de tentar até nova edição ou flush();
+      unwritten() devolve o que ficou sem gravar
+    """
+
+    def __init__(self, memory: TranslationMemory, flush_interval_ms: int = 250,
+                 max_batch: int = 500, max_pending: int = 5000):
+        """
+        Inicializa a fila e inicia a thread de escrita
+
+        Args:
+            memory: Memória de tradução de destino
+            flush_interval_ms: Tempo máximo que uma tradução espera na fila
+            max_batch: Quantidade de itens que dispara a gravação imediata
+            max_pending: Limite da fila; acima dele put() bloqueia
+        """
+        self.memory = memory
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.max_batch = max_batch
+        self.max_pending = max(max_pending, max_batch)
+
+        self._pending: OrderedDict = OrderedDict()
+        self._patterns: OrderedDict = OrderedDict()  # base -> (base traduzida, separador)
+        self._in_flight = 0
+        self._flush_requested = False
+        self._closed = False
+        self._disconnected = False
+        self._cond = threading.Condition()
+
+        # Métricas
+        self.queued = 0
+        self.coalesced = 0
+        self.written = 0
+        self.batches = 0
+        self.errors = 0
+        self.blocked = 0
+        self.rejected = 0
+        self.patterns_written = 0
+        self.last_error: Optional[str] = None
+
+        self._thread = threading.Thread(target=self._run, name="WriteBehindQueue", daemon=True)
+        self._thread.start()
+
+    def put(self, original: str, translated: str):
+        """
+        Agenda a gravação de uma tradução
+
+        Args:
+            original: Texto original
+            translated: Texto traduzido
+        """
+        if not original or not translated:
+            return
+
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Fila de gravação fechada")
+
+            # Back-pressure: espera a thread de escrita abrir espaço. Se a
+            # gravação falhar, aceita crescer em vez de travar a interface
+            if len(self._pending) >= self.max_pending and original not in self._pending:
+                self.blocked += 1
+                self._flush_requested = True
+                self._cond.notify_all()
+                errors = self.errors
+                while (len(self._pending) >= self.max_pending and not self._closed
+                       and self.errors == errors and not self._disconnected):
+                    self._cond.wait()
+
+            if original in self._pending:
+                self.coalesced += 1
+                self._pending.move_to_end(original)
+            self._pending[original] = translated
+            self.queued += 1
+
+            if len(self._pending) >= self.max_batch:
+                self._flush_requested = True
+            self._cond.notify_all()
+
+            # Leituras já enxergam a tradução antes da gravação
+            self.memory.prime_cache(original, translated)
+
+    def put_learned_pattern(self, base_text: str, translated_base: str, separator: str = ' '):
+        """
+        Agenda a gravação de um padrão aprendido ("Soldier" -> "Soldado")
+
+        Args:
+            base_text: Texto base original (sem o número)
+            translated_base: Texto base traduzido
+            separator: Separador entre a base traduzida e o número
+        """
+        if not base_text:
+            return
+
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Fila de gravação fechada")
+
+            if base_text in self._patterns:
+                self.coalesced += 1
+                self._patterns.move_to_end(base_text)
+            self._patterns[base_text] = (translated_base, separator)
+            self.queued += 1
+            self._cond.notify_all()
+
+            # O tradutor já aplica o padrão antes da gravação
+            self.memory.prime_learned_pattern(base_text, translated_base, separator)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Grava imediatamente tudo o que está pendente
+
+        Args:
+            timeout: Tempo máximo de espera em segundos (None = sem limite)
+
+        Returns:
+            True se a fila ficou vazia; False em caso de timeout ou falha de gravação
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._cond:
+            errors = self.errors
+            while self._pending or self._patterns or self._in_flight:
+                if not self._thread.is_alive():
+                    break
+                if self.errors != errors:
+                    return False
+                # Memória fechada: não há o que esperar
+                if self._disconnected and not self.memory.is_connected():
+                    return False
+
+                self._flush_requested = True
+                self._cond.notify_all()
+
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+
+            if not self._pending and not self._patterns and not self._in_flight:
+                return True
+
+            batch = self._take_batch(len(self._pending))
+            patterns = self._take_patterns()
+
+        # Thread parada: grava na thread atual
+        return self._write_batch(batch, patterns)
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """
+        Grava o que está pendente e encerra a thread de escrita
+
+        Returns:
+            True se tudo foi gravado
+        """
+        flushed = self.flush(timeout)
+
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+        self._thread.join(timeout)
+        return flushed and not self._pending and not self._patterns
+
+    def unwritten(self) -> List[Tuple[str, str]]:
+        """
+        Traduções ainda não gravadas (ex: depois de close() retornar False)
+
+        Returns:
+            Lista de (texto_original, texto_traduzido)
+        """
+        with self._cond:
+            return list(self._pending.items())
+
+    def pending_count(self) -> int:
+        """Retorna quantas traduções e padrões aguardam gravação"""
+        with self._cond:
+            return len(self._pending) + len(self._patterns) + self._in_flight
+
+    def stats(self) -> dict:
+        """Retorna métricas da fila"""
+        with self._cond:
+            return {
+                'write_queue_pending': len(self._pending) + len(self._patterns) + self._in_flight,
+                'write_queue_queued': self.queued,
+                'write_queue_coalesced': self.coalesced,
+                'write_queue_written': self.written,
+                'write_queue_batches': self.batches,
+                'write_queue_errors': self.errors,
+                'write_queue_blocked': self.blocked,
+                'write_queue_rejected': self.rejected,
+                'write_queue_patterns_written': self.patterns_written,
+                'write_queue_last_error': self.last_error
+            }
+
+    def _take_batch(self, size: int) -> list:
+        """Retira até size itens da fila (chamar com o lock adquirido)"""
+        batch = []
+        while self._pending and len(batch) < size:
+            batch.append(self._pending.popitem(last=False))
+        self._in_flight += len(batch)
+        return batch
+
+    def _take_patterns(self) -> list:
+        """Retira todos os padrões aprendidos da fila (chamar com o lock adquirido)"""
+        patterns = [(base, translated, separator)
+                    for base, (translated, separator) in self._patterns.items()]
+        self._patterns.clear()
+        self._in_flight += len(patterns)
+        return patterns
+
+    def _write_batch(self, batch: list, patterns: list = ()) -> bool:
+        """
+        Grava um lote em uma transação e devolve à fila o que falhar
+
+        Args:
+            batch: Lista de (texto_original, texto_traduzido)
+            patterns: Lista de (base original, base traduzida, separador)
+
+        Returns:
+            True se o lote foi processado (linhas recusadas são descartadas)
+        """
+        if not batch and not patterns:
+            return True
+
+        if not self.memory.is_connected():
+            message = None
+            with self._cond:
+                self._in_flight -= len(batch) + len(patterns)
+                self._requeue(batch, patterns)
+                # Conta a falha uma vez por desconexão, não a cada tentativa
+                if not self._disconnected:
+                    self._disconnected = True
+                    self.errors += 1
+                    self.last_error = "Memória de tradução fechada"
+                    message = f"Erro: memória fechada com {len(self._pending)} traduções na fila"
+                self._cond.notify_all()
+
+            # Fora do lock: put() e flush() não esperam pela saída do console
+            if message:
+                print(message)
+            return False
+
+        rejected = []
+        inserted, errors = (self.memory.add_translations_batch(batch, rejected=rejected)
+                            if batch else (0, 0))
+
+        # Erros além das linhas recusadas: a transação foi desfeita
+        ok = errors <= len(rejected)
+        patterns_ok = self.memory.add_learned_patterns_batch(patterns)
+
+        with self._cond:
+            self._in_flight -= len(batch) + len(patterns)
+            self._disconnected = False
+            if ok and batch:
+                self.written += inserted
+                self.batches += 1
+                for original, translated in rejected:
+                    self.rejected += 1
+                    self.last_error = f"Tradução recusada pela memória: {original!r}"
+                    if original not in self._pending:
+                        self.memory.discard_cached(original)
+                # A gravação atualizou o cache; edições mais novas continuam valendo
+                for original, _ in batch:
+                    if original in self._pending:
+                        self.memory.prime_cache(original, self._pending[original])
+            elif not ok:
+                self.errors += 1
+                self.last_error = "Falha na transação de gravação"
+                self._requeue(batch)
+
+            if patterns_ok:
+                self.patterns_written += len(patterns)
+                for base, _, _ in patterns:
+                    if base in self._patterns:
+                        self.memory.prime_learned_pattern(base, *self._patterns[base])
+            else:
+                if ok:
+                    self.errors += 1
+                self.last_error = "Falha ao gravar padrões aprendidos"
+                self._requeue([], patterns)
+            self._cond.notify_all()
+
+        for original, _ in rejected:
+            print(f"Erro: Tradução recusada pela memória: {original!r}")
+        return ok and patterns_ok
+
+    def _requeue(self, batch: list, patterns: list = ()):
+        """Devolve um lote à fila sem sobrescrever edições mais novas (com o lock)"""
+        for original, translated in batch:
+            if original not in self._pending:
+                self._pending[original] = translated
+        for base, translated, separator in patterns:
+            if base not in self._patterns:
+                self._patterns[base] = (translated, separator)
+
+    def _run(self):
+        """Laço da thread de escrita"""
+        while True:
+            with self._cond:
+                while not self._pending and not self._patterns and not self._closed:
+                    self._cond.wait()
+
+                if self._closed and not self._pending and not self._patterns:
+                    return
+
+                # Espera o intervalo para agrupar mais edições
+                deadline = time.monotonic() + self.flush_interval
+                while (len(self._pending) < self.max_batch and not self._flush_requested
+                       and not self._closed):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+                self._flush_requested = False
+                batch = self._take_batch(self.max_batch)
+                patterns = self._take_patterns()
+
+            if not self._write_batch(batch, patterns):
+                with self._cond:
+                    if self._closed:
+                        return
+                    if self._disconnected:
+                        # Memória fechada: só tenta de novo com nova edição ou flush()
+                        self._flush_requested = False
+                        self._cond.wait()
+                    else:
+                        # Banco indisponível: aguarda antes de tentar de novo
+                        self._cond.wait(self.flush_interval)